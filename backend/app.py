@@ -2,23 +2,41 @@
 
 from __future__ import annotations
 
-from datetime import datetime
+import base64
+import cProfile
+import hashlib
+import io
+import pstats
+import threading
+from datetime import date, datetime
 from pathlib import Path
-from typing import Optional
+from time import perf_counter
+from typing import TYPE_CHECKING, Callable, Dict, Hashable, List, NamedTuple, Optional, Sequence, Tuple, Union
 
+import numpy as np
 import pytz
-from flask import Flask, jsonify, request, send_from_directory
+from flask import Flask, Response, g, jsonify, request, send_from_directory, stream_with_context
 from flask_cors import CORS
 from pytz import UnknownTimeZoneError
+from werkzeug.datastructures import CombinedMultiDict, MultiDict
 
-from .orientation_optimizer import OrientationResult, calculate_optimal_orientation
-from .solar_calculator import (
-    DEFAULT_SITE,
-    SiteParameters,
-    SunPosition,
-    get_sun_path,
-    get_sun_position,
-)
+from . import config, encoding, offload, orientation_grid
+from .cache import TTLCache
+from .instrumentation import Histogram, render_metric, server_timing_header, stage, start_stages, stop_stages
+from .jobs import Job, JobQueue, JobQueueFull
+from .lazy import LazyModule
+from .sun_stream import SunPositionBroadcaster
+from .warmup import warm_up as _warm_up_modules
+
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    from .heliostat import FieldBlock
+    from .orientation_optimizer import EnergySurface, OrientationResult, ProgressCallback
+    from .solar_calculator import SiteParameters, SunPathBatch, SunPosition, SunPositionBatch
+
+# pandas/pvlib/SciPy load on first use (or in warm_up), keeping worker boot fast.
+solar_calculator = LazyModule(".solar_calculator", __package__)
+orientation_optimizer = LazyModule(".orientation_optimizer", __package__)
+heliostat = LazyModule(".heliostat", __package__)
 
 BASE_DIR = Path(__file__).resolve().parents[1]
 FRONTEND_DIR = BASE_DIR / "frontend"
@@ -28,7 +46,169 @@ app = Flask(
     static_folder=str(FRONTEND_DIR),
     static_url_path="",
 )
-CORS(app)
+CORS(
+    app,
+    expose_headers=[
+        "ETag",
+        "X-Cache",
+        "X-Day-Count",
+        "Server-Timing",
+        "X-Surface-Shape",
+        "X-Surface-Tilt-Axis",
+        "X-Surface-Azimuth-Axis",
+    ],
+)
+
+_SUN_PATH_CACHE = TTLCache(config.RESULT_CACHE_SIZE, config.RESULT_CACHE_TTL)
+_ORIENTATION_CACHE = TTLCache(config.RESULT_CACHE_SIZE, config.RESULT_CACHE_TTL)
+_SURFACE_CACHE = TTLCache(config.SURFACE_CACHE_SIZE, config.RESULT_CACHE_TTL)
+_ORIENTATION_JOBS = JobQueue(
+    workers=config.JOB_WORKERS,
+    max_pending=config.MAX_PENDING_JOBS,
+    retention=config.JOB_RETENTION_SECONDS,
+)
+
+_REQUEST_LATENCY = Histogram(
+    "solar_request_duration_seconds", "Time spent handling API requests (streamed bodies excluded).", "endpoint"
+)
+_STAGE_LATENCY = Histogram("solar_stage_duration_seconds", "Time spent per calculation stage within requests.", "stage")
+_WARM_UP_TIMINGS: Dict[str, float] = {}
+# cProfile supports one active profiler per process.
+_PROFILER_LOCK = threading.Lock()
+
+
+def _profiling_requested() -> bool:
+    return config.PROFILING_ENABLED and request.args.get("profile") == "1"
+
+
+@app.before_request
+def _start_instrumentation():
+    if not request.path.startswith("/api/") or request.path == "/api/metrics":
+        return None
+    if _profiling_requested():
+        if not _PROFILER_LOCK.acquire(blocking=False):
+            return jsonify({"error": "Another request is being profiled; retry shortly."}), 503
+        g.profiler = cProfile.Profile()
+        g.profiler.enable()
+    if config.INSTRUMENTATION_ENABLED:
+        g.stage_timings, g.stage_token = start_stages()
+        g.request_start = perf_counter()
+    return None
+
+
+@app.after_request
+def _finish_instrumentation(response: Response) -> Response:
+    profiler = g.pop("profiler", None)
+    if profiler is not None:
+        profiler.disable()
+        _PROFILER_LOCK.release()
+        summary = io.StringIO()
+        stats = pstats.Stats(profiler, stream=summary).sort_stats("cumulative")
+        stats.print_stats(config.PROFILE_TOP_FUNCTIONS)
+        response = Response(summary.getvalue(), mimetype="text/plain")
+    if "stage_token" in g:
+        total = perf_counter() - g.request_start
+        stop_stages(g.pop("stage_token"))
+        timings = g.pop("stage_timings")
+        _REQUEST_LATENCY.observe(request.endpoint or "unknown", total)
+        for name, seconds in timings.items():
+            _STAGE_LATENCY.observe(name, seconds)
+        response.headers["Server-Timing"] = server_timing_header({**timings, "total": total})
+    return response
+
+
+@app.teardown_request
+def _abort_instrumentation(exc: Optional[BaseException]) -> None:
+    # after_request is skipped on unhandled errors; release what it would have.
+    profiler = g.pop("profiler", None)
+    if profiler is not None:
+        profiler.disable()
+        _PROFILER_LOCK.release()
+    token = g.pop("stage_token", None)
+    if token is not None:
+        stop_stages(token)
+
+
+class _CachedBody(NamedTuple):
+    body: bytes
+    etag: str
+    headers: Tuple[Tuple[str, str], ...] = ()
+
+
+def _cached_response(
+    cache: TTLCache,
+    key: Hashable,
+    render: Callable[[], Tuple[bytes, Tuple[Tuple[str, str], ...]]],
+    *,
+    mimetype: str,
+    max_age: Optional[int] = None,
+) -> Response:
+    """Serve a deterministic body from ``cache`` with HTTP validators.
+
+    ``render`` returns the body and any extra headers describing it.
+    ``max_age=None`` lets clients store the response but forces them to
+    revalidate it (useful when the key depends on the current date).
+    """
+
+    def _render() -> _CachedBody:
+        body, headers = render()
+        return _CachedBody(body=body, etag=hashlib.sha1(body).hexdigest(), headers=headers)
+
+    # A profiled request should show the real work, not a cache lookup.
+    cached, hit = (_render(), False) if "profiler" in g else cache.get_or_set(key, _render)
+    response = Response(cached.body, mimetype=mimetype)
+    response.headers.extend(cached.headers)
+    response.set_etag(cached.etag)
+    response.headers["Cache-Control"] = f"public, max-age={max_age}" if max_age is not None else "no-cache"
+    response.headers["X-Cache"] = "HIT" if hit else "MISS"
+    return response.make_conditional(request)
+
+
+def _response_format() -> str:
+    """The negotiated body format of this request (see ``backend.encoding``)."""
+
+    return encoding.negotiate(request.accept_mimetypes)
+
+
+@app.errorhandler(offload.Overloaded)
+def _overloaded(exc: offload.Overloaded):
+    response = jsonify({"error": str(exc)})
+    response.status_code = 429
+    response.headers["Retry-After"] = "5"
+    return response
+
+
+@app.errorhandler(offload.OffloadTimeout)
+def _offload_timeout(exc: offload.OffloadTimeout):
+    return jsonify({"error": str(exc)}), 504
+
+
+@app.errorhandler(encoding.FormatUnavailable)
+def _format_unavailable(exc: encoding.FormatUnavailable):
+    return jsonify({"error": str(exc)}), 406
+
+
+def _encode(payload: Union[dict, encoding.Table], fmt: str) -> bytes:
+    with stage("serialize"):
+        return jsonify(payload).get_data() if fmt == encoding.JSON else encoding.encode(payload, fmt)
+
+
+def _cached_payload(
+    cache: TTLCache,
+    key: Hashable,
+    build: Callable[[], Union[dict, encoding.Table]],
+    *,
+    fmt: str = encoding.JSON,
+    max_age: Optional[int] = None,
+) -> Response:
+    """Serve a deterministic payload from ``cache`` with HTTP validators.
+
+    ``build`` returns a JSON dict, or for binary ``fmt`` an ``encoding.Table``.
+    """
+
+    response = _cached_response(cache, (fmt, key), lambda: (_encode(build(), fmt), ()), mimetype=fmt, max_age=max_age)
+    response.vary.add("Accept")
+    return response
 
 
 def _parse_datetime(value: str) -> Optional[datetime]:
@@ -40,29 +220,24 @@ def _parse_datetime(value: str) -> Optional[datetime]:
         raise ValueError("Invalid datetime format. Use ISO-8601 e.g. 2025-11-11T14:00:00+07:00") from exc
 
 
-def _site_from_request() -> SiteParameters | None:
-    lat = request.args.get("lat", type=float)
-    lon = request.args.get("lon", type=float)
-    altitude = request.args.get("alt", type=float)
-    if altitude is None:
-        altitude = request.args.get("altitude", type=float)
-    timezone_name = request.args.get("tz")
-    name = request.args.get("name")
-
-    if all(value is None for value in (lat, lon, altitude, timezone_name, name)):
-        return None
-
+def _build_site(
+    lat: Optional[float],
+    lon: Optional[float],
+    altitude: Optional[float],
+    timezone_name: Optional[str],
+    name: Optional[str],
+) -> SiteParameters:
     if lat is None or lon is None:
         raise ValueError("Latitude (lat) and longitude (lon) must be provided for custom locations.")
 
-    altitude = altitude if altitude is not None else DEFAULT_SITE.altitude
-    timezone_name = timezone_name or DEFAULT_SITE.timezone
+    altitude = altitude if altitude is not None else solar_calculator.DEFAULT_SITE.altitude
+    timezone_name = timezone_name or solar_calculator.DEFAULT_SITE.timezone
     try:
         pytz.timezone(timezone_name)
     except UnknownTimeZoneError as exc:
         raise ValueError("Invalid timezone identifier.") from exc
 
-    return SiteParameters(
+    return solar_calculator.SiteParameters(
         latitude=lat,
         longitude=lon,
         altitude=altitude,
@@ -71,6 +246,48 @@ def _site_from_request() -> SiteParameters | None:
     )
 
 
+def _site_from_request(args: Optional[MultiDict] = None) -> SiteParameters | None:
+    args = request.args if args is None else args
+    lat = args.get("lat", type=float)
+    lon = args.get("lon", type=float)
+    altitude = args.get("alt", type=float)
+    if altitude is None:
+        altitude = args.get("altitude", type=float)
+    timezone_name = args.get("tz")
+    name = args.get("name")
+
+    if all(value is None for value in (lat, lon, altitude, timezone_name, name)):
+        return None
+
+    return _build_site(lat, lon, altitude, timezone_name, name)
+
+
+def _optional_float(value: object, field: str) -> Optional[float]:
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError) as exc:
+        raise ValueError(f"Field '{field}' must be a number.") from exc
+
+
+def _site_from_mapping(data: object) -> SiteParameters:
+    """Build a site from a JSON object using the same keys as the query string."""
+
+    if not isinstance(data, dict):
+        raise ValueError("Each site must be a JSON object.")
+    lat = data.get("lat", data.get("latitude"))
+    lon = data.get("lon", data.get("longitude"))
+    altitude = data.get("alt", data.get("altitude"))
+    return _build_site(
+        _optional_float(lat, "lat"),
+        _optional_float(lon, "lon"),
+        _optional_float(altitude, "alt"),
+        data.get("tz", data.get("timezone")),
+        data.get("name"),
+    )
+
+
 def _serialize_position(position: SunPosition, site: SiteParameters) -> dict:
     return {
         "timestamp": position.timestamp.isoformat(),
@@ -117,6 +334,8 @@ def _orientation_payload(result: OrientationResult, site: SiteParameters) -> dic
         "azimuth": round(azimuth_normalised, 2),
         "direction_label": direction_label,
         "annual_poa_kwh_m2": round(result.annual_poa_irradiance / 1000, 2),
+        "estimated_error": result.estimated_error,
+        "derived_from_year": result.derived_from_year,
         "site": _site_payload(site),
     }
 
@@ -126,64 +345,784 @@ def sun_position():
     datetime_param = request.args.get("datetime")
     try:
         target_dt = _parse_datetime(datetime_param) if datetime_param else None
-        site = _site_from_request() or DEFAULT_SITE
-        position = get_sun_position(target_dt, site=site)
+        site = _site_from_request() or solar_calculator.DEFAULT_SITE
+        position = solar_calculator.get_sun_position(target_dt, site=site)
     except ValueError as exc:
         return jsonify({"error": str(exc)}), 400
     return jsonify(_serialize_position(position, site))
 
 
+def _stream_batch(sites: Sequence[SiteParameters], when: datetime) -> List[str]:
+    """Serialise every site's position at ``when`` from one vectorised SPA call."""
+
+    batch = solar_calculator.get_sun_positions([when], sites)
+    messages = []
+    for row, site in enumerate(batch.sites):
+        position = solar_calculator.SunPosition(
+            timestamp=batch.timestamps[row].tz_convert(site.timezone).to_pydatetime(),
+            elevation=float(batch.elevation[row]),
+            azimuth=float(batch.azimuth[row]),
+            zenith=float(batch.zenith[row]),
+        )
+        messages.append(app.json.dumps(_serialize_position(position, site)))
+    return messages
+
+
+_SUN_STREAM = SunPositionBroadcaster(_stream_batch, tick=config.SUN_STREAM_INTERVAL)
+
+
+def _stream_sites(args: MultiDict) -> List[SiteParameters]:
+    """Sites of a stream: the ``lat``/``lon``/... site plus any ``site=lat,lon[,alt[,tz]]``."""
+
+    sites = []
+    single = _site_from_request(args)
+    if single is not None:
+        sites.append(single)
+    for raw in args.getlist("site"):
+        parts = [part.strip() for part in raw.split(",")]
+        if not 2 <= len(parts) <= 4:
+            raise ValueError("Each site must be given as site=lat,lon[,alt[,tz]].")
+        parts += [""] * (4 - len(parts))
+        sites.append(
+            _build_site(
+                _optional_float(parts[0] or None, "lat"),
+                _optional_float(parts[1] or None, "lon"),
+                _optional_float(parts[2] or None, "alt"),
+                parts[3] or None,
+                None,
+            )
+        )
+    sites = list(dict.fromkeys(sites)) or [solar_calculator.DEFAULT_SITE]
+    if len(sites) > config.MAX_STREAM_SITES:
+        raise ValueError(f"Too many sites: at most {config.MAX_STREAM_SITES} per stream.")
+    return sites
+
+
+@app.route("/api/sun-position/stream")
+def sun_position_stream():
+    """Server-Sent Events: one ``position`` event per site every ``interval`` seconds.
+
+    Events carry the same JSON as /api/sun-position. All streams share one
+    scheduler, which computes each due site once per tick however many
+    clients follow it.
+    """
+
+    interval = request.args.get("interval", type=float)
+    try:
+        if interval is not None and interval <= 0:
+            raise ValueError("Interval must be a positive number of seconds.")
+        sites = _stream_sites(request.args)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    def generate():
+        # Subscribing here rather than in the view means a response that is
+        # never iterated never registers with the scheduler.
+        subscription = _SUN_STREAM.subscribe(sites, interval)
+        try:
+            yield f"retry: {int(subscription.period * 1000)}\n\n"
+            while True:
+                message = subscription.get(timeout=config.SUN_STREAM_KEEPALIVE)
+                yield ": keep-alive\n\n" if message is None else f"event: position\ndata: {message}\n\n"
+        finally:
+            _SUN_STREAM.unsubscribe(subscription)
+
+    response = Response(generate(), mimetype="text/event-stream")
+    response.headers["Cache-Control"] = "no-cache"
+    # Stop nginx-style proxies from buffering the stream.
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
+
+def _resolve_date(value: Optional[str], site: SiteParameters) -> date:
+    if not value:
+        return datetime.now(tz=pytz.timezone(site.timezone)).date()
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError as exc:
+        raise ValueError("Invalid date format. Use YYYY-MM-DD.") from exc
+
+
+@app.route("/api/sun-positions", methods=["POST"])
+def sun_positions():
+    """Batch variant of /api/sun-position returning columnar JSON, Arrow or MessagePack.
+
+    Body: ``{"times": [ISO-8601, ...], "sites": [{"lat", "lon", "alt", "tz", "name"}, ...]}``.
+    Both keys are optional; every site is evaluated at every timestamp.
+    """
+
+    body = request.get_json(silent=True)
+    try:
+        fmt = _response_format()
+        if not isinstance(body, dict):
+            raise ValueError("Request body must be a JSON object.")
+        raw_times = body.get("times")
+        raw_sites = body.get("sites")
+        if raw_times is not None and not isinstance(raw_times, list):
+            raise ValueError("'times' must be a list of ISO-8601 strings.")
+        if raw_sites is not None and not isinstance(raw_sites, list):
+            raise ValueError("'sites' must be a list of site objects.")
+        times = [_parse_datetime(str(value)) for value in raw_times] if raw_times is not None else None
+        sites = [_site_from_mapping(item) for item in raw_sites] if raw_sites is not None else None
+        n_rows = (len(times) if times is not None else 1) * (len(sites) if sites is not None else 1)
+        if n_rows > config.MAX_BATCH_POSITIONS:
+            raise ValueError(f"Batch too large: at most {config.MAX_BATCH_POSITIONS} site/time pairs per request.")
+        batch = solar_calculator.get_sun_positions(times, sites)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    payload = _positions_payload(batch) if fmt == encoding.JSON else _positions_table(batch)
+    response = Response(_encode(payload, fmt), mimetype=fmt)
+    response.vary.add("Accept")
+    return response
+
+
+def _positions_payload(batch: SunPositionBatch) -> dict:
+    local_timestamps = []
+    for idx, site in enumerate(batch.sites):
+        rows = batch.timestamps[batch.site_index == idx].tz_convert(site.timezone)
+        local_timestamps.extend(ts.isoformat() for ts in rows)
+
+    return {
+        "count": len(batch),
+        "sites": [_site_payload(site) for site in batch.sites],
+        "site_index": batch.site_index.tolist(),
+        "timestamp": local_timestamps,
+        "elevation": batch.elevation.tolist(),
+        "azimuth": batch.azimuth.tolist(),
+        "zenith": batch.zenith.tolist(),
+        "is_daytime": batch.is_daytime.tolist(),
+    }
+
+
+def _positions_table(batch: SunPositionBatch) -> encoding.Table:
+    """Binary counterpart of ``_positions_payload``; timestamps stay in UTC.
+
+    Angles are rounded to 0.01 degrees, well within float32 precision.
+    """
+
+    return encoding.Table(
+        columns={
+            "site_index": batch.site_index.astype(np.int32),
+            "timestamp": batch.timestamps.tz_convert(None).values,
+            "elevation": batch.elevation.astype(np.float32),
+            "azimuth": batch.azimuth.astype(np.float32),
+            "zenith": batch.zenith.astype(np.float32),
+            "is_daytime": batch.is_daytime,
+        },
+        meta={"count": len(batch), "sites": [_site_payload(site) for site in batch.sites]},
+    )
+
+
+def _sun_path_table(batch: SunPathBatch, **meta) -> encoding.Table:
+    """Binary sun paths: UTC sample times and float32 angles, per-day events in ``meta``."""
+
+    return encoding.Table(
+        columns={
+            "timestamp": batch.timestamps.tz_convert(None).values,
+            "elevation": batch.elevation.astype(np.float32),
+            "azimuth": batch.azimuth.astype(np.float32),
+        },
+        meta={
+            **meta,
+            "dates": [day.strftime("%Y-%m-%d") for day in batch.days],
+            "samples_per_day": batch.samples_per_day,
+            "sunrise": batch.sunrise,
+            "sunset": batch.sunset,
+            "solar_noon": batch.solar_noon,
+        },
+    )
+
+
+def _sun_path_range(
+    start_param: Optional[str],
+    end_param: Optional[str],
+    interval: int,
+    columnar: bool,
+    site: SiteParameters,
+    fmt: str,
+) -> Response:
+    """Stream the sun paths of ``start``..``end`` (inclusive).
+
+    JSON is sent as NDJSON with one document per day; Arrow and MessagePack
+    streams carry one table per chunk of days.
+    """
+
+    start_date = _resolve_date(start_param or end_param, site)
+    end_date = _resolve_date(end_param or start_param, site)
+    if end_date < start_date:
+        raise ValueError("end must not be before start.")
+    n_days = (end_date - start_date).days + 1
+    if n_days > config.MAX_SUN_PATH_DAYS:
+        raise ValueError(f"Date range too long: at most {config.MAX_SUN_PATH_DAYS} days per request.")
+
+    def generate():
+        for payload in solar_calculator.iter_sun_paths(
+            start_date, end_date, interval_minutes=interval, site=site, columnar=columnar
+        ):
+            payload["location"] = _site_payload(site)
+            yield app.json.dumps(payload) + "\n"
+
+    if fmt == encoding.JSON:
+        response = Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+    else:
+        batches = solar_calculator.iter_sun_path_batches(start_date, end_date, interval_minutes=interval, site=site)
+        meta = {"timezone": site.timezone, "location": _site_payload(site), "interval_minutes": interval}
+        body = encoding.encode_stream((_sun_path_table(batch) for batch in batches), fmt, meta)
+        response = Response(stream_with_context(body), mimetype=fmt)
+    response.headers["X-Day-Count"] = str(n_days)
+    response.vary.add("Accept")
+    return response
+
+
 @app.route("/api/sun-path")
 def sun_path():
     date_param = request.args.get("date")
+    start_param = request.args.get("start")
+    end_param = request.args.get("end")
     interval_param = request.args.get("interval", type=int)
     try:
         if interval_param is not None and interval_param <= 0:
             raise ValueError("Interval must be a positive integer of minutes.")
-        site = _site_from_request() or DEFAULT_SITE
-        if interval_param is not None:
-            payload = get_sun_path(target_date=date_param, interval_minutes=interval_param, site=site)
-        else:
-            payload = get_sun_path(target_date=date_param, site=site)
-        payload["location"] = _site_payload(site)
+        if date_param and (start_param or end_param):
+            raise ValueError("Use either date or start/end, not both.")
+        site = _site_from_request() or solar_calculator.DEFAULT_SITE
+        interval = interval_param if interval_param is not None else config.UPDATE_INTERVAL
+        columnar = request.args.get("columnar", default="0").lower() in ("1", "true", "yes")
+        fmt = _response_format()
+        if start_param or end_param:
+            return _sun_path_range(start_param, end_param, interval, columnar, site, fmt)
+        target_date = _resolve_date(date_param, site)
+
+        def build() -> Union[dict, encoding.Table]:
+            if fmt != encoding.JSON:
+                batch = offload.call(
+                    solar_calculator._sun_path_batch, [target_date], interval_minutes=interval, site=site
+                )
+                return _sun_path_table(batch, timezone=site.timezone, location=_site_payload(site))
+            payload = offload.call(
+                solar_calculator.get_sun_path,
+                target_date=target_date,
+                interval_minutes=interval,
+                site=site,
+                columnar=columnar,
+            )
+            payload["location"] = _site_payload(site)
+            return payload
+
+        return _cached_payload(
+            _SUN_PATH_CACHE,
+            ("sun-path", site, target_date, interval, columnar),
+            build,
+            fmt=fmt,
+            # "Today" changes at local midnight, so only explicit dates are
+            # safe for shared caches to keep without revalidation.
+            max_age=config.RESULT_CACHE_TTL if date_param else None,
+        )
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+
+def _position_list(value: object, field: str, *, many: bool) -> list:
+    """Validate ``[east, north, up]`` (or a list of them with ``many``) as nested float lists."""
+
+    rows = value if many else [value]
+    if not isinstance(rows, list) or not all(isinstance(row, list) and len(row) == 3 for row in rows):
+        shape = "a list of [east, north, up] positions" if many else "an [east, north, up] position"
+        raise ValueError(f"'{field}' must be {shape} in metres.")
+    positions = [[_optional_float(item, field) for item in row] for row in rows]
+    if any(item is None for row in positions for item in row):
+        raise ValueError(f"Field '{field}' must be a number.")
+    return positions if many else positions[0]
+
+
+def _field_table(block: FieldBlock) -> encoding.Table:
+    """Binary field block: one row per (timestamp, mirror) cell, timestamp-major."""
+
+    return encoding.Table(
+        columns={"tilt": block.tilt.ravel(), "azimuth": block.azimuth.ravel(), "cosine": block.cosine.ravel()},
+        meta={
+            "timestamp": [ts.isoformat() for ts in block.timestamps],
+            "sun_elevation": np.round(block.sun_elevation, 2).tolist(),
+            "sun_azimuth": np.round(block.sun_azimuth, 2).tolist(),
+        },
+    )
+
+
+@app.route("/api/heliostat-field", methods=["POST"])
+def heliostat_field():
+    """Mirror normals and cosine efficiency of a heliostat field over one day.
+
+    Body: ``{"mirrors": [[east, north, up], ...], "receiver": [east, north, up],
+    "date": "YYYY-MM-DD", "interval": minutes, "site": {"lat", "lon", ...},
+    "detail": false}``; positions are metres from the site (query-string
+    site keys work too). Only samples with the sun above the horizon are
+    returned. JSON carries the field's mean cosine per timestamp and each
+    mirror's daily mean, plus ``tilt``/``azimuth``/``cosine`` matrices
+    (timestamps x mirrors) with ``detail``. Arrow/MessagePack stream every
+    cell, one table per block of timestamps.
+    """
+
+    body = request.get_json(silent=True)
+    try:
+        fmt = _response_format()
+        if not isinstance(body, dict):
+            raise ValueError("Request body must be a JSON object.")
+        mirrors = _position_list(body.get("mirrors"), "mirrors", many=True)
+        receiver = _position_list(body.get("receiver"), "receiver", many=False)
+        if len(mirrors) > config.MAX_FIELD_MIRRORS:
+            raise ValueError(f"Too many mirrors: at most {config.MAX_FIELD_MIRRORS} per request.")
+        site = (
+            _site_from_mapping(body["site"])
+            if body.get("site") is not None
+            else _site_from_request() or solar_calculator.DEFAULT_SITE
+        )
+        interval = _optional_float(body.get("interval", config.UPDATE_INTERVAL), "interval")
+        if interval is None or interval <= 0 or interval != int(interval):
+            raise ValueError("Interval must be a positive integer of minutes.")
+        interval = int(interval)
+        target_date = _resolve_date(body.get("date"), site)
+        detail = bool(body.get("detail")) and fmt == encoding.JSON
+        if detail and len(mirrors) * -(-24 * 60 // interval) > config.MAX_FIELD_DETAIL_CELLS:
+            raise ValueError(
+                f"detail is limited to {config.MAX_FIELD_DETAIL_CELLS} mirror x timestamp cells as JSON; "
+                f"request {encoding.ARROW} or {encoding.MSGPACK} for larger fields."
+            )
+        blocks = heliostat.iter_field_blocks(mirrors, receiver, target_date, interval_minutes=interval, site=site)
     except ValueError as exc:
         return jsonify({"error": str(exc)}), 400
-    return jsonify(payload)
+
+    meta = {
+        "date": target_date.strftime("%Y-%m-%d"),
+        "interval": interval,
+        "site": _site_payload(site),
+        "receiver": receiver,
+        "mirror_count": len(mirrors),
+    }
+    if fmt != encoding.JSON:
+        response = Response(
+            stream_with_context(encoding.encode_stream((_field_table(block) for block in blocks), fmt, meta)),
+            mimetype=fmt,
+        )
+        response.vary.add("Accept")
+        return response
+
+    tz = pytz.timezone(site.timezone)
+    payload = {**meta, "timestamp": [], "sun_elevation": [], "sun_azimuth": [], "field_cosine": []}
+    if detail:
+        payload.update(tilt=[], azimuth=[], cosine=[])
+    mirror_total = np.zeros(len(mirrors))
+    for block in blocks:
+        payload["timestamp"] += [ts.isoformat() for ts in block.timestamps.tz_convert(tz)]
+        payload["sun_elevation"] += np.round(block.sun_elevation, 2).tolist()
+        payload["sun_azimuth"] += np.round(block.sun_azimuth, 2).tolist()
+        payload["field_cosine"] += np.round(block.cosine.mean(axis=1, dtype=float), 4).tolist()
+        mirror_total += block.cosine.sum(axis=0, dtype=float)
+        if detail:
+            payload["tilt"] += np.round(block.tilt.astype(float), 2).tolist()
+            payload["azimuth"] += np.round(block.azimuth.astype(float), 2).tolist()
+            payload["cosine"] += np.round(block.cosine.astype(float), 4).tolist()
+    n_samples = len(payload["timestamp"])
+    payload["mirror_cosine"] = np.round(mirror_total / n_samples, 4).tolist() if n_samples else [None] * len(mirrors)
+    response = Response(_encode(payload, fmt), mimetype=fmt)
+    response.vary.add("Accept")
+    return response
+
+
+def _call_inline(func: Callable, *args, **kwargs):
+    return func(*args, **kwargs)
+
+
+class _Sweep(NamedTuple):
+    site: SiteParameters
+    year: int
+    tilt_step: float
+    tilt_max: float
+    azimuth_step: float
+    freq: str
+    strategy: str
+    day_step: int
+    weather: Optional[str] = None  # file name in config.WEATHER_DIR
+    weather_version: Optional[Tuple[int, int]] = None  # (size, mtime_ns): a replaced file is a new sweep
+
+    def run(self, progress: Optional[ProgressCallback] = None, include_surface: bool = False) -> OrientationResult:
+        # Progress callbacks (background jobs) cannot cross a process boundary.
+        call = offload.call if progress is None else _call_inline
+        return call(
+            orientation_optimizer.calculate_optimal_orientation,
+            self.site,
+            year=self.year,
+            tilt_step=self.tilt_step,
+            tilt_max=self.tilt_max,
+            azimuth_step=self.azimuth_step,
+            freq=self.freq,
+            strategy=self.strategy,
+            day_step=self.day_step,
+            include_surface=include_surface,
+            progress=progress,
+            max_year_shift=config.YEAR_REUSE_MAX_SHIFT_DEGREES,
+            chunk=config.OPTIMISER_CHUNK,
+            workers=config.CHUNK_WORKERS,
+            weather=None if self.weather is None else str(Path(config.WEATHER_DIR) / self.weather),
+        )
+
+
+def _weather_from_args(args: MultiDict) -> Tuple[Optional[str], Optional[Tuple[int, int]]]:
+    """The ``weather`` file name, checked to be a file in ``config.WEATHER_DIR``, and its version."""
+
+    name = args.get("weather")
+    if not name:
+        return None, None
+    if Path(name).name != name or name.startswith("."):
+        raise ValueError("weather must be the name of a file in the weather directory.")
+    try:
+        status = (Path(config.WEATHER_DIR) / name).stat()
+    except OSError:
+        raise ValueError(f"Unknown weather file {name!r}.") from None
+    return name, (status.st_size, status.st_mtime_ns)
+
+
+def _sweep_from_args(args: MultiDict) -> _Sweep:
+    site = _site_from_request(args) or solar_calculator.DEFAULT_SITE
+    year = args.get("year", type=int) or datetime.now().year
+    tilt_step = args.get("tilt_step", default=1.0, type=float)
+    tilt_max = args.get("tilt_max", default=60.0, type=float)
+    az_step = args.get("azimuth_step", default=5.0, type=float)
+    freq = args.get("freq", default="1h")
+    strategy = args.get("strategy", default="grid")
+    day_step = args.get("day_step", default=1, type=int)
+
+    if tilt_step <= 0 or tilt_max <= 0 or az_step <= 0:
+        raise ValueError("Step sizes and limits must be positive numbers.")
+    if tilt_max > 90:
+        raise ValueError("Tilt angle sweep should not exceed 90 degrees.")
+    if day_step < 1:
+        raise ValueError("day_step must be a positive integer of days.")
+    if strategy not in orientation_optimizer.SEARCH_STRATEGIES:
+        raise ValueError(f"Strategy must be one of: {', '.join(orientation_optimizer.SEARCH_STRATEGIES)}.")
+    orientation_optimizer.parse_freq(freq)
+    return _Sweep(site, year, tilt_step, tilt_max, az_step, freq, strategy, day_step, *_weather_from_args(args))
+
+
+def _surface_result(sweep: _Sweep, progress: Optional[ProgressCallback] = None) -> OrientationResult:
+    """Run (or reuse) the exhaustive sweep of ``sweep`` keeping the full energy grid."""
+
+    if sweep.strategy != "grid":
+        raise ValueError("Surface, top_k and constraint queries require strategy=grid.")
+    result, _ = _SURFACE_CACHE.get_or_set(("surface", *sweep), lambda: sweep.run(progress, include_surface=True))
+    return result
+
+
+def _range_arg(args: MultiDict, name: str) -> Optional[Tuple[float, float]]:
+    value = args.get(name)
+    if not value:
+        return None
+    try:
+        low, high = (float(part) for part in value.split(","))
+    except ValueError as exc:
+        raise ValueError(f"{name} must be two comma-separated numbers, e.g. {name}=90,270.") from exc
+    return low, high
+
+
+def _surface_payload(surface: EnergySurface) -> dict:
+    return {
+        "shape": list(surface.energy.shape),
+        "tilts": surface.tilts.tolist(),
+        "azimuths": surface.azimuths.tolist(),
+        "unit": "Wh/m2",
+        "dtype": "float32",
+        "byte_order": "little",
+        "encoding": "base64",
+        "data": base64.b64encode(surface.energy_float32().tobytes()).decode("ascii"),
+    }
+
+
+def _surface_table(payload: dict, surface: EnergySurface) -> encoding.Table:
+    """Binary orientation payload: the surface as one float32 ``energy`` row per cell, C order."""
+
+    return encoding.Table(
+        columns={"energy": surface.energy_float32().ravel()},
+        meta={
+            **payload,
+            "surface": {
+                "shape": list(surface.energy.shape),
+                "tilts": surface.tilts.tolist(),
+                "azimuths": surface.azimuths.tolist(),
+                "unit": "Wh/m2",
+            },
+        },
+    )
+
+
+def _grid_estimate(sweep: _Sweep) -> Optional[Tuple[dict, dict]]:
+    """Orientation payload interpolated from the lookup grid, plus its provenance.
+
+    ``None`` when no grid is installed, the site is outside it, or the
+    interpolated tilt exceeds the sweep's ``tilt_max``.
+    """
+
+    with stage("grid_lookup"):
+        grid = orientation_grid.get_grid(config.ORIENTATION_GRID_PATH)
+        estimate = grid.lookup(sweep.site.latitude, sweep.site.longitude) if grid is not None else None
+    if estimate is None or estimate.tilt > sweep.tilt_max:
+        return None
+    source = {
+        "source": "lookup-grid",
+        "lat_step": grid.lat_step,
+        "lon_step": grid.lon_step,
+        "build": grid.options,
+        "check": grid.check,
+    }
+    return _orientation_payload(estimate, sweep.site), source
+
+
+def _orientation_request(
+    args: MultiDict, fmt: str = encoding.JSON
+) -> Tuple[Hashable, Callable[[Optional[ProgressCallback]], Union[dict, encoding.Table]]]:
+    """Validate optimisation parameters; return the cache key and a payload builder.
+
+    ``top_k``, ``tilt_within``/``azimuth_within`` (inclusive ``low,high``;
+    azimuth ranges with ``low > high`` wrap through north) and ``surface=1``
+    are answered from the stored energy grid of the sweep, so varying them
+    does not re-run the optimisation. ``approximate=1`` (without those)
+    answers from the precomputed lookup grid when one covers the site, and
+    computes exactly otherwise; ``approximate`` in the payload says which.
+    For binary ``fmt`` the builder returns an ``encoding.Table`` whose
+    columns hold the surface, if requested.
+    ``weather=<file name>`` optimises against that measured weather file
+    (never answered from the clear-sky lookup grid).
+    """
+
+    sweep = _sweep_from_args(args)
+    top_k = args.get("top_k", type=int)
+    tilt_within = _range_arg(args, "tilt_within")
+    azimuth_within = _range_arg(args, "azimuth_within")
+    include_surface = args.get("surface", default="0").lower() in ("1", "true", "yes")
+    if top_k is not None and not 1 <= top_k <= config.MAX_TOP_K:
+        raise ValueError(f"top_k must be between 1 and {config.MAX_TOP_K}.")
+    constrained = tilt_within is not None or azimuth_within is not None
+    needs_surface = include_surface or constrained or top_k is not None
+    if needs_surface and sweep.strategy != "grid":
+        raise ValueError("Surface, top_k and constraint queries require strategy=grid.")
+    approximate = args.get("approximate", default="0").lower() in ("1", "true", "yes") and not needs_surface
+    # Resolved up front (microseconds) so an installed grid takes effect immediately.
+    estimate = _grid_estimate(sweep) if approximate and sweep.weather is None else None
+
+    def build(progress: Optional[ProgressCallback] = None) -> Union[dict, encoding.Table]:
+        payload = {
+            "year": sweep.year,
+            "tilt_step": sweep.tilt_step,
+            "tilt_max": sweep.tilt_max,
+            "azimuth_step": sweep.azimuth_step,
+            "strategy": sweep.strategy,
+            "day_step": sweep.day_step,
+        }
+        if sweep.weather is not None:
+            payload["weather"] = sweep.weather
+        if estimate is not None:
+            payload["orientation"], payload["approximate"] = estimate
+            return payload if fmt == encoding.JSON else encoding.Table(meta=payload)
+        result = _surface_result(sweep, progress) if needs_surface else sweep.run(progress)
+        payload["orientation"] = _orientation_payload(result, sweep.site)
+        if approximate:
+            payload["approximate"] = None
+        surface = result.surface
+        if constrained:
+            best = surface.best(tilt_range=tilt_within, azimuth_range=azimuth_within)
+            payload["constrained"] = {
+                "tilt_within": tilt_within,
+                "azimuth_within": azimuth_within,
+                "orientation": _orientation_payload(best, sweep.site),
+            }
+        if top_k is not None:
+            ranked = surface.top_k(top_k, tilt_range=tilt_within, azimuth_range=azimuth_within)
+            payload["top"] = [_orientation_payload(item, sweep.site) for item in ranked]
+        if fmt != encoding.JSON:
+            return _surface_table(payload, surface) if include_surface else encoding.Table(meta=payload)
+        if include_surface:
+            payload["surface"] = _surface_payload(surface)
+        return payload
+
+    key = ("optimal-orientation", *sweep, top_k, tilt_within, azimuth_within, include_surface, approximate, estimate is not None)
+    return key, build
 
 
 @app.route("/api/optimal-orientation")
 def optimal_orientation():
     try:
-        site = _site_from_request() or DEFAULT_SITE
-        year = request.args.get("year", type=int) or datetime.now().year
-        tilt_step = request.args.get("tilt_step", default=1.0, type=float)
-        tilt_max = request.args.get("tilt_max", default=60.0, type=float)
-        az_step = request.args.get("azimuth_step", default=5.0, type=float)
-        freq = request.args.get("freq", default="1h")
-
-        if tilt_step <= 0 or tilt_max <= 0 or az_step <= 0:
-            raise ValueError("Step sizes and limits must be positive numbers.")
-        if tilt_max > 90:
-            raise ValueError("Tilt angle sweep should not exceed 90 degrees.")
-
-        result = calculate_optimal_orientation(
-            site,
-            year=year,
-            tilt_step=tilt_step,
-            tilt_max=tilt_max,
-            azimuth_step=az_step,
-            freq=freq,
+        fmt = _response_format()
+        key, build = _orientation_request(request.args, fmt)
+        return _cached_payload(_ORIENTATION_CACHE, key, build, fmt=fmt, max_age=config.RESULT_CACHE_TTL)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+
+@app.route("/api/optimal-orientation/surface")
+def optimal_orientation_surface():
+    """Raw float32 (little-endian, C order) tilt x azimuth energy grid in Wh/m2.
+
+    Axes follow the sweep parameters: tilts ``0, tilt_step, ... tilt_max`` and
+    azimuths ``0, azimuth_step, ... < 360``; ``X-Surface-Shape`` gives the
+    dimensions and the ``X-Surface-*-Axis`` headers ``start,step,count``.
+    """
+
+    try:
+        sweep = _sweep_from_args(request.args)
+
+        def render() -> Tuple[bytes, Tuple[Tuple[str, str], ...]]:
+            surface = _surface_result(sweep).surface
+            n_tilts, n_azimuths = surface.energy.shape
+            headers = (
+                ("X-Surface-Shape", f"{n_tilts},{n_azimuths}"),
+                ("X-Surface-Tilt-Axis", f"{surface.tilts[0]:g},{sweep.tilt_step:g},{n_tilts}"),
+                ("X-Surface-Azimuth-Axis", f"{surface.azimuths[0]:g},{sweep.azimuth_step:g},{n_azimuths}"),
+            )
+            return surface.energy_float32().tobytes(), headers
+
+        return _cached_response(
+            _ORIENTATION_CACHE,
+            ("optimal-orientation-surface", *sweep),
+            render,
+            mimetype="application/octet-stream",
+            max_age=config.RESULT_CACHE_TTL,
         )
     except ValueError as exc:
         return jsonify({"error": str(exc)}), 400
 
+
+def _job_response(job: Job, status: int = 200) -> Response:
+    response = jsonify(job.to_dict())
+    response.status_code = status
+    response.headers["Location"] = f"/api/optimal-orientation/jobs/{job.id}"
+    return response
+
+
+@app.route("/api/optimal-orientation/jobs", methods=["POST"])
+def submit_orientation_job():
+    """Queue an optimisation in the background and return its job id (202).
+
+    Takes the same parameters as ``/api/optimal-orientation``, from the query
+    string and/or a JSON object body. An identical queued, running or recently
+    finished job is returned instead of starting a new one.
+    """
+
+    body = request.get_json(silent=True) if request.data else {}
+    try:
+        if not isinstance(body, dict):
+            raise ValueError("Request body must be a JSON object.")
+        fields = MultiDict({name: str(value) for name, value in body.items() if value is not None})
+        key, build = _orientation_request(CombinedMultiDict([fields, request.args]))
+        job = _ORIENTATION_JOBS.submit(key, build)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    except JobQueueFull as exc:
+        response = jsonify({"error": str(exc)})
+        response.status_code = 503
+        response.headers["Retry-After"] = "5"
+        return response
+    return _job_response(job, 202)
+
+
+@app.route("/api/optimal-orientation/jobs/<job_id>", methods=["GET"])
+def orientation_job(job_id: str):
+    job = _ORIENTATION_JOBS.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job id."}), 404
+    return _job_response(job)
+
+
+@app.route("/api/optimal-orientation/jobs/<job_id>", methods=["DELETE"])
+def cancel_orientation_job(job_id: str):
+    """Cancel a job; jobs are shared between identical submissions, so this cancels it for all of them."""
+
+    job = _ORIENTATION_JOBS.cancel(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job id."}), 404
+    return _job_response(job)
+
+
+@app.route("/api/cache-stats")
+def cache_stats():
+    return jsonify(
+        {
+            "sun_path": _SUN_PATH_CACHE.stats(),
+            "optimal_orientation": _ORIENTATION_CACHE.stats(),
+            "energy_surfaces": _SURFACE_CACHE.stats(),
+            "orientation_jobs": _ORIENTATION_JOBS.stats(),
+            "sun_stream": _SUN_STREAM.stats(),
+            # Reported once the optimiser is loaded; reading it must not import SciPy.
+            "surface_memo": orientation_optimizer._SURFACE_MEMO.stats() if orientation_optimizer.loaded else None,
+        }
+    )
+
+
+@app.route("/api/metrics")
+def metrics():
+    """Prometheus text exposition of cache/job counters and, if enabled, latency histograms."""
+
+    lines = []
+    caches = {
+        "sun_path": _SUN_PATH_CACHE.stats(),
+        "optimal_orientation": _ORIENTATION_CACHE.stats(),
+        "energy_surfaces": _SURFACE_CACHE.stats(),
+    }
+    for field, kind, description in (
+        ("hits", "counter", "Result cache hits."),
+        ("misses", "counter", "Result cache misses."),
+        ("evictions", "counter", "Result cache evictions (capacity or expiry)."),
+        ("size", "gauge", "Entries currently held in the result cache."),
+    ):
+        suffix = "_total" if kind == "counter" else ""
+        samples = {(("cache", name),): stats[field] for name, stats in caches.items()}
+        lines += render_metric(f"solar_cache_{field}{suffix}", kind, description, samples)
+    job_counts = _ORIENTATION_JOBS.stats()
+    lines += render_metric(
+        "solar_orientation_jobs", "gauge", "Orientation jobs by state.", {(("state", k),): v for k, v in job_counts.items()}
+    )
+    stream = _SUN_STREAM.stats()
+    for name, kind, field, description in (
+        ("solar_sun_stream_subscribers", "gauge", "subscribers", "Open sun-position streams."),
+        ("solar_sun_stream_batches_total", "counter", "batches", "Scheduler batches for sun-position streams."),
+        ("solar_sun_stream_dropped_total", "counter", "dropped", "Stream events dropped for slow clients."),
+    ):
+        lines += render_metric(name, kind, description, {(): stream[field]})
+    pool = offload.installed()
+    if pool is not None:
+        pool_stats = pool.stats()
+        for name, kind, field, description in (
+            ("solar_process_pool_pending", "gauge", "pending", "Calculations running or queued in the process pool."),
+            ("solar_process_pool_rejected_total", "counter", "rejected", "Calculations refused with 429 (pool full)."),
+            ("solar_process_pool_timeouts_total", "counter", "timed_out", "Calculations abandoned with 504 (timeout)."),
+        ):
+            lines += render_metric(name, kind, description, {(): pool_stats[field]})
+    if config.INSTRUMENTATION_ENABLED:
+        lines += _REQUEST_LATENCY.render()
+        lines += _STAGE_LATENCY.render()
+    return Response("\n".join(lines) + "\n", mimetype="text/plain; version=0.0.4")
+
+
+def warm_up() -> Dict[str, float]:
+    """Load the calculation modules and prime the default site's caches.
+
+    Call this before the worker accepts traffic (gunicorn ``post_worker_init``
+    or ``SOLAR_WARM_UP=1``); ``/api/health`` reports whether it has run.
+    """
+
+    _WARM_UP_TIMINGS.update(_warm_up_modules())
+    solar_calculator.load()
+    orientation_optimizer.load()
+    return dict(_WARM_UP_TIMINGS)
+
+
+@app.route("/api/health")
+def health():
     return jsonify(
         {
-            "year": year,
-            "tilt_step": tilt_step,
-            "tilt_max": tilt_max,
-            "azimuth_step": az_step,
-            "orientation": _orientation_payload(result, site),
+            "status": "ok",
+            "warmed_up": bool(_WARM_UP_TIMINGS),
+            "warm_up_ms": {name: round(seconds * 1000, 1) for name, seconds in _WARM_UP_TIMINGS.items()},
+            "modules_loaded": solar_calculator.loaded and orientation_optimizer.loaded,
+            "process_pool": offload.installed().stats() if offload.installed() else None,
         }
     )
 
@@ -203,5 +1142,9 @@ def js(filename: str):
     return send_from_directory(FRONTEND_DIR / "js", filename)
 
 
+if config.WARM_UP_ON_START:
+    warm_up()
+
+
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=8000, debug=True)
@@ -0,0 +1,309 @@
+"""ASGI serving mode: the Flask routes on an event loop, calculations in a process pool.
+
+Serve with any ASGI 3 server, e.g.::
+
+    uvicorn backend.asgi:app --host 0.0.0.0 --port 8000
+
+Every route of ``backend.app`` is served unchanged through a small
+WSGI bridge:
+
+* ``INLINE_ENDPOINTS`` (the health check) run directly on the event loop;
+* every other view runs on a pool of ``SOLAR_ASGI_THREADS`` threads, since
+  even light ones may import pandas/pvlib or run SPA on first use and must
+  not stall the loop; a request arriving while all threads are busy gets
+  429 at once;
+* within those, optimisations and sun paths go through ``backend.offload``
+  to ``SOLAR_ASGI_PROCESSES`` worker processes, with 429 once
+  ``SOLAR_ASGI_MAX_PENDING`` calculations are running or queued and 504
+  after ``SOLAR_ASGI_TIMEOUT`` seconds.
+
+Streamed bodies (multi-day sun paths, SSE) are produced in the request's
+thread and sent chunk by chunk; the stream is closed once the client
+disconnects. The pools start with the ASGI lifespan, which also runs
+``backend.app.warm_up`` so the calculation modules are loaded before traffic
+arrives, or on the first request if the server sends no lifespan events. Run one server worker: the process
+pool provides the parallelism, and the result caches, job queue and SSE
+scheduler then stay shared by all requests.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import io
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from flask import Flask
+
+from . import config, offload
+from .app import app as flask_app
+from .app import warm_up as warm_up_app
+
+Message = Dict[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+
+# Views cheap enough to answer on the event loop; they must never import or calculate.
+INLINE_ENDPOINTS = frozenset({"health"})
+
+_BUSY_BODY = b'{"error": "Server busy; retry shortly."}\n'
+
+
+def _environ(scope: Dict[str, Any], body: bytes) -> Dict[str, Any]:
+    """WSGI environ for an ASGI HTTP scope (PEP 3333 string conventions)."""
+
+    server = scope.get("server") or ("localhost", 80)
+    client = scope.get("client") or ("", 0)
+    root_path = scope.get("root_path", "")
+    path = scope["path"]
+    if root_path and path.startswith(root_path):
+        path = path[len(root_path) :]
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": root_path.encode("utf-8").decode("latin-1"),
+        "PATH_INFO": path.encode("utf-8").decode("latin-1"),
+        "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1]),
+        "REMOTE_ADDR": client[0],
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.input_terminated": True,
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+    }
+    for raw_name, raw_value in scope.get("headers", []):
+        name, value = raw_name.decode("latin-1").lower(), raw_value.decode("latin-1")
+        if name == "content-type":
+            environ["CONTENT_TYPE"] = value
+        elif name == "content-length":
+            environ["CONTENT_LENGTH"] = value
+        else:
+            key = "HTTP_" + name.upper().replace("-", "_")
+            environ[key] = f"{environ[key]},{value}" if key in environ else value
+    # The body is fully buffered, so its length is known even for chunked uploads.
+    environ["CONTENT_LENGTH"] = str(len(body))
+    return environ
+
+
+def _start_message(status: str, headers: List[Tuple[str, str]]) -> Message:
+    return {
+        "type": "http.response.start",
+        "status": int(status.split(" ", 1)[0]),
+        "headers": [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers],
+    }
+
+
+class AsgiBridge:
+    """ASGI application serving a Flask app as described in the module docstring.
+
+    ``processes=0`` keeps calculations in the handler threads (no process pool).
+    ``warm_up`` runs in a pool thread during lifespan startup.
+    """
+
+    def __init__(
+        self,
+        wsgi_app: Flask,
+        *,
+        threads: int = config.ASGI_THREADS,
+        processes: int = config.ASGI_PROCESS_WORKERS,
+        max_pending: int = config.ASGI_MAX_PENDING,
+        timeout: float = config.ASGI_REQUEST_TIMEOUT,
+        inline_endpoints: Iterable[str] = INLINE_ENDPOINTS,
+        warm_up: Optional[Callable[[], Any]] = None,
+    ) -> None:
+        self.wsgi_app = wsgi_app
+        self.threads = threads
+        self.processes = processes
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.inline_endpoints = frozenset(inline_endpoints)
+        self.warm_up = warm_up
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._offloader: Optional[offload.ProcessOffloader] = None
+        self._busy = 0
+        self._start_lock = threading.Lock()
+
+    def start(self) -> None:
+        with self._start_lock:
+            if self._executor is not None:
+                return
+            if self.processes > 0 and offload.installed() is None:
+                self._offloader = offload.ProcessOffloader(
+                    workers=self.processes, max_pending=self.max_pending, timeout=self.timeout
+                )
+                offload.install(self._offloader)
+            self._executor = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix="solar-asgi")
+
+    def stop(self) -> None:
+        with self._start_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+            if self._offloader is not None:
+                if offload.installed() is self._offloader:
+                    offload.install(None)
+                self._offloader.shutdown()
+                self._offloader = None
+
+    async def __call__(self, scope: Dict[str, Any], receive: Receive, send: Send) -> None:
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+        elif scope["type"] == "http":
+            await self._http(scope, receive, send)
+        else:
+            raise ValueError(f"Unsupported ASGI scope type: {scope['type']}")
+
+    async def _lifespan(self, receive: Receive, send: Send) -> None:
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                try:
+                    self.start()
+                    if self.warm_up is not None:
+                        await asyncio.get_running_loop().run_in_executor(self._executor, self.warm_up)
+                except Exception as exc:  # reported to the server, which refuses to start
+                    await send({"type": "lifespan.startup.failed", "message": str(exc)})
+                    return
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self.stop()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    def _endpoint(self, environ: Dict[str, Any]) -> Optional[str]:
+        try:
+            endpoint, _ = self.wsgi_app.url_map.bind_to_environ(environ).match()
+        except Exception:  # 404/405/redirects: Flask renders those itself
+            return None
+        return endpoint
+
+    def _call_wsgi(self, environ: Dict[str, Any]) -> Tuple[str, List[Tuple[str, str]], Iterable[bytes]]:
+        started: List[Any] = []
+
+        def write(data: bytes) -> None:
+            raise RuntimeError("The WSGI write() callable is not supported; return an iterable body.")
+
+        def start_response(status: str, headers: List[Tuple[str, str]], exc_info: Any = None):
+            started[:] = [status, headers]
+            return write
+
+        result = self.wsgi_app(environ, start_response)
+        return started[0], started[1], result
+
+    async def _http(self, scope: Dict[str, Any], receive: Receive, send: Send) -> None:
+        self.start()
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        environ = _environ(scope, b"".join(chunks))
+        if self._endpoint(environ) in self.inline_endpoints:
+            await self._respond_inline(environ, send)
+            return
+        if self._busy >= self.threads:
+            await send(_start_message("429 Too Many Requests", [("Content-Type", "application/json"), ("Retry-After", "5")]))
+            await send({"type": "http.response.body", "body": _BUSY_BODY})
+            return
+        self._busy += 1
+        try:
+            await self._respond_threaded(environ, receive, send)
+        finally:
+            self._busy -= 1
+
+    async def _respond_inline(self, environ: Dict[str, Any], send: Send) -> None:
+        status, headers, result = self._call_wsgi(environ)
+        try:
+            await send(_start_message(status, headers))
+            for chunk in result:
+                if chunk:
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        finally:
+            close = getattr(result, "close", None)
+            if close is not None:
+                close()
+        await send({"type": "http.response.body", "body": b""})
+
+    async def _respond_threaded(self, environ: Dict[str, Any], receive: Receive, send: Send) -> None:
+        """Run the handler and iterate its body in one thread, relaying chunks as they come.
+
+        A single thread per request keeps Flask's context variables and the
+        body generator on one thread; the queue holds one chunk, so a slow
+        client slows the producer instead of buffering the whole stream.
+        """
+
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+        disconnected = threading.Event()
+
+        def put(item: Tuple[Any, ...]) -> None:
+            asyncio.run_coroutine_threadsafe(queue.put(item), loop).result()
+
+        def produce() -> None:
+            try:
+                status, headers, result = self._call_wsgi(environ)
+                put(("start", status, headers))
+                try:
+                    for chunk in result:
+                        if disconnected.is_set():
+                            break
+                        if chunk:
+                            put(("body", chunk))
+                finally:
+                    close = getattr(result, "close", None)
+                    if close is not None:
+                        close()
+                put(("end",))
+            except BaseException as exc:  # handed to the event loop, which re-raises it
+                put(("error", exc))
+
+        assert self._executor is not None
+        producer = loop.run_in_executor(self._executor, produce)
+        watcher = asyncio.ensure_future(self._wait_for_disconnect(receive))
+        started = False
+        try:
+            while True:
+                getter = asyncio.ensure_future(queue.get())
+                await asyncio.wait({getter, watcher}, return_when=asyncio.FIRST_COMPLETED)
+                if not getter.done():
+                    # Client gone: stop the producer after its current chunk and
+                    # keep draining so it never blocks on a full queue.
+                    disconnected.set()
+                item = await getter
+                kind = item[0]
+                if kind == "error":
+                    raise item[1]
+                if kind == "end":
+                    break
+                if disconnected.is_set():
+                    continue
+                if kind == "start":
+                    started = True
+                    await send(_start_message(item[1], item[2]))
+                else:
+                    await send({"type": "http.response.body", "body": item[1], "more_body": True})
+            if started and not disconnected.is_set():
+                await send({"type": "http.response.body", "body": b""})
+        finally:
+            watcher.cancel()
+            await producer
+
+    @staticmethod
+    async def _wait_for_disconnect(receive: Receive) -> None:
+        while (await receive())["type"] != "http.disconnect":
+            pass
+
+
+app = AsgiBridge(flask_app, warm_up=warm_up_app)
+
+__all__ = ["AsgiBridge", "INLINE_ENDPOINTS", "app"]
@@ -0,0 +1,306 @@
+"""Caching helpers shared by the solar calculation modules."""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import mmap
+import os
+import re
+import tempfile
+import threading
+import time
+import zipfile
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, Iterator, Optional, Tuple
+
+import numpy as np
+
+try:  # POSIX advisory locks; elsewhere only threads of one process are serialised.
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+ArrayBundle = Dict[str, np.ndarray]
+
+_CONTENT_KEY = re.compile("[0-9a-f]{64}")
+
+
+def content_key(**params: object) -> str:
+    """Return a stable hash for JSON-serialisable keyword parameters."""
+
+    payload = json.dumps(params, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ArrayDiskCache:
+    """Content-addressed store of named NumPy arrays in uncompressed ``.npz`` files.
+
+    Each entry is written to a temporary file and atomically renamed into
+    place, so concurrent readers (threads or worker processes) only ever see
+    complete files. ``get_or_compute`` also holds an advisory file lock while
+    computing, so worker processes sharing the directory compute a missing
+    entry once between them. Reads refresh the file modification time, and
+    stores evict the least recently used entries once ``max_bytes`` is
+    exceeded. Passing ``directory=None`` disables the cache; every lookup is
+    then a miss.
+    """
+
+    suffix = ".npz"
+    # Suffixes of entries written by an earlier format. Files named like a
+    # ``content_key`` with one of them are never read and are deleted once,
+    # when the cache is created.
+    legacy_suffixes: Tuple[str, ...] = ()
+    # Thread and file locks are shared by keys with the same hash bucket, so they stay few.
+    lock_buckets = 64
+
+    def __init__(self, directory: str | os.PathLike | None, *, max_bytes: int) -> None:
+        self.directory = Path(directory) if directory else None
+        self.max_bytes = max_bytes
+        self._locks = [threading.Lock() for _ in range(self.lock_buckets)]
+        if self.enabled:
+            self._remove_legacy()
+
+    @property
+    def enabled(self) -> bool:
+        return self.directory is not None
+
+    def _path(self, key: str) -> Path:
+        assert self.directory is not None
+        return self.directory / f"{key}{self.suffix}"
+
+    def _bucket(self, key: str) -> int:
+        return int(hashlib.sha256(key.encode("utf-8")).hexdigest(), 16) % self.lock_buckets
+
+    def _lock_for(self, key: str) -> threading.Lock:
+        return self._locks[self._bucket(key)]
+
+    @contextlib.contextmanager
+    def _file_lock(self, key: str) -> Iterator[None]:
+        if fcntl is None or not self.enabled:
+            yield
+            return
+        assert self.directory is not None
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.directory / f".lock-{self._bucket(key):02d}", "a+b") as handle:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+    def _read(self, path: Path) -> ArrayBundle:
+        with np.load(path, allow_pickle=False) as archive:
+            return {name: archive[name] for name in archive.files}
+
+    def _write(self, handle, arrays: ArrayBundle) -> None:
+        np.savez(handle, **arrays)
+
+    def load(self, key: str) -> Optional[ArrayBundle]:
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            arrays = self._read(path)
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, zipfile.BadZipFile):
+            # Truncated or foreign file: drop it and recompute.
+            path.unlink(missing_ok=True)
+            return None
+        return arrays
+
+    def store(self, key: str, arrays: ArrayBundle) -> None:
+        if not self.enabled:
+            return
+        assert self.directory is not None
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                self._write(handle, arrays)
+            os.replace(tmp_name, self._path(key))
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        self.evict()
+
+    def get_or_compute(self, key: str, compute: Callable[[], ArrayBundle]) -> ArrayBundle:
+        """Return the cached bundle for ``key``, computing it at most once across processes."""
+
+        arrays = self.load(key)
+        if arrays is not None:
+            return arrays
+        with self._lock_for(key), self._file_lock(key):
+            arrays = self.load(key)
+            if arrays is None:
+                arrays = compute()
+                self.store(key, arrays)
+        return arrays
+
+    def evict(self) -> None:
+        """Delete least recently used entries until the cache fits ``max_bytes``."""
+
+        if not self.enabled:
+            return
+        assert self.directory is not None
+        entries = []
+        for path in self.directory.glob(f"*{self.suffix}"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def clear(self) -> None:
+        if not self.enabled:
+            return
+        assert self.directory is not None
+        for path in self.directory.glob(f"*{self.suffix}"):
+            path.unlink(missing_ok=True)
+
+    def _remove_legacy(self) -> None:
+        assert self.directory is not None
+        for suffix in self.legacy_suffixes:
+            for path in self.directory.glob(f"*{suffix}"):
+                if _CONTENT_KEY.fullmatch(path.name[: -len(suffix)]):
+                    path.unlink(missing_ok=True)
+
+
+class MappedArrayCache(ArrayDiskCache):
+    """``ArrayDiskCache`` whose hits are memory-mapped instead of read.
+
+    An entry is a JSON header followed by the raw arrays, each 64-byte
+    aligned. ``load`` maps the file read-only and returns views into it, so
+    a hit costs no read or copy whatever its size, and all worker processes
+    using the directory share one copy of the data in the OS page cache.
+    Returned arrays are read-only. An evicted or replaced file stays valid
+    for views that still reference it (POSIX unlink semantics).
+    """
+
+    suffix = ".arrays"
+    # The meteorology and sun-table caches stored ``.npz`` bundles before.
+    legacy_suffixes = (".npz",)
+    _MAGIC = b"SOLARRAY"
+    _ALIGN = 64
+
+    def _write(self, handle, arrays: ArrayBundle) -> None:
+        arrays = {name: np.asarray(values, order="C") for name, values in arrays.items()}
+        if any(values.dtype.hasobject for values in arrays.values()):
+            raise ValueError("Object arrays cannot be memory-mapped.")
+        entries, offset = [], 0
+        for name, values in arrays.items():
+            entries.append({"name": name, "dtype": values.dtype.str, "shape": values.shape, "offset": offset})
+            offset += -(-values.nbytes // self._ALIGN) * self._ALIGN
+        header = json.dumps(entries).encode("utf-8")
+        start = -(-(len(self._MAGIC) + 8 + len(header)) // self._ALIGN) * self._ALIGN
+        handle.write(self._MAGIC + len(header).to_bytes(8, "little") + header)
+        handle.write(b"\0" * (start - handle.tell()))
+        for entry, values in zip(entries, arrays.values()):
+            handle.write(b"\0" * (start + entry["offset"] - handle.tell()))
+            handle.write(values.reshape(-1).view(np.uint8))
+
+    def _read(self, path: Path) -> ArrayBundle:
+        with open(path, "rb") as handle:
+            # The mapping outlives the file handle; the arrays keep it alive.
+            buffer = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        if buffer[: len(self._MAGIC)] != self._MAGIC:
+            raise ValueError(f"{path.name}: not a mapped array bundle")
+        size = int.from_bytes(buffer[len(self._MAGIC) : len(self._MAGIC) + 8], "little")
+        begin = len(self._MAGIC) + 8
+        entries = json.loads(buffer[begin : begin + size].decode("utf-8"))
+        start = -(-(begin + size) // self._ALIGN) * self._ALIGN
+        arrays = {}
+        for entry in entries:
+            dtype, shape = np.dtype(entry["dtype"]), tuple(entry["shape"])
+            count = int(np.prod(shape, dtype=np.int64))
+            offset = start + entry["offset"]
+            if offset + count * dtype.itemsize > len(buffer):
+                raise ValueError(f"{path.name}: truncated mapped array bundle")
+            values = np.frombuffer(buffer, dtype=dtype, count=count, offset=offset) if count else np.empty(0, dtype)
+            values = values.reshape(shape)
+            values.flags.writeable = False
+            arrays[entry["name"]] = values
+        return arrays
+
+
+class TTLCache:
+    """Thread-safe in-memory LRU cache whose entries also expire after ``ttl`` seconds.
+
+    ``maxsize=0`` disables caching while still counting misses.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, *, timer: Callable[[], float] = time.monotonic) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._timer = timer
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """Return ``(found, value)`` and refresh the entry's recency on a hit."""
+
+        now = self._timer()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, entry[1]
+            if entry is not None:
+                del self._entries[key]
+                self.evictions += 1
+            self.misses += 1
+            return False, None
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if self.maxsize <= 0:
+            return
+        expires = self._timer() + self.ttl
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_set(self, key: Hashable, compute: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Return ``(value, hit)``, computing and storing ``value`` on a miss."""
+
+        found, value = self.get(key)
+        if found:
+            return value, True
+        value = compute()
+        self.set(key, value)
+        return value, False
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            size = len(self._entries)
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": size,
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+        }
+
+
+__all__ = ["ArrayBundle", "ArrayDiskCache", "MappedArrayCache", "TTLCache", "content_key"]
@@ -1,5 +1,10 @@
 """Configuration constants for Solar Mirror Optimizer backend."""
 
+import os
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+
 LATITUDE = 10.8231
 LONGITUDE = 106.6297
 ALTITUDE = 19
@@ -13,3 +18,104 @@ UPDATE_INTERVAL = 60  # seconds between sun path samples
 DEFAULT_SPEED = 1
 MAX_SPEED = 300
 FPS_TARGET = 30
+
+# On-disk cache of annual solar position / clear-sky arrays per site.
+# Set SOLAR_METEOROLOGY_CACHE_DIR to an empty string to disable it.
+METEOROLOGY_CACHE_DIR = os.environ.get("SOLAR_METEOROLOGY_CACHE_DIR", str(BASE_DIR / ".cache" / "meteorology"))
+METEOROLOGY_CACHE_MAX_BYTES = int(os.environ.get("SOLAR_METEOROLOGY_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+
+# In-process memoisation of deterministic API responses.
+RESULT_CACHE_SIZE = int(os.environ.get("SOLAR_RESULT_CACHE_SIZE", 256))
+RESULT_CACHE_TTL = int(os.environ.get("SOLAR_RESULT_CACHE_TTL", 3600))  # seconds
+# Full tilt x azimuth energy grids kept for top-K / constrained queries; fine
+# grids are large (0.1 deg steps: ~17 MB each), hence the separate limit.
+SURFACE_CACHE_SIZE = int(os.environ.get("SOLAR_SURFACE_CACHE_SIZE", 16))
+MAX_TOP_K = 100
+
+# Orientation sweeps over sub-hourly data stream the year in chunks
+# ("auto": monthly when freq < 1h; "month"/"week" always; "" never) so that
+# peak memory does not grow with freq. CHUNK_WORKERS chunks run concurrently.
+OPTIMISER_CHUNK = os.environ.get("SOLAR_OPTIMISER_CHUNK", "auto") or None
+CHUNK_WORKERS = int(os.environ.get("SOLAR_CHUNK_WORKERS", 1))
+
+# Evaluated tilt/azimuth cells kept per (site, year, freq, day_step) so that
+# re-runs with a larger tilt_max or finer steps only evaluate new cells; each
+# context holds at most SURFACE_MEMO_MAX_CELLS float64 values (~17 MB).
+SURFACE_MEMO_SIZE = int(os.environ.get("SOLAR_SURFACE_MEMO_SIZE", 8))
+SURFACE_MEMO_MAX_CELLS = 2_200_000
+
+# The API answers a year from another cached year's grid (same leap status)
+# when the sun positions of the two years differ by at most this many degrees
+# on average; annual totals then differ by ~1e-4. 0 always recomputes.
+YEAR_REUSE_MAX_SHIFT_DEGREES = float(os.environ.get("SOLAR_YEAR_REUSE_MAX_SHIFT", 0.15))
+
+# Upper bound on (site x timestamp) pairs accepted by POST /api/sun-positions.
+MAX_BATCH_POSITIONS = int(os.environ.get("SOLAR_MAX_BATCH_POSITIONS", 200_000))
+
+# Heliostat fields (POST /api/heliostat-field): most mirrors per request, and
+# the most mirror x timestamp cells returned as JSON matrices (binary
+# formats stream any size).
+MAX_FIELD_MIRRORS = int(os.environ.get("SOLAR_MAX_FIELD_MIRRORS", 20_000))
+MAX_FIELD_DETAIL_CELLS = int(os.environ.get("SOLAR_MAX_FIELD_DETAIL_CELLS", 200_000))
+
+# Lookup grid built by ``python -m backend.orientation_grid``; answers
+# ``approximate=1`` orientation requests. A missing file just disables it.
+ORIENTATION_GRID_PATH = os.environ.get("SOLAR_ORIENTATION_GRID", str(BASE_DIR / "data" / "orientation-grid.npz"))
+
+# Measured weather files (EPW, TMY3 or CSV; see backend.weather). The API
+# only accepts ``weather=<file name>`` for files in WEATHER_DIR. Parsed
+# columns are kept in WEATHER_CACHE_DIR ("" disables it) so each file is
+# parsed once.
+WEATHER_DIR = os.environ.get("SOLAR_WEATHER_DIR", str(BASE_DIR / "data" / "weather"))
+WEATHER_CACHE_DIR = os.environ.get("SOLAR_WEATHER_CACHE_DIR", str(BASE_DIR / ".cache" / "weather"))
+WEATHER_CACHE_MAX_BYTES = int(os.environ.get("SOLAR_WEATHER_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+# Largest latitude/longitude difference (degrees) between a site and the
+# coordinates recorded in its weather file.
+WEATHER_MAX_SITE_OFFSET = 1.0
+
+# Days computed per vectorised SPA pass when streaming multi-day sun paths,
+# and the longest range /api/sun-path accepts in start/end mode.
+SUN_PATH_CHUNK_DAYS = 31
+MAX_SUN_PATH_DAYS = int(os.environ.get("SOLAR_MAX_SUN_PATH_DAYS", 366 * 10))
+
+# Live sun-position stream (GET /api/sun-position/stream): scheduler tick in
+# seconds (clients may ask for a multiple of it), keep-alive comment period
+# and the most sites one stream may follow.
+SUN_STREAM_INTERVAL = float(os.environ.get("SOLAR_SUN_STREAM_INTERVAL", 5))
+SUN_STREAM_KEEPALIVE = 15.0
+MAX_STREAM_SITES = 16
+
+# Precomputed per-site sun-position tables (see backend.sun_table).
+SUN_TABLE_STEP_MINUTES = 5
+SUN_TABLE_CACHE_DIR = os.environ.get("SOLAR_SUN_TABLE_CACHE_DIR", str(BASE_DIR / ".cache" / "sun-tables"))
+SUN_TABLE_CACHE_MAX_BYTES = int(os.environ.get("SOLAR_SUN_TABLE_CACHE_MAX_BYTES", 128 * 1024 * 1024))
+
+# Background optimisation jobs (POST /api/optimal-orientation/jobs).
+JOB_WORKERS = int(os.environ.get("SOLAR_JOB_WORKERS", 2))
+MAX_PENDING_JOBS = int(os.environ.get("SOLAR_MAX_PENDING_JOBS", 32))
+JOB_RETENTION_SECONDS = int(os.environ.get("SOLAR_JOB_RETENTION_SECONDS", 3600))
+
+# ASGI serving mode (backend.asgi): processes running optimisations and sun
+# paths, how many such calculations may run or wait before requests get 429,
+# seconds a request waits for its calculation (504 after), and threads for
+# the handlers that calculate or stream (more concurrent ones get 429).
+ASGI_PROCESS_WORKERS = int(os.environ.get("SOLAR_ASGI_PROCESSES", os.cpu_count() or 1))
+ASGI_MAX_PENDING = int(os.environ.get("SOLAR_ASGI_MAX_PENDING", 2 * ASGI_PROCESS_WORKERS))
+ASGI_REQUEST_TIMEOUT = float(os.environ.get("SOLAR_ASGI_TIMEOUT", 60))
+ASGI_THREADS = int(os.environ.get("SOLAR_ASGI_THREADS", 64))
+
+# Opt-in request instrumentation: per-stage Server-Timing headers and latency
+# histograms on /api/metrics, and the ?profile=1 cProfile switch.
+INSTRUMENTATION_ENABLED = os.environ.get("SOLAR_INSTRUMENTATION", "0").lower() in ("1", "true", "yes")
+PROFILING_ENABLED = os.environ.get("SOLAR_PROFILING", "0").lower() in ("1", "true", "yes")
+PROFILE_TOP_FUNCTIONS = 40
+
+# Run backend.warmup.warm_up when the app module is imported, so workers load
+# pandas/pvlib and prime the default site's caches before accepting traffic.
+WARM_UP_ON_START = os.environ.get("SOLAR_WARM_UP", "0").lower() in ("1", "true", "yes")
+
+# Default SPA implementation for sun positions, sun paths and heliostat fields
+# (see backend.solar_calculator.SPA_ENGINES). "pandas" is
+# solarposition.spa_python; "numpy" (vectorised) and "table" (interpolated
+# sun tables, see below) are opt-in fast paths.
+SPA_ENGINE = os.environ.get("SOLAR_SPA_ENGINE", "pandas")
@@ -0,0 +1,169 @@
+"""Binary columnar encodings for API responses.
+
+JSON stays the default response format. Clients that move many samples
+(batch positions, multi-day sun paths, orientation surfaces) can send
+``Accept: application/vnd.apache.arrow.stream`` or
+``Accept: application/x-msgpack`` and receive the underlying NumPy arrays
+without building per-value Python objects:
+
+* Arrow IPC stream: one record batch per ``Table``. ``Table.meta`` is JSON
+  text under the ``meta`` key of the schema metadata (single tables) or of
+  each batch's custom metadata (streams, whose own ``meta`` goes in the
+  schema). Datetime columns are ``timestamp[ns, tz=UTC]``.
+* MessagePack: one map ``{"meta": {...}, "columns": {name: {"dtype", "data"}}}``
+  per table, ``data`` being the raw little-endian column bytes and
+  ``dtype`` a NumPy dtype name; datetime columns are int64 nanoseconds
+  since the Unix epoch (UTC) with dtype ``datetime64[ns]``. Streams are a
+  ``{"meta": {...}}`` header map followed by one map per table, read back
+  with ``msgpack.Unpacker``.
+
+``pyarrow`` and ``msgpack`` are optional; a format is only offered when its
+library is installed.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import io
+import json
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, Optional, Tuple
+
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    import numpy as np
+    from werkzeug.datastructures import MIMEAccept
+
+JSON = "application/json"
+ARROW = "application/vnd.apache.arrow.stream"
+MSGPACK = "application/x-msgpack"
+FORMATS = (JSON, ARROW, MSGPACK)
+
+_LIBRARIES = {ARROW: "pyarrow", MSGPACK: "msgpack"}
+
+
+class FormatUnavailable(Exception):
+    """The client only accepts binary formats whose library is not installed."""
+
+
+@dataclass(frozen=True)
+class Table:
+    """Equal-length 1-D NumPy columns plus JSON-compatible metadata."""
+
+    columns: Dict[str, np.ndarray] = field(default_factory=dict)
+    meta: dict = field(default_factory=dict)
+
+
+@lru_cache(maxsize=None)
+def available_formats() -> Tuple[str, ...]:
+    return tuple(fmt for fmt in FORMATS if fmt not in _LIBRARIES or importlib.util.find_spec(_LIBRARIES[fmt]))
+
+
+def negotiate(accept: MIMEAccept) -> str:
+    """Pick the response format for an ``Accept`` header.
+
+    Anything that does not ask for a binary format (no header, ``*/*``,
+    ``text/html``) gets JSON.
+    """
+
+    best = accept.best_match(available_formats())
+    if best is None and accept.best_match(FORMATS[1:]) is not None:
+        missing = [_LIBRARIES[fmt] for fmt in FORMATS[1:] if fmt not in available_formats()]
+        raise FormatUnavailable(
+            f"Binary responses need the optional {' / '.join(missing)} package; accept {JSON} instead."
+        )
+    return best or JSON
+
+
+def _arrow_batch(table: Table, metadata: Optional[dict] = None):
+    import pyarrow as pa
+
+    arrays, names = [], []
+    for name, values in table.columns.items():
+        kind = pa.timestamp("ns", tz="UTC") if values.dtype.kind == "M" else None
+        arrays.append(pa.array(values.astype("datetime64[ns]") if kind else values, type=kind))
+        names.append(name)
+    schema = pa.schema(
+        [pa.field(name, array.type) for name, array in zip(names, arrays)],
+        metadata={"meta": json.dumps(metadata)} if metadata is not None else None,
+    )
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def _arrow_stream(tables: Iterable[Table], meta: Optional[dict]) -> Iterator[bytes]:
+    """Write an IPC stream, yielding bytes as each batch is written.
+
+    Without ``meta`` the single table's own metadata goes in the schema;
+    with it, every batch carries its table's metadata.
+    """
+
+    import pyarrow as pa
+
+    sink = io.BytesIO()
+    writer = None
+    for table in tables:
+        batch = _arrow_batch(table, table.meta if meta is None else meta)
+        if writer is None:
+            writer = pa.ipc.new_stream(sink, batch.schema)
+        if meta is None:
+            writer.write_batch(batch)
+        else:
+            writer.write_batch(batch, custom_metadata={"meta": json.dumps(table.meta)})
+        yield sink.getvalue()
+        sink.seek(0)
+        sink.truncate()
+    if writer is not None:
+        writer.close()
+        yield sink.getvalue()
+
+
+def _msgpack_column(values: np.ndarray) -> dict:
+    if values.dtype.kind == "M":
+        return {"dtype": "datetime64[ns]", "data": values.astype("datetime64[ns]").view("<i8").tobytes()}
+    data = values.astype(values.dtype.newbyteorder("<"), copy=False)
+    return {"dtype": data.dtype.name, "data": data.tobytes()}
+
+
+def _msgpack_table(table: Table) -> dict:
+    return {"meta": table.meta, "columns": {name: _msgpack_column(values) for name, values in table.columns.items()}}
+
+
+def encode(table: Table, fmt: str) -> bytes:
+    """Serialise one table as ``fmt`` (``ARROW`` or ``MSGPACK``)."""
+
+    if fmt == ARROW:
+        return b"".join(_arrow_stream([table], None))
+    if fmt == MSGPACK:
+        import msgpack
+
+        return msgpack.packb(_msgpack_table(table))
+    raise ValueError(f"Unsupported binary format: {fmt}")
+
+
+def encode_stream(tables: Iterable[Table], fmt: str, meta: dict) -> Iterator[bytes]:
+    """Serialise ``tables`` incrementally as one ``fmt`` stream with stream-level ``meta``."""
+
+    if fmt == ARROW:
+        yield from _arrow_stream(tables, meta)
+    elif fmt == MSGPACK:
+        import msgpack
+
+        yield msgpack.packb({"meta": meta})
+        for table in tables:
+            yield msgpack.packb(_msgpack_table(table))
+    else:
+        raise ValueError(f"Unsupported binary format: {fmt}")
+
+
+__all__ = [
+    "ARROW",
+    "FORMATS",
+    "FormatUnavailable",
+    "JSON",
+    "MSGPACK",
+    "Table",
+    "available_formats",
+    "encode",
+    "encode_stream",
+    "negotiate",
+]
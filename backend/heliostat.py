@@ -0,0 +1,169 @@
+"""Mirror orientations of a heliostat field aiming at a shared receiver.
+
+A heliostat reflects the sun onto the receiver when its normal bisects the
+unit vectors from the mirror towards the sun ``s`` and towards the receiver
+``r``. For a whole field no per-pair vectors are needed: with ``d = s . r``,
+one ``(timestamps x 3) @ (3 x mirrors)`` product,
+
+* the cosine efficiency is ``cos(theta) = s . n = sqrt((1 + d) / 2)``,
+* ``|s + r| = 2 cos(theta)``, so the normal's upward component (and with it
+  the tilt) is ``(s_up + r_up) / (2 cos(theta))``,
+* the normal's azimuth is ``atan2(s_east + r_east, s_north + r_north)``.
+
+Positions are metres east/north/up of the site; the sun direction is the
+same for every mirror. Tilt and azimuth follow the panel convention of
+``orientation_optimizer`` (tilt 0 = facing up, azimuth clockwise from north).
+Timestamps are processed in blocks of at most ``MAX_BLOCK_ELEMENTS``
+mirror-timestamp cells, so temporaries stay bounded and the work grows
+linearly with mirrors x timestamps.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date
+from typing import Iterator, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from . import config
+from .instrumentation import stage
+from .solar_calculator import DEFAULT_SITE, SiteParameters, _day_sample_times, _parse_date, solar_position_arrays
+
+# Mirror x timestamp cells per vectorised block (bounds the float64 temporaries).
+MAX_BLOCK_ELEMENTS = 1_000_000
+
+
+@dataclass(frozen=True)
+class FieldBlock:
+    """Orientations for consecutive timestamps (rows) of every mirror (columns)."""
+
+    timestamps: pd.DatetimeIndex  # UTC; only samples with the sun above the horizon
+    sun_elevation: np.ndarray
+    sun_azimuth: np.ndarray
+    tilt: np.ndarray  # degrees, float32, shape (timestamps, mirrors)
+    azimuth: np.ndarray
+    cosine: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+
+def _sun_vectors(elevation: np.ndarray, azimuth: np.ndarray) -> np.ndarray:
+    elevation, azimuth = np.radians(elevation), np.radians(azimuth)
+    horizontal = np.cos(elevation)
+    return np.stack([horizontal * np.sin(azimuth), horizontal * np.cos(azimuth), np.sin(elevation)], axis=1)
+
+
+def receiver_directions(mirrors: Sequence[Sequence[float]], receiver: Sequence[float]) -> np.ndarray:
+    """Unit vectors from each ``(east, north, up)`` mirror position to the receiver."""
+
+    positions = np.asarray(mirrors, dtype=float)
+    target = np.asarray(receiver, dtype=float)
+    if positions.ndim != 2 or positions.shape[1] != 3 or not len(positions):
+        raise ValueError("Mirrors must be a non-empty list of [east, north, up] positions in metres.")
+    if target.shape != (3,):
+        raise ValueError("The receiver must be an [east, north, up] position in metres.")
+    offsets = target - positions
+    distance = np.linalg.norm(offsets, axis=1)
+    if not np.all(np.isfinite(distance)) or np.any(distance == 0):
+        raise ValueError("Mirror positions must be finite and differ from the receiver position.")
+    return offsets / distance[:, None]
+
+
+def mirror_normals(sun: np.ndarray, targets: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return float32 ``(tilt, azimuth, cosine)`` arrays of shape ``(len(sun), len(targets))``.
+
+    ``sun`` holds unit sun vectors per timestamp and ``targets`` unit vectors
+    from each mirror to the receiver (``receiver_directions``).
+    """
+
+    cosine = sun @ targets.T
+    np.clip(cosine, -1.0, 1.0, out=cosine)
+    cosine += 1.0
+    cosine *= 0.5
+    np.sqrt(cosine, out=cosine)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # The receiver exactly opposite the sun leaves the normal undefined (NaN).
+        up = np.add.outer(sun[:, 2], targets[:, 2])
+        up /= 2.0 * cosine
+    tilt = np.degrees(np.arccos(np.clip(up, -1.0, 1.0, out=up), out=up), out=up)
+    azimuth = np.arctan2(np.add.outer(sun[:, 0], targets[:, 0]), np.add.outer(sun[:, 1], targets[:, 1]))
+    np.degrees(azimuth, out=azimuth)
+    azimuth %= 360.0
+    return tilt.astype(np.float32), azimuth.astype(np.float32), cosine.astype(np.float32)
+
+
+def iter_field_blocks(
+    mirrors: Sequence[Sequence[float]],
+    receiver: Sequence[float],
+    target_date: date | str,
+    *,
+    interval_minutes: int = config.UPDATE_INTERVAL,
+    site: Optional[SiteParameters] = None,
+    max_block_elements: int = MAX_BLOCK_ELEMENTS,
+    engine: Optional[str] = None,
+) -> Iterator[FieldBlock]:
+    """Yield the field's orientations over the sun path of ``target_date``.
+
+    The day is sampled like ``get_sun_path``; samples with the sun at or
+    below the horizon are skipped. Inputs are validated before this returns,
+    so errors surface before the first block is requested.
+    """
+
+    if interval_minutes <= 0:
+        raise ValueError("interval_minutes must be positive")
+    site_params = site or DEFAULT_SITE
+    targets = receiver_directions(mirrors, receiver)
+    _, times = _day_sample_times([_parse_date(target_date)], interval_minutes, site_params)
+    with stage("spa"):
+        elevation, azimuth, _ = solar_position_arrays(
+            times.asi8 / 1e9, site_params.latitude, site_params.longitude, site_params.altitude, engine=engine
+        )
+    daytime = elevation > 0
+    times, elevation, azimuth = times[daytime], elevation[daytime], azimuth[daytime]
+    sun = _sun_vectors(elevation, azimuth)
+    rows = max(1, max_block_elements // len(targets))
+
+    def blocks() -> Iterator[FieldBlock]:
+        for start in range(0, len(times), rows):
+            block = slice(start, start + rows)
+            with stage("mirror_normals"):
+                tilt, mirror_azimuth, cosine = mirror_normals(sun[block], targets)
+            yield FieldBlock(times[block], elevation[block], azimuth[block], tilt, mirror_azimuth, cosine)
+
+    return blocks()
+
+
+def field_orientation(
+    mirrors: Sequence[Sequence[float]],
+    receiver: Sequence[float],
+    target_date: date | str,
+    **options,
+) -> FieldBlock:
+    """All of ``iter_field_blocks`` as one block; the output alone is 12 bytes per mirror-timestamp."""
+
+    blocks = list(iter_field_blocks(mirrors, receiver, target_date, **options))
+    if not blocks:
+        n_mirrors = len(mirrors)
+        empty = np.empty((0, n_mirrors), dtype=np.float32)
+        return FieldBlock(pd.DatetimeIndex([], tz="UTC"), np.empty(0), np.empty(0), empty, empty, empty)
+    return FieldBlock(
+        timestamps=blocks[0].timestamps.append([block.timestamps for block in blocks[1:]]),
+        sun_elevation=np.concatenate([block.sun_elevation for block in blocks]),
+        sun_azimuth=np.concatenate([block.sun_azimuth for block in blocks]),
+        tilt=np.concatenate([block.tilt for block in blocks]),
+        azimuth=np.concatenate([block.azimuth for block in blocks]),
+        cosine=np.concatenate([block.cosine for block in blocks]),
+    )
+
+
+__all__ = [
+    "FieldBlock",
+    "MAX_BLOCK_ELEMENTS",
+    "field_orientation",
+    "iter_field_blocks",
+    "mirror_normals",
+    "receiver_directions",
+]
@@ -0,0 +1,123 @@
+"""Opt-in request instrumentation: per-stage timers and Prometheus metrics.
+
+Calculation code wraps its expensive steps in ``with stage("spa"):``. The
+timers are no-ops unless a collection scope is active for the current
+context (the Flask app opens one per request when instrumentation is
+enabled), so library and CLI callers pay only a context-variable lookup.
+"""
+
+from __future__ import annotations
+
+import bisect
+import threading
+from contextvars import ContextVar, Token
+from time import perf_counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Upper bounds (seconds) of the latency histogram buckets.
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_STAGE_TIMINGS: ContextVar[Optional[Dict[str, float]]] = ContextVar("solar_stage_timings", default=None)
+
+
+class stage:
+    """Context manager adding the wall time of its block to the active collection scope.
+
+    Re-entering a stage name accumulates; nested stages are timed
+    independently, so a parent's time includes its children's.
+    """
+
+    __slots__ = ("name", "_timings", "_start")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def __enter__(self) -> "stage":
+        self._timings = _STAGE_TIMINGS.get()
+        if self._timings is not None:
+            self._start = perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        if self._timings is not None:
+            self._timings[self.name] = self._timings.get(self.name, 0.0) + perf_counter() - self._start
+
+
+def start_stages() -> Tuple[Dict[str, float], Token]:
+    """Open a collection scope; pass the token to ``stop_stages`` to close it."""
+
+    timings: Dict[str, float] = {}
+    return timings, _STAGE_TIMINGS.set(timings)
+
+
+def stop_stages(token: Token) -> None:
+    _STAGE_TIMINGS.reset(token)
+
+
+def server_timing_header(timings: Dict[str, float]) -> str:
+    """Format ``{name: seconds}`` as a ``Server-Timing`` header value (milliseconds)."""
+
+    return ", ".join(f"{name};dur={seconds * 1000:.2f}" for name, seconds in timings.items())
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Histogram:
+    """Thread-safe Prometheus-style histogram keyed by the value of one label."""
+
+    def __init__(self, name: str, description: str, label: str, buckets: Iterable[float] = DEFAULT_BUCKETS) -> None:
+        self.name = name
+        self.description = description
+        self.label = label
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[str, Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, label_value: str, seconds: float) -> None:
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            counts, total = self._series.setdefault(label_value, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[index] += 1
+            total[0] += seconds
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {key: (list(counts), total[0]) for key, (counts, total) in self._series.items()}
+        for label_value, (counts, total) in sorted(series.items()):
+            label = f'{self.label}="{_escape(label_value)}"'
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{self.name}_bucket{{{label},le="{le}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{label}}} {total}")
+            lines.append(f"{self.name}_count{{{label}}} {cumulative}")
+        return lines
+
+
+def render_metric(name: str, kind: str, description: str, samples: Dict[Tuple[Tuple[str, str], ...], float]) -> List[str]:
+    """Render a counter/gauge family; ``samples`` maps label pairs to values."""
+
+    lines = [f"# HELP {name} {description}", f"# TYPE {name} {kind}"]
+    for labels, value in samples.items():
+        rendered = ",".join(f'{key}="{_escape(str(val))}"' for key, val in labels)
+        lines.append(f"{name}{{{rendered}}} {value}" if rendered else f"{name} {value}")
+    return lines
+
+
+__all__ = [
+    "DEFAULT_BUCKETS",
+    "Histogram",
+    "render_metric",
+    "server_timing_header",
+    "stage",
+    "start_stages",
+    "stop_stages",
+]
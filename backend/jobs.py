@@ -0,0 +1,188 @@
+"""In-process queue for long-running calculations submitted over the API.
+
+Jobs run on a small thread pool so that slow optimisations do not tie up the
+web server's request threads. Submitting a job whose key matches a queued,
+running or recently finished job returns that job instead of starting a new
+one. Running jobs report progress through the callback they receive and are
+cancelled cooperatively: once cancellation is requested the next progress
+report raises ``JobCancelled`` inside the worker.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, Optional
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED_STATES = (DONE, FAILED, CANCELLED)
+
+JobFunction = Callable[[Callable[[float], None]], Any]
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class JobCancelled(Exception):
+    """Raised inside a running job once its cancellation was requested."""
+
+
+class JobQueueFull(RuntimeError):
+    """Raised by ``JobQueue.submit`` when too many jobs are waiting or running."""
+
+
+@dataclass
+class Job:
+    id: str
+    key: Hashable
+    status: str = QUEUED
+    progress: float = 0.0
+    result: Any = None
+    error: Optional[str] = None
+    created: float = field(default_factory=time.time)
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    _cancel: threading.Event = field(default_factory=threading.Event, repr=False)
+    _future: Optional[Future] = field(default=None, repr=False)
+
+    def to_dict(self) -> Dict[str, Any]:
+        payload: Dict[str, Any] = {
+            "id": self.id,
+            "status": self.status,
+            "progress": round(self.progress, 4),
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+        }
+        if self.status == DONE:
+            payload["result"] = self.result
+        if self.error is not None:
+            payload["error"] = self.error
+        return payload
+
+
+class JobQueue:
+    """Bounded thread pool with de-duplication, progress and cancellation.
+
+    At most ``workers`` jobs run at once and at most ``max_pending`` jobs may
+    be queued or running. Finished jobs stay visible for ``retention``
+    seconds. A job raising ``ValueError``/``RuntimeError`` fails with that
+    message; any other exception is logged and fails the job with a generic
+    error, so a bug never leaves a job (and its ``max_pending`` slot) running.
+    """
+
+    def __init__(self, *, workers: int, max_pending: int, retention: float) -> None:
+        self.max_pending = max_pending
+        self.retention = retention
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+        self._jobs: Dict[str, Job] = {}
+        self._by_key: Dict[Hashable, str] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, key: Hashable, fn: JobFunction) -> Job:
+        """Queue ``fn(report_progress)`` unless an equivalent job already exists."""
+
+        with self._lock:
+            self._prune()
+            existing = self._jobs.get(self._by_key.get(key, ""))
+            if existing is not None and existing.status not in (FAILED, CANCELLED):
+                return existing
+            pending = sum(job.status not in FINISHED_STATES for job in self._jobs.values())
+            if pending >= self.max_pending:
+                raise JobQueueFull(f"Too many pending jobs (limit {self.max_pending}).")
+            job = Job(id=uuid.uuid4().hex, key=key)
+            self._jobs[job.id] = job
+            self._by_key[key] = job.id
+            job._future = self._executor.submit(self._run, job, fn)
+            return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            self._prune()
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """Request cancellation; queued jobs are dropped, running jobs stop at their next report."""
+
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status in FINISHED_STATES:
+                return job
+            job._cancel.set()
+            if job._future is not None and job._future.cancel():
+                self._finish(job, CANCELLED)
+            return job
+
+    def clear(self) -> None:
+        """Cancel every unfinished job and forget all jobs."""
+
+        with self._lock:
+            jobs = list(self._jobs.values())
+            self._jobs.clear()
+            self._by_key.clear()
+        for job in jobs:
+            job._cancel.set()
+            if job._future is not None:
+                job._future.cancel()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            counts = {state: 0 for state in (QUEUED, RUNNING, *FINISHED_STATES)}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+        return counts
+
+    def _run(self, job: Job, fn: JobFunction) -> None:
+        with self._lock:
+            if job._cancel.is_set():
+                self._finish(job, CANCELLED)
+                return
+            job.status = RUNNING
+            job.started = time.time()
+
+        def report(fraction: float) -> None:
+            if job._cancel.is_set():
+                raise JobCancelled(job.id)
+            job.progress = max(job.progress, min(float(fraction), 1.0))
+
+        try:
+            result = fn(report)
+        except JobCancelled:
+            with self._lock:
+                self._finish(job, CANCELLED)
+        except (RuntimeError, ValueError) as exc:
+            with self._lock:
+                job.error = str(exc)
+                self._finish(job, FAILED)
+        except Exception as exc:
+            _LOGGER.exception("Job %s failed", job.id)
+            with self._lock:
+                job.error = f"Internal error ({type(exc).__name__})."
+                self._finish(job, FAILED)
+        else:
+            with self._lock:
+                job.result = result
+                job.progress = 1.0
+                self._finish(job, DONE)
+
+    def _finish(self, job: Job, status: str) -> None:
+        job.status = status
+        job.finished = time.time()
+
+    def _prune(self) -> None:
+        cutoff = time.time() - self.retention
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.finished and job.finished < cutoff]:
+            job = self._jobs.pop(job_id)
+            if self._by_key.get(job.key) == job_id:
+                del self._by_key[job.key]
+
+
+__all__ = ["Job", "JobCancelled", "JobQueue", "JobQueueFull"]
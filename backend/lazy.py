@@ -0,0 +1,44 @@
+"""Deferred imports for the heavy calculation modules.
+
+``solar_calculator`` and ``orientation_optimizer`` pull in pandas, pvlib and
+SciPy, which dominate process start-up. Modules that only need them while
+serving requests (the Flask app) hold a ``LazyModule`` instead and the real
+import happens on first attribute access, or ahead of traffic through
+``backend.warmup.warm_up``.
+"""
+
+from __future__ import annotations
+
+import importlib
+from types import ModuleType
+from typing import Any, Optional
+
+
+class LazyModule:
+    """Stand-in for a module that is imported the first time it is used."""
+
+    def __init__(self, name: str, package: Optional[str] = None) -> None:
+        self._name = name
+        self._package = package
+        self._module: Optional[ModuleType] = None
+
+    def load(self) -> ModuleType:
+        # import_module is serialised by the import system's per-module lock,
+        # so concurrent first uses from several request threads are safe.
+        if self._module is None:
+            self._module = importlib.import_module(self._name, self._package)
+        return self._module
+
+    @property
+    def loaded(self) -> bool:
+        return self._module is not None
+
+    def __getattr__(self, attribute: str) -> Any:
+        return getattr(self.load(), attribute)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<LazyModule {self._name!r} ({state})>"
+
+
+__all__ = ["LazyModule"]
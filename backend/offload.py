@@ -0,0 +1,130 @@
+"""Bounded process pool for the CPU-bound calculations behind request handlers.
+
+Under the threaded servers the app calls ``calculate_optimal_orientation``
+and ``get_sun_path`` in the request thread, where concurrent calls contend
+for the GIL. The ASGI serving mode (``backend.asgi``) installs a
+``ProcessOffloader`` instead, and handlers route those calls through
+``call``, which then runs them in worker processes:
+
+* at most ``max_pending`` calls may be running or waiting for a worker;
+  further calls raise ``Overloaded`` at once (HTTP 429);
+* a call not finished within ``timeout`` seconds raises ``OffloadTimeout``
+  (HTTP 504). A worker cannot be interrupted, so the abandoned call keeps
+  its slot until it ends and continues to count against ``max_pending``.
+
+Without an installed offloader ``call`` simply calls the function, so the
+WSGI app, the tests and the worker processes themselves are unaffected.
+Functions and arguments must be picklable (module-level functions).
+"""
+
+from __future__ import annotations
+
+import importlib
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Any, Callable, Dict, Optional
+
+from .instrumentation import stage
+
+
+class Overloaded(RuntimeError):
+    """Raised by ``call`` when every slot of the process pool is taken."""
+
+
+class OffloadTimeout(RuntimeError):
+    """Raised by ``call`` when the worker does not answer within the timeout."""
+
+
+def _load_calculators() -> None:
+    # Import pandas/pvlib/SciPy once per worker instead of on its first call.
+    for name in (".solar_calculator", ".orientation_optimizer"):
+        importlib.import_module(name, __package__)
+
+
+class ProcessOffloader:
+    """``workers`` processes accepting at most ``max_pending`` concurrent calls."""
+
+    def __init__(self, *, workers: int, max_pending: int, timeout: float) -> None:
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        # Workers start from a fresh interpreter: forking the server process
+        # would copy its threads' locks in whatever state they are in.
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn"), initializer=_load_calculators
+        )
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    def _release(self, future: Future) -> None:
+        with self._lock:
+            self._pending -= 1
+            self.completed += 1
+
+    def call(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise Overloaded(f"Server busy: {self._pending} calculations in progress; retry shortly.")
+            self._pending += 1
+        try:
+            future = self._executor.submit(func, *args, **kwargs)
+        except BaseException:
+            with self._lock:
+                self._pending -= 1
+            raise
+        future.add_done_callback(self._release)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            future.cancel()  # only succeeds while it is still queued
+            with self._lock:
+                self.timed_out += 1
+            raise OffloadTimeout(f"Calculation did not finish within {self.timeout:g} seconds.") from None
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "pending": self._pending,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "timed_out": self.timed_out,
+            }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_offloader: Optional[ProcessOffloader] = None
+
+
+def install(offloader: Optional[ProcessOffloader]) -> Optional[ProcessOffloader]:
+    """Route ``call`` through ``offloader`` (``None`` restores inline calls); return the previous one."""
+
+    global _offloader
+    previous, _offloader = _offloader, offloader
+    return previous
+
+
+def installed() -> Optional[ProcessOffloader]:
+    return _offloader
+
+
+def call(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """``func(*args, **kwargs)``, in the process pool if one is installed."""
+
+    offloader = _offloader
+    if offloader is None:
+        return func(*args, **kwargs)
+    with stage("process_pool"):
+        return offloader.call(func, *args, **kwargs)
+
+
+__all__ = ["OffloadTimeout", "Overloaded", "ProcessOffloader", "call", "install", "installed"]
@@ -0,0 +1,278 @@
+"""Precomputed optimal orientations on a global latitude/longitude grid.
+
+The clear-sky optimum tilt/azimuth and annual POA vary smoothly with
+location, so instead of a full-year simulation per request they can be
+interpolated from a grid built once::
+
+    python -m backend.orientation_grid --output data/orientation-grid.npz \\
+        --lat-step 2 --lon-step 2 --workers 8
+
+The build runs ``calculate_optimal_orientation`` for every node through the
+portfolio runner (process pool; an interrupted build resumes from the
+``.partial.jsonl`` file next to the output), then evaluates ``--check``
+random off-grid sites exactly and stores the worst interpolation errors.
+Nodes use sea level and UTC; altitude and timezone barely move the optimum.
+
+The grid is a compressed ``.npz`` of float32 ``tilt``/``azimuth``/
+``annual_poa`` arrays (latitude x longitude) plus the axes and the build
+options. ``lookup`` interpolates bilinearly, wrapping in longitude. Tilt and
+azimuth are interpolated as the panel normal vector, so the azimuth jump
+between the hemispheres (tilt ~0 at the equator) and the 0/360 wrap do not
+produce meaningless averages. Loading touches NumPy only.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import random
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+# Build settings: a refined search on a fine tilt/azimuth lattice, with one
+# representative day per week (~0.05 s per node; errors ~1e-4 of annual POA).
+DEFAULT_BUILD_OPTIONS = {
+    "year": 2025,
+    "tilt_step": 0.5,
+    "tilt_max": 90.0,
+    "azimuth_step": 0.5,
+    "strategy": "refine",
+    "day_step": 7,
+}
+
+# Bump when the layout of the array file changes.
+_GRID_FORMAT_VERSION = 1
+
+
+class GridEstimate(NamedTuple):
+    """Interpolated optimum; attribute names match ``OrientationResult``."""
+
+    tilt: float
+    azimuth: float
+    annual_poa_irradiance: float  # Wh/m^2
+    estimated_error: Optional[float]  # worst relative POA error seen at build time
+    derived_from_year: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class OrientationGrid:
+    latitudes: np.ndarray  # ascending, evenly spaced, inclusive of both ends
+    longitudes: np.ndarray  # -180 <= lon < 180, evenly spaced over the full circle
+    tilt: np.ndarray  # degrees, shape (latitudes, longitudes)
+    azimuth: np.ndarray
+    annual_poa: np.ndarray  # Wh/m^2
+    options: Dict[str, object] = field(default_factory=dict)
+    check: Dict[str, float] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        tilt, azimuth = np.radians(self.tilt.astype(float)), np.radians(self.azimuth.astype(float))
+        # Panel normal (east, north, up) and POA per node; NaN marks failed nodes.
+        fields = np.stack(
+            [np.sin(tilt) * np.sin(azimuth), np.sin(tilt) * np.cos(azimuth), np.cos(tilt), self.annual_poa], axis=-1
+        )
+        object.__setattr__(self, "_nodes", fields)
+
+    @property
+    def lat_step(self) -> float:
+        return float(self.latitudes[1] - self.latitudes[0])
+
+    @property
+    def lon_step(self) -> float:
+        return float(self.longitudes[1] - self.longitudes[0])
+
+    def lookup(self, latitude: float, longitude: float) -> Optional[GridEstimate]:
+        """Bilinear estimate at a site, or ``None`` outside the grid or next to a failed node."""
+
+        lat0 = float(self.latitudes[0])
+        row = (latitude - lat0) / self.lat_step
+        if not 0 <= row <= len(self.latitudes) - 1:
+            return None
+        column = ((longitude - float(self.longitudes[0])) % 360.0) / self.lon_step
+        i = min(int(row), len(self.latitudes) - 2)
+        j = int(column) % len(self.longitudes)
+        j1 = (j + 1) % len(self.longitudes)
+        u, v = row - i, column - int(column)
+        fields = self._nodes  # type: ignore[attr-defined]
+        value = (
+            fields[i, j] * ((1 - u) * (1 - v))
+            + fields[i, j1] * ((1 - u) * v)
+            + fields[i + 1, j] * (u * (1 - v))
+            + fields[i + 1, j1] * (u * v)
+        )
+        east, north, up, poa = (float(item) for item in value)
+        if math.isnan(poa):
+            return None
+        return GridEstimate(
+            tilt=math.degrees(math.atan2(math.hypot(east, north), up)),
+            azimuth=math.degrees(math.atan2(east, north)) % 360.0,
+            annual_poa_irradiance=poa,
+            estimated_error=self.check.get("max_poa_error"),
+        )
+
+    def save(self, path: str | os.PathLike) -> None:
+        """Write the grid atomically, so a serving process never reads a partial file."""
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = path.with_name(path.name + ".tmp")
+        with temporary.open("wb") as handle:
+            np.savez_compressed(
+                handle,
+                latitudes=self.latitudes,
+                longitudes=self.longitudes,
+                tilt=self.tilt.astype(np.float32),
+                azimuth=self.azimuth.astype(np.float32),
+                annual_poa=self.annual_poa.astype(np.float32),
+                meta=np.array(
+                    json.dumps({"version": _GRID_FORMAT_VERSION, "options": self.options, "check": self.check})
+                ),
+            )
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path: str | os.PathLike) -> "OrientationGrid":
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            if meta.get("version") != _GRID_FORMAT_VERSION:
+                raise ValueError(f"{path}: unsupported orientation grid version {meta.get('version')!r}")
+            return cls(
+                latitudes=data["latitudes"],
+                longitudes=data["longitudes"],
+                tilt=data["tilt"],
+                azimuth=data["azimuth"],
+                annual_poa=data["annual_poa"],
+                options=meta["options"],
+                check=meta["check"],
+            )
+
+
+@lru_cache(maxsize=2)
+def _load(path: str, mtime_ns: int) -> OrientationGrid:
+    return OrientationGrid.load(path)
+
+
+def get_grid(path: str | os.PathLike) -> Optional[OrientationGrid]:
+    """The grid stored at ``path`` (reloaded when the file changes), or ``None`` if there is none."""
+
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+    return _load(str(path), mtime_ns)
+
+
+def _axes(lat_step: float, lon_step: float, lat_max: float) -> tuple:
+    if lat_step <= 0 or lon_step <= 0 or not 0 < lat_max <= 90:
+        raise ValueError("Steps must be positive and lat_max within (0, 90].")
+    if not math.isclose(360.0 / lon_step, round(360.0 / lon_step)):
+        raise ValueError("lon_step must divide 360.")
+    n_lat = int(round(2 * lat_max / lat_step)) + 1
+    latitudes = -lat_max + lat_step * np.arange(n_lat)
+    if not math.isclose(latitudes[-1], lat_max):
+        raise ValueError("lat_step must divide 2 * lat_max.")
+    return latitudes, -180.0 + lon_step * np.arange(int(round(360.0 / lon_step)))
+
+
+def _node_id(latitude: float, longitude: float) -> str:
+    return f"{latitude:.6g},{longitude:.6g}"
+
+
+def build_orientation_grid(
+    output: str | os.PathLike,
+    *,
+    lat_step: float = 2.0,
+    lon_step: float = 2.0,
+    lat_max: float = 76.0,
+    workers: Optional[int] = None,
+    check_points: int = 50,
+    progress: bool = False,
+    **options: object,
+) -> OrientationGrid:
+    """Optimise every grid node (see the module docstring) and save the grid to ``output``.
+
+    ``options`` override ``DEFAULT_BUILD_OPTIONS`` and are forwarded to
+    ``calculate_optimal_orientation``.
+    """
+
+    from .portfolio import optimise_sites, run_portfolio
+    from .solar_calculator import SiteParameters
+
+    options = {**DEFAULT_BUILD_OPTIONS, **options}
+    latitudes, longitudes = _axes(lat_step, lon_step, lat_max)
+    partial = Path(f"{output}.partial.jsonl")
+    nodes = [
+        (_node_id(lat, lon), SiteParameters(float(lat), float(lon), 0.0, "UTC"))
+        for lat in latitudes
+        for lon in longitudes
+    ]
+    run_portfolio(nodes, partial, workers=workers, chunksize=8, progress=progress, **options)
+
+    values = {}
+    for line in partial.read_text(encoding="utf-8").splitlines():
+        record = json.loads(line)
+        if "error" not in record:
+            values[record["id"]] = (record["tilt"], record["azimuth"], record["annual_poa_kwh_m2"] * 1000)
+    table = np.array([values.get(node_id, (np.nan,) * 3) for node_id, _ in nodes]).reshape(
+        len(latitudes), len(longitudes), 3
+    )
+    grid = OrientationGrid(latitudes, longitudes, table[..., 0], table[..., 1], table[..., 2], options=options)
+
+    rng = random.Random(0)
+    samples = [(rng.uniform(-lat_max, lat_max), rng.uniform(-180.0, 180.0)) for _ in range(check_points)]
+    checks = [(str(n), SiteParameters(lat, lon, 0.0, "UTC")) for n, (lat, lon) in enumerate(samples)]
+    poa_errors: List[float] = []
+    tilt_errors: List[float] = []
+    for record in optimise_sites(checks, workers=workers, **options):
+        estimate = grid.lookup(record["latitude"], record["longitude"])
+        if "error" in record or estimate is None:
+            continue
+        exact = record["annual_poa_kwh_m2"] * 1000
+        poa_errors.append(abs(estimate.annual_poa_irradiance - exact) / exact)
+        tilt_errors.append(abs(estimate.tilt - record["tilt"]))
+    check = {"points": len(poa_errors)}
+    if poa_errors:
+        check.update(max_poa_error=max(poa_errors), max_tilt_error=max(tilt_errors))
+    grid = OrientationGrid(
+        latitudes, longitudes, grid.tilt, grid.azimuth, grid.annual_poa, options=options, check=check
+    )
+    grid.save(output)
+    partial.unlink()
+    return grid
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build the global optimal-orientation lookup grid")
+    parser.add_argument("--output", required=True, help="Array file to write (.npz)")
+    parser.add_argument("--lat-step", type=float, default=2.0, help="Grid spacing in degrees (default: %(default)s)")
+    parser.add_argument("--lon-step", type=float, default=2.0, help="Must divide 360 (default: %(default)s)")
+    parser.add_argument("--lat-max", type=float, default=76.0, help="Cover -lat_max..lat_max (default: %(default)s)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--check", type=int, default=50, help="Random sites verified exactly (default: %(default)s)")
+    parser.add_argument("--year", type=int, default=DEFAULT_BUILD_OPTIONS["year"])
+    parser.add_argument("--day-step", type=int, default=DEFAULT_BUILD_OPTIONS["day_step"])
+    args = parser.parse_args()
+    grid = build_orientation_grid(
+        args.output,
+        lat_step=args.lat_step,
+        lon_step=args.lon_step,
+        lat_max=args.lat_max,
+        workers=args.workers,
+        check_points=args.check,
+        progress=True,
+        year=args.year,
+        day_step=args.day_step,
+    )
+    print(f"Wrote {grid.tilt.shape[0]}x{grid.tilt.shape[1]} grid to {args.output}; check: {grid.check}")
+
+
+if __name__ == "__main__":
+    main()
+
+
+__all__ = ["DEFAULT_BUILD_OPTIONS", "GridEstimate", "OrientationGrid", "build_orientation_grid", "get_grid"]
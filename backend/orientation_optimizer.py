@@ -1,15 +1,24 @@
 """Estimate optimal fixed-tilt PV orientation for the configured location.
 
 The calculation uses pvlib's clear-sky model as a proxy for long-term solar
-resource. It sweeps a grid of tilt/azimuth pairs and integrates the resulting
-plane-of-array (POA) irradiance to find the best performing orientation.
+resource, or the measured irradiance of a TMY/EPW/CSV weather file (see
+``backend.weather``). It sweeps a grid of tilt/azimuth pairs and integrates
+the resulting plane-of-array (POA) irradiance to find the best performing
+orientation.
 """
 
 from __future__ import annotations
 
 import argparse
-from dataclasses import dataclass
-from typing import Iterable, Tuple
+import calendar
+import contextvars
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Callable, Hashable, Iterable, List, Optional, Sequence, Tuple
 
 import numpy as np
 import pandas as pd
@@ -20,8 +29,111 @@ if not hasattr(np, "Inf"):  # pragma: no cover
 
 from pvlib import irradiance, solarposition
 from pvlib.location import Location
+from scipy import optimize
 
-from .solar_calculator import DEFAULT_SITE, SiteParameters
+import pvlib
+
+from . import config
+from .cache import MappedArrayCache, content_key
+from .instrumentation import stage
+from .solar_calculator import DEFAULT_SITE, SiteParameters, solar_position_arrays
+from .weather import WeatherRecord, load_weather
+
+
+# Ground reflectance used by pvlib.irradiance.get_total_irradiance by default.
+GROUND_ALBEDO = 0.25
+
+# Upper bound on (orientation x timestamp) cells evaluated per vectorised block.
+# One block holds a handful of float64 arrays of this size (~8 MB each).
+MAX_BLOCK_ELEMENTS = 1_000_000
+
+SEARCH_STRATEGIES = ("grid", "refine", "optimize")
+
+# Spans the year is split into by the streaming mode; "auto" streams by month
+# when ``freq`` is finer than hourly and processes the year at once otherwise.
+CHUNK_SIZES = ("month", "week")
+
+# Called with the completed fraction (0..1) of a search. Raising from the
+# callback aborts the search, which is how callers implement cancellation.
+ProgressCallback = Callable[[float], None]
+
+# Bump when the layout of cached meteorology bundles changes.
+_METEOROLOGY_CACHE_VERSION = 1
+
+_METEOROLOGY_CACHE = MappedArrayCache(
+    config.METEOROLOGY_CACHE_DIR,
+    max_bytes=config.METEOROLOGY_CACHE_MAX_BYTES,
+)
+
+
+@dataclass(frozen=True)
+class EnergySurface:
+    """Integrated POA irradiance for every evaluated tilt/azimuth pair."""
+
+    tilts: np.ndarray
+    azimuths: np.ndarray
+    energy: np.ndarray  # Wh/m^2, shape (len(tilts), len(azimuths))
+
+    def _mask(
+        self,
+        tilt_range: Optional[Tuple[float, float]],
+        azimuth_range: Optional[Tuple[float, float]],
+    ) -> np.ndarray:
+        tilt_ok = np.ones(self.tilts.size, dtype=bool)
+        if tilt_range is not None:
+            tilt_ok = (self.tilts >= tilt_range[0]) & (self.tilts <= tilt_range[1])
+        azimuth_ok = np.ones(self.azimuths.size, dtype=bool)
+        if azimuth_range is not None:
+            low, high = azimuth_range[0] % 360, azimuth_range[1] % 360
+            azimuths = self.azimuths % 360
+            # low > high wraps through north, e.g. (300, 60).
+            azimuth_ok = (azimuths >= low) & (azimuths <= high) if low <= high else (azimuths >= low) | (azimuths <= high)
+        return tilt_ok[:, None] & azimuth_ok[None, :]
+
+    def top_k(
+        self,
+        k: int,
+        *,
+        tilt_range: Optional[Tuple[float, float]] = None,
+        azimuth_range: Optional[Tuple[float, float]] = None,
+    ) -> list[OrientationResult]:
+        """Return the ``k`` best orientations, optionally within inclusive bounds.
+
+        ``azimuth_range=(low, high)`` with ``low > high`` wraps through north.
+        Ties keep the tilt-major grid order used by the exhaustive sweep.
+        """
+
+        if k < 1:
+            raise ValueError("k must be a positive integer.")
+        candidates = np.flatnonzero(self._mask(tilt_range, azimuth_range).ravel())
+        if candidates.size == 0:
+            raise ValueError("No evaluated orientation satisfies the constraints.")
+        values = self.energy.ravel()[candidates]
+        order = candidates[np.argsort(-values, kind="stable")[:k]]
+        rows, cols = np.unravel_index(order, self.energy.shape)
+        return [
+            OrientationResult(
+                tilt=float(self.tilts[i]),
+                azimuth=float(self.azimuths[j]),
+                annual_poa_irradiance=float(self.energy[i, j]),
+            )
+            for i, j in zip(rows, cols)
+        ]
+
+    def best(
+        self,
+        *,
+        tilt_range: Optional[Tuple[float, float]] = None,
+        azimuth_range: Optional[Tuple[float, float]] = None,
+    ) -> OrientationResult:
+        """Best orientation within the bounds, answered from the stored grid."""
+
+        return self.top_k(1, tilt_range=tilt_range, azimuth_range=azimuth_range)[0]
+
+    def energy_float32(self) -> np.ndarray:
+        """Compact little-endian float32 copy of ``energy`` (C order) for transfer."""
+
+        return np.ascontiguousarray(self.energy, dtype="<f4")
 
 
 @dataclass(frozen=True)
@@ -29,33 +141,682 @@ class OrientationResult:
     tilt: float
     azimuth: float
     annual_poa_irradiance: float  # Wh/m^2 over analysed period
+    surface: Optional[EnergySurface] = field(default=None, compare=False, repr=False)
+    estimated_error: Optional[float] = field(default=None, compare=False)  # relative, approximate mode only
+    derived_from_year: Optional[int] = field(default=None, compare=False)  # answered from this year's grid
+
+
+def _axis_keys(values: np.ndarray) -> np.ndarray:
+    # Grids built with different steps agree only up to rounding (0.1 * 15 != 1.5).
+    return np.round(np.asarray(values, dtype=float), 6)
+
+
+def _axis_positions(axis: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Return the indices of ``values`` in the sorted ``axis`` and which of them are present."""
+
+    index = np.minimum(np.searchsorted(axis, values), axis.size - 1)
+    return index, axis[index] == values
+
+
+class _SurfaceMemo:
+    """Evaluated tilt/azimuth cells per sweep context, merged across sweeps.
+
+    A context (site coordinates, year, freq or weather file, day_step) fixes the sky terms,
+    so a cell's energy never changes within it. Each context keeps one grid
+    over the union of all tilts and azimuths evaluated so far, NaN where a
+    cell was not evaluated. The least recently used contexts are dropped
+    beyond ``max_contexts``; a merge that would exceed ``max_cells`` restarts
+    the context from the newest sweep.
+    """
+
+    def __init__(self, max_contexts: int, max_cells: int) -> None:
+        self.max_contexts = max_contexts
+        self.max_cells = max_cells
+        self._entries: "OrderedDict[Hashable, EnergySurface]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.reused_cells = 0
+        self.computed_cells = 0
+
+    def lookup(self, context: Hashable, tilts: np.ndarray, azimuths: np.ndarray) -> np.ndarray:
+        """Return the known energies of the ``tilts x azimuths`` grid, NaN where unknown."""
+
+        energy = np.full((tilts.size, azimuths.size), np.nan)
+        with self._lock:
+            entry = self._entries.get(context)
+            if entry is not None:
+                self._entries.move_to_end(context)
+        if entry is not None:
+            rows, row_ok = _axis_positions(entry.tilts, _axis_keys(tilts))
+            cols, col_ok = _axis_positions(entry.azimuths, _axis_keys(azimuths))
+            energy[np.ix_(row_ok, col_ok)] = entry.energy[np.ix_(rows[row_ok], cols[col_ok])]
+        return energy
+
+    def contexts(self) -> List[Hashable]:
+        """Stored contexts, most recently used first."""
+
+        with self._lock:
+            return list(reversed(self._entries))
+
+    def store(self, context: Hashable, tilts: np.ndarray, azimuths: np.ndarray, energy: np.ndarray) -> None:
+        """Merge the ``tilts x azimuths`` grid ``energy`` into ``context``; NaN cells are ignored."""
+
+        if self.max_contexts <= 0:
+            return
+        tilt_keys, azimuth_keys = _axis_keys(tilts), _axis_keys(azimuths)
+        with self._lock:
+            entry = self._entries.get(context)
+            merged_tilts, merged_azimuths = np.unique(tilt_keys), np.unique(azimuth_keys)
+            if entry is not None:
+                union_tilts = np.union1d(entry.tilts, merged_tilts)
+                union_azimuths = np.union1d(entry.azimuths, merged_azimuths)
+                if union_tilts.size * union_azimuths.size <= self.max_cells:
+                    merged_tilts, merged_azimuths = union_tilts, union_azimuths
+                else:
+                    entry = None
+            if merged_tilts.size * merged_azimuths.size > self.max_cells:
+                self._entries.pop(context, None)
+                return
+            merged = np.full((merged_tilts.size, merged_azimuths.size), np.nan)
+            if entry is not None:
+                old = np.ix_(np.searchsorted(merged_tilts, entry.tilts), np.searchsorted(merged_azimuths, entry.azimuths))
+                merged[old] = entry.energy
+            new = np.ix_(np.searchsorted(merged_tilts, tilt_keys), np.searchsorted(merged_azimuths, azimuth_keys))
+            merged[new] = np.where(np.isnan(energy), merged[new], energy)
+            self._entries[context] = EnergySurface(tilts=merged_tilts, azimuths=merged_azimuths, energy=merged)
+            self._entries.move_to_end(context)
+            while len(self._entries) > self.max_contexts:
+                self._entries.popitem(last=False)
+
+    def record(self, *, reused: int, computed: int) -> None:
+        with self._lock:
+            self.reused_cells += reused
+            self.computed_cells += computed
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "contexts": len(self._entries),
+                "cells": int(sum(np.count_nonzero(~np.isnan(entry.energy)) for entry in self._entries.values())),
+                "reused_cells": self.reused_cells,
+                "computed_cells": self.computed_cells,
+            }
+
+
+_SURFACE_MEMO = _SurfaceMemo(config.SURFACE_MEMO_SIZE, config.SURFACE_MEMO_MAX_CELLS)
+
+# Samples per year (every 5 hours) used to compare the sun's path between years.
+_YEAR_SHIFT_SAMPLES = 365 * 24 // 5
+
+
+@lru_cache(maxsize=256)
+def _year_shift_degrees(latitude: float, longitude: float, altitude: float, year: int, other_year: int) -> float:
+    """Mean angle (degrees) between the sun directions at the same UTC calendar instants of two years."""
+
+    vectors = []
+    for value in (year, other_year):
+        times = pd.date_range(pd.Timestamp(year=value, month=1, day=1, tz="UTC"), periods=_YEAR_SHIFT_SAMPLES, freq="5h")
+        elevation, azimuth, _ = solar_position_arrays(times.asi8 / 1e9, latitude, longitude, altitude, engine="numpy")
+        elevation, azimuth = np.radians(elevation), np.radians(azimuth)
+        vectors.append(np.stack([np.cos(elevation) * np.sin(azimuth), np.cos(elevation) * np.cos(azimuth), np.sin(elevation)]))
+    return float(np.degrees(np.arccos(np.clip((vectors[0] * vectors[1]).sum(axis=0), -1, 1))).mean())
+
+
+def _similar_year_energy(
+    context: Tuple,
+    tilts: np.ndarray,
+    azimuths: np.ndarray,
+    max_shift: float,
+) -> Optional[Tuple[np.ndarray, int]]:
+    """Return a complete grid from another year whose sun path is within ``max_shift`` degrees.
+
+    Only years with the same number of days qualify, so the calendar and the
+    representative-day weights line up day for day.
+    """
 
+    *coordinates, year, freq, day_step = context
+    for other in _SURFACE_MEMO.contexts():
+        *other_coordinates, other_year, other_freq, other_step = other
+        if other_coordinates != coordinates or (other_freq, other_step) != (freq, day_step) or other_year == year:
+            continue
+        if calendar.isleap(other_year) != calendar.isleap(year):
+            continue
+        if _year_shift_degrees(*coordinates[:3], year, other_year) > max_shift:
+            continue
+        energy = _SURFACE_MEMO.lookup(other, tilts, azimuths)
+        if not np.isnan(energy).any():
+            return energy, other_year
+    return None
+
+
+def _build_time_index(
+    year: int,
+    site: SiteParameters,
+    freq: str = "1h",
+    days: Optional[Tuple[int, int]] = None,
+) -> pd.DatetimeIndex:
+    """Local timestamps of ``year``, or of its days ``[start, stop)`` (0-based) when ``days`` is given."""
 
-def _build_time_index(year: int, site: SiteParameters, freq: str = "1h") -> pd.DatetimeIndex:
     start = pd.Timestamp(year=year, month=1, day=1, tz=site.timezone)
     end = start + pd.DateOffset(years=1)
+    if days is not None:
+        start, end = (pd.Timestamp(year=year, month=1, day=1) + pd.Timedelta(days=day) for day in days)
+        # A day starts at the first of two ambiguous midnights (zones falling back at midnight).
+        start, end = (
+            value.tz_localize(site.timezone, ambiguous=True, nonexistent="shift_forward") for value in (start, end)
+        )
     return pd.date_range(start=start, end=end, freq=freq, inclusive="left")
 
 
+def _chunk_days(year: int, chunk: str) -> List[Tuple[int, int]]:
+    """Split ``year`` into month- or week-sized day spans ``[start, stop)``."""
+
+    n_days = 366 if calendar.isleap(year) else 365
+    if chunk == "week":
+        starts = list(range(0, n_days, 7))
+    else:
+        starts = [pd.Timestamp(year=year, month=month, day=1).dayofyear - 1 for month in range(1, 13)]
+    return list(zip(starts, starts[1:] + [n_days]))
+
+
+def parse_freq(freq: str) -> pd.Timedelta:
+    """Return the sampling interval ``freq`` (a pandas frequency such as ``"15min"``) as a duration.
+
+    Raises ``ValueError`` unless it is a positive fixed duration.
+    """
+
+    try:
+        step = pd.Timedelta(pd.tseries.frequencies.to_offset(freq))
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid freq {freq!r}; expected a fixed interval such as '1h' or '15min'.") from None
+    if step <= pd.Timedelta(0):
+        raise ValueError(f"freq must be a positive interval, not {freq!r}.")
+    return step
+
+
+def _resolve_chunk(chunk: Optional[str], freq: str) -> Optional[str]:
+    if chunk == "auto":
+        return "month" if parse_freq(freq) < pd.Timedelta(hours=1) else None
+    if chunk is not None and chunk not in CHUNK_SIZES:
+        raise ValueError(f"Unknown chunk size {chunk!r}; expected one of {', '.join(CHUNK_SIZES)} or 'auto'.")
+    return chunk
+
+
+def _representative_day_weights(year: int, day_step: int) -> np.ndarray:
+    """Return the number of calendar days each day of ``year`` stands for.
+
+    The year is split into consecutive blocks of ``day_step`` days (the last
+    block may be shorter) and the middle day of each block carries the block
+    length as its quadrature weight; all other days get weight zero.
+    ``day_step=1`` keeps every day with unit weight.
+    """
+
+    n_days = (pd.Timestamp(year=year + 1, month=1, day=1) - pd.Timestamp(year=year, month=1, day=1)).days
+    block_starts = np.arange(0, n_days, day_step)
+    block_lengths = np.minimum(block_starts + day_step, n_days) - block_starts
+    weights = np.zeros(n_days)
+    weights[block_starts + block_lengths // 2] = block_lengths
+    return weights
+
+
 def _prepare_meteorology(
     times: pd.DatetimeIndex,
     site: SiteParameters,
+    measured: Optional[pd.DataFrame] = None,
 ) -> Tuple[pd.DataFrame, pd.DataFrame, pd.Series]:
-    # Clear-sky irradiance (Ineichen model)
+    # Clear-sky irradiance (Ineichen model), unless ``measured`` ghi/dni/dhi
+    # indexed by ``times`` is given.
     location = Location(
         latitude=site.latitude,
         longitude=site.longitude,
         tz=site.timezone,
         altitude=site.altitude,
     )
-    solpos = location.get_solarposition(times, method="nrel_numpy")
-    clearsky = location.get_clearsky(times, model="ineichen")
-    dni_extra = irradiance.get_extra_radiation(times).rename("dni_extra")
+    with stage("spa"):
+        solpos = location.get_solarposition(times, method="nrel_numpy")
+    with stage("clearsky"):
+        clearsky = location.get_clearsky(times, model="ineichen") if measured is None else measured
+        dni_extra = irradiance.get_extra_radiation(times).rename("dni_extra")
 
     mask = solpos["apparent_zenith"] < 90
     return solpos.loc[mask], clearsky.loc[mask], dni_extra.loc[mask]
 
 
+def _site_meteorology(
+    site: SiteParameters,
+    year: int,
+    freq: str = "1h",
+    day_step: int = 1,
+    days: Optional[Tuple[int, int]] = None,
+    weather: Optional[WeatherRecord] = None,
+) -> Tuple[pd.DataFrame, pd.DataFrame, pd.Series]:
+    """Return daytime meteorology for a site-year, served from the disk cache.
+
+    With ``day_step > 1`` only the representative days selected by
+    ``_representative_day_weights`` are kept. ``days=(start, stop)`` limits
+    the result to those days of the year (cached separately). The cached
+    frames only carry the columns consumed by the irradiance sweep
+    (``apparent_zenith``/``azimuth`` and ``ghi``/``dni``/``dhi``). With
+    ``weather`` the irradiance is the file's, at its timestamps, and
+    ``freq`` is ignored.
+    """
+
+    span = {} if days is None else {"days": list(days)}
+    if weather is not None:
+        span["weather"] = weather.key
+    key = content_key(
+        version=_METEOROLOGY_CACHE_VERSION,
+        pvlib=pvlib.__version__,
+        latitude=site.latitude,
+        longitude=site.longitude,
+        altitude=site.altitude,
+        timezone=site.timezone,
+        year=year,
+        freq=freq,
+        day_step=day_step,
+        **span,
+    )
+
+    def compute() -> dict:
+        measured = None
+        if weather is None:
+            times = _build_time_index(year, site, freq=freq, days=days)
+        else:
+            measured = weather.irradiance(year, site.timezone)
+            times = measured.index
+            if days is not None:
+                times = times[(times.dayofyear > days[0]) & (times.dayofyear <= days[1])]
+        if day_step > 1:
+            times = times[_representative_day_weights(year, day_step)[times.dayofyear - 1] > 0]
+        solpos, clearsky, dni_extra = _prepare_meteorology(times, site, None if measured is None else measured.loc[times])
+        return {
+            "time_ns": solpos.index.asi8,
+            "apparent_zenith": solpos["apparent_zenith"].to_numpy(dtype=float),
+            "azimuth": solpos["azimuth"].to_numpy(dtype=float),
+            "ghi": clearsky["ghi"].to_numpy(dtype=float),
+            "dni": clearsky["dni"].to_numpy(dtype=float),
+            "dhi": clearsky["dhi"].to_numpy(dtype=float),
+            "dni_extra": dni_extra.to_numpy(dtype=float),
+        }
+
+    with stage("meteorology"):
+        arrays = _METEOROLOGY_CACHE.get_or_compute(key, compute)
+    index = pd.DatetimeIndex(arrays["time_ns"], tz="UTC").tz_convert(site.timezone)
+    # copy=False keeps the columns as views of the shared, memory-mapped entry.
+    solpos = pd.DataFrame(
+        {"apparent_zenith": arrays["apparent_zenith"], "azimuth": arrays["azimuth"]}, index=index, copy=False
+    )
+    clearsky = pd.DataFrame({name: arrays[name] for name in ("ghi", "dni", "dhi")}, index=index, copy=False)
+    return solpos, clearsky, pd.Series(arrays["dni_extra"], index=index, name="dni_extra")
+
+
+@dataclass(frozen=True)
+class _SkyTerms:
+    """Per-timestamp quantities shared by every orientation of a sweep."""
+
+    sun_basis: np.ndarray  # (3, T) unit vector components of the sun direction
+    dni: np.ndarray
+    circumsolar_weight: np.ndarray
+    isotropic_total: float
+    ghi_total: float
+
+
+def _sky_terms(
+    solpos: pd.DataFrame,
+    clearsky: pd.DataFrame,
+    dni_extra: pd.Series,
+    weights: Optional[np.ndarray] = None,
+) -> _SkyTerms:
+    """Precompute sweep inputs; ``weights`` scales each timestamp's contribution."""
+
+    zenith = solpos["apparent_zenith"].to_numpy(dtype=float)
+    sun_azimuth = solpos["azimuth"].to_numpy(dtype=float)
+    dni = clearsky["dni"].to_numpy(dtype=float)
+    ghi = clearsky["ghi"].to_numpy(dtype=float)
+    dhi = clearsky["dhi"].to_numpy(dtype=float)
+    extra = np.asarray(dni_extra, dtype=float)
+    weights = np.ones_like(zenith) if weights is None else np.asarray(weights, dtype=float)
+
+    # A NaN in any input makes poa_global NaN for that timestamp, which
+    # nansum then ignores; dropping those rows up front is equivalent.
+    valid = np.isfinite(zenith) & np.isfinite(sun_azimuth) & np.isfinite(dni)
+    valid &= np.isfinite(ghi) & np.isfinite(dhi) & np.isfinite(extra)
+    zenith, sun_azimuth = zenith[valid], sun_azimuth[valid]
+    dni, ghi, dhi, extra, weights = dni[valid], ghi[valid], dhi[valid], extra[valid], weights[valid]
+
+    cos_zenith = np.cos(np.radians(zenith))
+    sin_zenith = np.sin(np.radians(zenith))
+    sun_basis = np.stack(
+        [
+            cos_zenith,
+            sin_zenith * np.cos(np.radians(sun_azimuth)),
+            sin_zenith * np.sin(np.radians(sun_azimuth)),
+        ]
+    )
+    anisotropy = dni / extra
+    # Non-negative weights commute with the max(..., 0) clipping, so they can
+    # be folded into the per-timestamp factors.
+    return _SkyTerms(
+        sun_basis=sun_basis,
+        dni=weights * dni,
+        circumsolar_weight=weights * dhi * anisotropy / np.maximum(cos_zenith, 0.01745),
+        isotropic_total=float((weights * np.maximum(dhi * (1 - anisotropy), 0)).sum()),
+        ghi_total=float((weights * ghi).sum()),
+    )
+
+
+def _concatenate_skies(skies: Sequence[_SkyTerms]) -> _SkyTerms:
+    """Sky terms of the union of the timestamps behind ``skies``."""
+
+    return _SkyTerms(
+        sun_basis=np.concatenate([sky.sun_basis for sky in skies], axis=1),
+        dni=np.concatenate([sky.dni for sky in skies]),
+        circumsolar_weight=np.concatenate([sky.circumsolar_weight for sky in skies]),
+        isotropic_total=sum(sky.isotropic_total for sky in skies),
+        ghi_total=sum(sky.ghi_total for sky in skies),
+    )
+
+
+def _chunk_skies(
+    site: SiteParameters,
+    year: int,
+    freq: str,
+    day_step: int,
+    days: Tuple[int, int],
+    weather: Optional[WeatherRecord] = None,
+) -> List[_SkyTerms]:
+    """Sky terms for the days ``[start, stop)`` of ``year``.
+
+    With ``day_step > 1`` there is one entry per interleaved half of the
+    representative days (even / odd rank), the two coarser rules behind
+    ``estimated_error``; their sum is the full rule.
+    """
+
+    solpos, clearsky, dni_extra = _site_meteorology(site, year, freq, day_step, days=days, weather=weather)
+    if day_step == 1:
+        return [_sky_terms(solpos, clearsky, dni_extra)]
+    day_weights = _representative_day_weights(year, day_step)
+    day_index = solpos.index.dayofyear.to_numpy() - 1
+    rank_parity = ((np.cumsum(day_weights > 0) - 1) % 2)[day_index]
+    skies = []
+    for offset in (0, 1):
+        rows = rank_parity == offset
+        skies.append(_sky_terms(solpos[rows], clearsky[rows], dni_extra[rows], weights=day_weights[day_index[rows]]))
+    return skies
+
+
+def _map_chunks(
+    function: Callable[[Tuple[int, int]], object],
+    spans: Sequence[Tuple[int, int]],
+    workers: int,
+) -> Iterable[object]:
+    """Yield ``function(span)`` in order, running up to ``workers`` spans at once.
+
+    Each task runs in a copy of the caller's context so ``stage`` timers keep
+    collecting. Leaving the iteration early cancels the spans not yet started.
+    """
+
+    if workers <= 1:
+        yield from map(function, spans)
+        return
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="chunk")
+    try:
+        futures = [executor.submit(contextvars.copy_context().run, function, span) for span in spans]
+        for future in futures:
+            yield future.result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _chunked_energy(
+    site: SiteParameters,
+    year: int,
+    freq: str,
+    day_step: int,
+    tilt: np.ndarray,
+    azimuth: np.ndarray,
+    *,
+    chunk: str,
+    workers: int = 1,
+    progress: Optional[ProgressCallback] = None,
+    weather: Optional[WeatherRecord] = None,
+) -> np.ndarray:
+    """Integrate POA irradiance for paired ``tilt``/``azimuth`` one chunk of the year at a time.
+
+    Only one chunk's meteorology per worker is alive at once, so peak memory
+    depends on the chunk size rather than on ``freq``. Returns an array of
+    shape ``(classes, n)``: one row, or with ``day_step > 1`` one row per
+    half of the representative days (see ``_chunk_skies``).
+    """
+
+    spans = _chunk_days(year, chunk)
+
+    def evaluate(days: Tuple[int, int]) -> np.ndarray:
+        skies = _chunk_skies(site, year, freq, day_step, days, weather)
+        return np.stack([_orientation_energy(sky, tilt, azimuth) for sky in skies])
+
+    total = np.zeros((2 if day_step > 1 else 1, np.size(tilt)))
+    for done, partial in enumerate(_map_chunks(evaluate, spans, workers), 1):
+        total += partial
+        if progress is not None:
+            progress(done / len(spans))
+    return total
+
+
+def _chunked_class_skies(
+    site: SiteParameters,
+    year: int,
+    freq: str,
+    day_step: int,
+    *,
+    chunk: str,
+    workers: int = 1,
+    weather: Optional[WeatherRecord] = None,
+) -> List[_SkyTerms]:
+    """Whole-year sky terms assembled chunk by chunk (per half of the days when ``day_step > 1``).
+
+    Used by the lattice strategies, which evaluate orientations on demand:
+    the compact sky terms (~40 bytes per daytime timestamp) are kept, while
+    the pvlib frames behind them only ever exist for one chunk at a time.
+    """
+
+    per_chunk = list(
+        _map_chunks(lambda days: _chunk_skies(site, year, freq, day_step, days, weather), _chunk_days(year, chunk), workers)
+    )
+    return [_concatenate_skies(classes) for classes in zip(*per_chunk)]
+
+
+def _interleaved_error(best_energy: float, class_energy: Sequence[float], day_weights: np.ndarray) -> float:
+    """``estimated_error`` from the energies of the two halves of the representative days."""
+
+    sampled_days = np.flatnonzero(day_weights)
+    gaps = []
+    for offset, energy in zip((0, 1), class_energy):
+        kept = sampled_days[offset::2]
+        gaps.append(abs(best_energy - float(energy) * day_weights.sum() / day_weights[kept].sum()))
+    return max(gaps) / best_energy if best_energy else 0.0
+
+
+def _orientation_energy(
+    sky: _SkyTerms,
+    tilt: np.ndarray,
+    azimuth: np.ndarray,
+    *,
+    max_block_elements: int = MAX_BLOCK_ELEMENTS,
+    progress: Optional[ProgressCallback] = None,
+) -> np.ndarray:
+    """Integrate Hay-Davies POA irradiance for paired ``tilt``/``azimuth`` arrays.
+
+    Mirrors ``irradiance.get_total_irradiance(model="haydavies")`` summed with
+    ``np.nansum`` over time, but evaluates the angle of incidence for a block
+    of orientations as a single ``(orientations x times)`` broadcast. Terms
+    that do not depend on the angle of incidence (isotropic sky and ground
+    reflection) are linear in a per-tilt factor and are summed once.
+
+    ``progress`` receives the fraction of orientations done after each block.
+    """
+
+    tilt_rad = np.radians(np.ravel(tilt))
+    azimuth_rad = np.radians(np.ravel(azimuth) % 360)
+    surface_basis = np.stack(
+        [
+            np.cos(tilt_rad),
+            np.sin(tilt_rad) * np.cos(azimuth_rad),
+            np.sin(tilt_rad) * np.sin(azimuth_rad),
+        ],
+        axis=1,
+    )
+
+    energy = np.empty(surface_basis.shape[0])
+    block = max(1, max_block_elements // max(1, sky.dni.size))
+    for start in range(0, surface_basis.shape[0], block):
+        projection = np.clip(surface_basis[start : start + block] @ sky.sun_basis, -1, 1)
+        direct = np.maximum(sky.dni * projection, 0)
+        circumsolar = np.maximum(sky.circumsolar_weight * np.maximum(projection, 0), 0)
+        energy[start : start + block] = (direct + circumsolar).sum(axis=1)
+        if progress is not None:
+            progress(min(start + block, energy.size) / energy.size)
+
+    cos_tilt = np.cos(tilt_rad)
+    energy += sky.isotropic_total * 0.5 * (1 + cos_tilt)
+    energy += sky.ghi_total * GROUND_ALBEDO * (1 - cos_tilt) * 0.5
+    return energy
+
+
+def _annual_poa_grid(
+    sky: _SkyTerms,
+    tilts: np.ndarray,
+    azimuths: np.ndarray,
+    *,
+    max_block_elements: int = MAX_BLOCK_ELEMENTS,
+    progress: Optional[ProgressCallback] = None,
+) -> np.ndarray:
+    """Return integrated POA irradiance with shape ``(len(tilts), len(azimuths))``."""
+
+    tilt_grid, azimuth_grid = np.meshgrid(tilts, azimuths, indexing="ij")
+    energy = _orientation_energy(
+        sky, tilt_grid, azimuth_grid, max_block_elements=max_block_elements, progress=progress
+    )
+    return energy.reshape(tilt_grid.shape)
+
+
+class _LatticeSearch:
+    """Evaluate and search the exhaustive tilt/azimuth lattice lazily.
+
+    Points are addressed by their indices into ``tilts``/``azimuths``, so every
+    strategy ends on a point the exhaustive grid would also have evaluated.
+    Azimuth indices wrap around; tilt indices are clipped to the sweep bounds.
+    """
+
+    # Target number of samples per axis for the coarse first pass.
+    COARSE_TILT_POINTS = 7
+    COARSE_AZIMUTH_POINTS = 16
+
+    def __init__(
+        self,
+        sky: _SkyTerms,
+        tilts: np.ndarray,
+        azimuths: np.ndarray,
+        progress: Optional[ProgressCallback] = None,
+        known: Optional[np.ndarray] = None,
+    ) -> None:
+        self.sky = sky
+        self.tilts = tilts
+        self.azimuths = azimuths
+        self.progress = progress
+        # Energies evaluated by earlier sweeps (NaN where unknown).
+        self.known = known
+        self.completed = 0.0
+        self.reused = 0
+        self.energies: dict[Tuple[int, int], float] = {}
+        n_tilts, n_azimuths = tilts.size, azimuths.size
+        self.tilt_stride = max(1, int(np.ceil((n_tilts - 1) / (self.COARSE_TILT_POINTS - 1))))
+        self.azimuth_stride = max(1, int(np.ceil(n_azimuths / self.COARSE_AZIMUTH_POINTS)))
+
+    def best_of(self, tilt_idx: np.ndarray, azimuth_idx: np.ndarray) -> Tuple[int, int]:
+        """Return the best lattice point of the mesh ``tilt_idx x azimuth_idx``."""
+
+        tilt_idx = np.unique(np.clip(tilt_idx, 0, self.tilts.size - 1))
+        azimuth_idx = np.unique(np.mod(azimuth_idx, self.azimuths.size))
+        pairs = [(int(i), int(j)) for i in tilt_idx for j in azimuth_idx]
+        missing = [pair for pair in pairs if pair not in self.energies]
+        if missing and self.known is not None:
+            reused = {pair: float(self.known[pair]) for pair in missing if not np.isnan(self.known[pair])}
+            self.energies.update(reused)
+            self.reused += len(reused)
+            missing = [pair for pair in missing if pair not in reused]
+        if missing:
+            rows, cols = np.array(missing).T
+            values = _orientation_energy(self.sky, self.tilts[rows], self.azimuths[cols])
+            self.energies.update(zip(missing, values.tolist()))
+        if self.progress is not None:
+            # The number of refinement steps is not known up front: the coarse
+            # pass counts as half the work and each later step halves the rest.
+            self.completed = 0.5 if not self.completed else (1 + self.completed) / 2
+            self.progress(self.completed)
+        # Ties resolve to the lowest (tilt, azimuth) index like the full grid.
+        return max(pairs, key=lambda pair: (self.energies[pair], -pair[0], -pair[1]))
+
+    def coarse(self) -> Tuple[int, int]:
+        return self.best_of(
+            np.arange(0, self.tilts.size, self.tilt_stride),
+            np.arange(0, self.azimuths.size, self.azimuth_stride),
+        )
+
+    def hill_climb(self, best: Tuple[int, int]) -> Tuple[int, int]:
+        """Move to the best 8-neighbour until ``best`` is a local maximum."""
+
+        while True:
+            i, j = best
+            candidate = self.best_of(np.arange(i - 1, i + 2), np.arange(j - 1, j + 2))
+            if candidate == best:
+                return best
+            best = candidate
+
+    def refine(self) -> Tuple[int, int]:
+        """Coarse grid, then repeatedly halve the step around the best cell."""
+
+        best = self.coarse()
+        tilt_stride, azimuth_stride = self.tilt_stride, self.azimuth_stride
+        while tilt_stride > 1 or azimuth_stride > 1:
+            next_tilt, next_azimuth = max(1, tilt_stride // 2), max(1, azimuth_stride // 2)
+            i, j = best
+            best = self.best_of(
+                np.arange(i - tilt_stride, i + tilt_stride + 1, next_tilt),
+                np.arange(j - azimuth_stride, j + azimuth_stride + 1, next_azimuth),
+            )
+            tilt_stride, azimuth_stride = next_tilt, next_azimuth
+        return self.hill_climb(best)
+
+    def optimize(self) -> Tuple[int, int]:
+        """Coarse grid, then a bounded Powell (Brent line search) polish."""
+
+        i, j = self.coarse()
+        tilt_lo = self.tilts[max(i - self.tilt_stride, 0)]
+        tilt_hi = self.tilts[min(i + self.tilt_stride, self.tilts.size - 1)]
+        azimuth_span = self.azimuth_stride * (self.azimuths[1] - self.azimuths[0]) if self.azimuths.size > 1 else 0.0
+        azimuth0 = self.azimuths[j]
+
+        def negative_energy(x: np.ndarray) -> float:
+            if self.progress is not None:
+                self.progress(self.completed)
+            return -float(_orientation_energy(self.sky, np.array([x[0]]), np.array([x[1]]))[0])
+
+        solution = optimize.minimize(
+            negative_energy,
+            x0=np.array([self.tilts[i], azimuth0]),
+            method="Powell",
+            bounds=[(tilt_lo, tilt_hi), (azimuth0 - azimuth_span, azimuth0 + azimuth_span)],
+        )
+        tilt, azimuth = solution.x
+        azimuth_gap = np.abs((self.azimuths - azimuth + 180) % 360 - 180)
+        best = (int(np.argmin(np.abs(self.tilts - tilt))), int(np.argmin(azimuth_gap)))
+        return self.hill_climb(best)
+
+
 def optimise_orientation(
     site: SiteParameters,
     *,
@@ -63,40 +824,202 @@ def optimise_orientation(
     tilt_range: Iterable[float],
     azimuth_range: Iterable[float],
     freq: str = "1h",
+    include_surface: bool = False,
+    strategy: str = "grid",
+    day_step: int = 1,
+    progress: Optional[ProgressCallback] = None,
+    max_year_shift: float = 0.0,
+    chunk: Optional[str] = None,
+    workers: int = 1,
+    weather: Optional[str | os.PathLike] = None,
 ) -> OrientationResult:
-    times = _build_time_index(year, site, freq=freq)
-    solpos, clearsky, dni_extra = _prepare_meteorology(times, site)
-
-    best_result: OrientationResult | None = None
-
-    solar_zenith = solpos["apparent_zenith"]
-    solar_azimuth = solpos["azimuth"]
-
-    dni = clearsky["dni"]
-    ghi = clearsky["ghi"]
-    dhi = clearsky["dhi"]
-
-    for tilt in tilt_range:
-        for azimuth in azimuth_range:
-            poa = irradiance.get_total_irradiance(
-                surface_tilt=tilt,
-                surface_azimuth=azimuth % 360,
-                solar_zenith=solar_zenith,
-                solar_azimuth=solar_azimuth,
-                dni=dni,
-                ghi=ghi,
-                dhi=dhi,
-                dni_extra=dni_extra,
-                model="haydavies",
-            )
-            energy = float(np.nansum(poa["poa_global"]))
-            if best_result is None or energy > best_result.annual_poa_irradiance:
-                best_result = OrientationResult(tilt=tilt, azimuth=azimuth % 360, annual_poa_irradiance=energy)
+    """Find the tilt/azimuth pair with the highest integrated POA irradiance.
+
+    ``strategy="grid"`` evaluates every pair. ``"refine"`` and ``"optimize"``
+    expect ascending, evenly spaced ranges and only evaluate a small part of
+    the grid: both start from a coarse sub-grid and finish with a hill climb
+    on the requested lattice, so the answer is a grid point that beats all of
+    its neighbours one step away. On the smooth, single-peaked clear-sky
+    surface this is the exhaustive optimum.
+
+    ``day_step > 1`` switches to an approximate annual total: only the middle
+    day of every ``day_step``-day block is simulated and weighted by the block
+    length. The result then carries ``estimated_error``, the largest relative
+    gap at the optimum between that rule and the two interleaved rules with
+    doubled spacing, a rough (usually conservative) estimate of the error
+    versus the full-year run.
+
+    ``progress`` is called with the completed fraction of the sweep as it
+    advances and with ``1.0`` at the end; an exception raised from it
+    aborts the search.
 
-    if best_result is None:
+    Cells evaluated by earlier calls for the same site, year, ``freq`` and
+    ``day_step`` are reused, so widening ``tilt_range`` or refining a step
+    only evaluates the new cells. With ``max_year_shift > 0`` a grid search
+    may instead be answered entirely from another year with the same number
+    of days whose sun positions differ by at most that many degrees on
+    average (``derived_from_year`` names it); annual totals then differ by
+    roughly 1e-4.
+
+    ``chunk="month"`` or ``"week"`` streams the year: meteorology is
+    computed (and disk-cached) per chunk and energy totals are accumulated,
+    so peak memory no longer grows with ``freq``; ``workers`` chunks are
+    processed concurrently. ``"auto"`` streams by month for sub-hourly
+    ``freq``. Results match the single-pass run up to rounding.
+
+    ``weather`` names a TMY/EPW/CSV weather file whose measured irradiance,
+    laid onto ``year``, replaces the clear-sky model; ``freq`` is then the
+    file's. The file is parsed on first use only (see ``backend.weather``),
+    and a ``ValueError`` is raised if it records coordinates far from ``site``.
+    """
+
+    if strategy not in SEARCH_STRATEGIES:
+        raise ValueError(f"Unknown search strategy {strategy!r}; expected one of {', '.join(SEARCH_STRATEGIES)}.")
+    if include_surface and strategy != "grid":
+        raise ValueError("The full energy surface is only available with strategy='grid'.")
+
+    if day_step < 1:
+        raise ValueError("day_step must be a positive number of days.")
+    if day_step > 1 and np.count_nonzero(_representative_day_weights(year, day_step)) < 2:
+        # estimated_error compares the two halves of the representative days.
+        raise ValueError("day_step must leave at least two representative days in the year.")
+    if workers < 1:
+        raise ValueError("workers must be a positive integer.")
+    record = None
+    if weather is not None:
+        record = load_weather(weather)
+        record.check_site(site)
+        freq = record.freq
+    parse_freq(freq)
+    chunk = _resolve_chunk(chunk, freq)
+
+    tilts = np.asarray(list(tilt_range), dtype=float)
+    azimuths = np.asarray(list(azimuth_range), dtype=float) % 360
+    if tilts.size == 0 or azimuths.size == 0:
         raise RuntimeError("No valid orientations evaluated")
 
-    return best_result
+    # Sweeps over a weather file only share cells with sweeps over the same file.
+    sky_source = freq if record is None else record.key
+    context = (site.latitude, site.longitude, site.altitude, site.timezone, year, sky_source, day_step)
+    known = _SURFACE_MEMO.lookup(context, tilts, azimuths)
+    missing = np.isnan(known)
+    derived_from_year = None
+    if strategy == "grid" and max_year_shift > 0 and missing.any():
+        similar = _similar_year_energy(context, tilts, azimuths, max_year_shift)
+        if similar is not None:
+            known, derived_from_year = similar
+            missing = np.zeros_like(missing)
+
+    day_weights = _representative_day_weights(year, day_step)
+    if chunk is not None and strategy != "grid":
+        # Lattice searches evaluate orientations on demand and keep compact whole-year sky terms.
+        class_skies = _chunked_class_skies(site, year, freq, day_step, chunk=chunk, workers=workers, weather=record)
+        with stage("sky_terms"):
+            sky = _concatenate_skies(class_skies)
+    # Chunked grid sweeps stream their cells through the chunks below. A fully
+    # known grid needs no sky terms unless day_step > 1 asks for the error estimate.
+    elif chunk is None and (strategy != "grid" or missing.any() or day_step > 1):
+        solpos, clearsky, dni_extra = _site_meteorology(site, year, freq, day_step, weather=record)
+        day_index = solpos.index.dayofyear.to_numpy() - 1
+        with stage("sky_terms"):
+            sky = _sky_terms(solpos, clearsky, dni_extra, weights=day_weights[day_index] if day_step > 1 else None)
+
+    with stage("irradiance_sweep"):
+        if strategy == "grid":
+            class_energy = None
+            if chunk is not None:
+                energy = known
+                if missing.any():
+                    tilt_grid, azimuth_grid = np.meshgrid(tilts, azimuths, indexing="ij")
+                    class_energy = _chunked_energy(
+                        site,
+                        year,
+                        freq,
+                        day_step,
+                        tilt_grid[missing],
+                        azimuth_grid[missing],
+                        chunk=chunk,
+                        workers=workers,
+                        progress=progress,
+                        weather=record,
+                    )
+                    energy[missing] = class_energy.sum(axis=0)
+            elif missing.all():
+                energy = _annual_poa_grid(sky, tilts, azimuths, progress=progress)
+            else:
+                energy = known
+                if missing.any():
+                    tilt_grid, azimuth_grid = np.meshgrid(tilts, azimuths, indexing="ij")
+                    energy[missing] = _orientation_energy(
+                        sky, tilt_grid[missing], azimuth_grid[missing], progress=progress
+                    )
+            n_computed = int(missing.sum())
+            _SURFACE_MEMO.record(reused=energy.size - n_computed, computed=n_computed)
+            if n_computed:
+                _SURFACE_MEMO.store(context, tilts, azimuths, energy)
+            # argmax returns the first maximum in tilt-major order, matching the
+            # original nested sweep which only replaced the best on strict improvement.
+            tilt_idx, azimuth_idx = np.unravel_index(int(np.argmax(energy)), energy.shape)
+            best_energy = float(energy[tilt_idx, azimuth_idx])
+            surface = EnergySurface(tilts=tilts, azimuths=azimuths, energy=energy) if include_surface else None
+        else:
+            search = _LatticeSearch(sky, tilts, azimuths, progress=progress, known=known)
+            tilt_idx, azimuth_idx = search.refine() if strategy == "refine" else search.optimize()
+            best_energy = search.energies[(tilt_idx, azimuth_idx)]
+            surface = None
+            rows, cols = (np.unique(axis) for axis in np.array(list(search.energies)).T)
+            evaluated = np.full((rows.size, cols.size), np.nan)
+            for (i, j), value in search.energies.items():
+                evaluated[np.searchsorted(rows, i), np.searchsorted(cols, j)] = value
+            _SURFACE_MEMO.record(reused=search.reused, computed=len(search.energies) - search.reused)
+            _SURFACE_MEMO.store(context, tilts[rows], azimuths[cols], evaluated)
+
+    estimated_error = None
+    if day_step > 1 and chunk is not None:
+        if strategy != "grid":
+            best_classes = [
+                _orientation_energy(class_sky, tilts[[tilt_idx]], azimuths[[azimuth_idx]])[0] for class_sky in class_skies
+            ]
+        elif missing[tilt_idx, azimuth_idx]:
+            best_classes = class_energy[:, int(np.count_nonzero(missing.ravel()[: tilt_idx * azimuths.size + azimuth_idx]))]
+        else:
+            best_classes = _chunked_energy(
+                site,
+                year,
+                freq,
+                day_step,
+                tilts[[tilt_idx]],
+                azimuths[[azimuth_idx]],
+                chunk=chunk,
+                workers=workers,
+                weather=record,
+            )[:, 0]
+        estimated_error = _interleaved_error(best_energy, best_classes, day_weights)
+    elif day_step > 1:
+        # Two interleaved coarser rules (even / odd representative days,
+        # re-weighted to cover the whole year); their spread around the fine
+        # rule estimates the quadrature error.
+        sampled_days = np.flatnonzero(day_weights)
+        gaps = []
+        for offset in (0, 1):
+            kept = sampled_days[offset::2]
+            coarse_weights = np.zeros_like(day_weights)
+            coarse_weights[kept] = day_weights[kept] * day_weights.sum() / day_weights[kept].sum()
+            coarse_sky = _sky_terms(solpos, clearsky, dni_extra, weights=coarse_weights[day_index])
+            coarse_energy = _orientation_energy(coarse_sky, tilts[[tilt_idx]], azimuths[[azimuth_idx]])[0]
+            gaps.append(abs(best_energy - float(coarse_energy)))
+        estimated_error = max(gaps) / best_energy if best_energy else 0.0
+
+    if progress is not None:
+        progress(1.0)
+    return OrientationResult(
+        tilt=float(tilts[tilt_idx]),
+        azimuth=float(azimuths[azimuth_idx]),
+        annual_poa_irradiance=best_energy,
+        surface=surface,
+        estimated_error=estimated_error,
+        derived_from_year=derived_from_year,
+    )
 
 
 def _default_tilt_range(step: float = 1.0, max_tilt: float = 60.0) -> np.ndarray:
@@ -116,6 +1039,14 @@ def calculate_optimal_orientation(
     tilt_max: float = 60.0,
     azimuth_step: float = 5.0,
     freq: str = "1h",
+    include_surface: bool = False,
+    strategy: str = "grid",
+    day_step: int = 1,
+    progress: Optional[ProgressCallback] = None,
+    max_year_shift: float = 0.0,
+    chunk: Optional[str] = None,
+    workers: int = 1,
+    weather: Optional[str | os.PathLike] = None,
 ) -> OrientationResult:
     site_params = site or DEFAULT_SITE
     tilt_values = _default_tilt_range(step=tilt_step, max_tilt=tilt_max)
@@ -126,6 +1057,14 @@ def calculate_optimal_orientation(
         tilt_range=tilt_values,
         azimuth_range=azimuth_values,
         freq=freq,
+        include_surface=include_surface,
+        strategy=strategy,
+        day_step=day_step,
+        progress=progress,
+        max_year_shift=max_year_shift,
+        chunk=chunk,
+        workers=workers,
+        weather=weather,
     )
 
 
@@ -136,6 +1075,30 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--tilt-max", type=float, default=60.0)
     parser.add_argument("--azimuth-step", type=float, default=5.0)
     parser.add_argument("--freq", default="1h", help="Time resolution for simulation (default: %(default)s)")
+    parser.add_argument(
+        "--strategy",
+        choices=SEARCH_STRATEGIES,
+        default="grid",
+        help="Search strategy: exhaustive grid, coarse-to-fine refine or bounded optimize (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--day-step",
+        type=int,
+        default=1,
+        help="Simulate one representative day per block of this many days (default: %(default)s = full year)",
+    )
+    parser.add_argument(
+        "--chunk",
+        choices=(*CHUNK_SIZES, "auto"),
+        default=None,
+        help="Stream the year in chunks to bound memory for fine --freq (default: whole year at once)",
+    )
+    parser.add_argument("--chunk-workers", type=int, default=1, help="Chunks processed concurrently (default: %(default)s)")
+    parser.add_argument(
+        "--weather",
+        help="TMY3/EPW/CSV weather file to optimise against instead of clear sky; "
+        "its coordinates and time zone are the site defaults",
+    )
     parser.add_argument("--lat", type=float, help="Latitude in decimal degrees")
     parser.add_argument("--lon", type=float, help="Longitude in decimal degrees")
     parser.add_argument("--alt", type=float, help="Altitude in metres")
@@ -144,16 +1107,64 @@ def parse_args() -> argparse.Namespace:
         default=None,
         help="Timezone name (default: site configuration or Asia/Ho_Chi_Minh)",
     )
-    return parser.parse_args()
+    batch = parser.add_argument_group("batch mode")
+    batch.add_argument(
+        "--sites",
+        help="CSV/JSON/JSONL file of sites (lat, lon, alt, tz, name, id) to optimise instead of a single site",
+    )
+    batch.add_argument("--output", help="JSON Lines file receiving one result per site; reruns resume from it")
+    batch.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    batch.add_argument("--chunksize", type=int, default=1, help="Sites handed to a worker at a time (default: %(default)s)")
+    args = parser.parse_args()
+    if args.sites and not args.output:
+        parser.error("--output is required with --sites")
+    if args.sites and args.weather:
+        parser.error("--weather describes one site and cannot be combined with --sites")
+    return args
+
+
+def _run_batch(args: argparse.Namespace) -> None:
+    from .portfolio import load_sites, run_portfolio
+
+    sites = load_sites(args.sites, default_timezone=args.tz or DEFAULT_SITE.timezone)
+    count = run_portfolio(
+        sites,
+        args.output,
+        workers=args.workers,
+        chunksize=args.chunksize,
+        progress=True,
+        year=args.year,
+        tilt_step=args.tilt_step,
+        tilt_max=args.tilt_max,
+        azimuth_step=args.azimuth_step,
+        freq=args.freq,
+        strategy=args.strategy,
+        day_step=args.day_step,
+        chunk=args.chunk,
+    )
+    print(f"Optimised {count} of {len(sites)} sites ({len(sites) - count} already in {args.output})")
 
 
 def main() -> None:
     args = parse_args()
+    if args.sites:
+        _run_batch(args)
+        return
+    defaults = DEFAULT_SITE
+    if args.weather:
+        record = load_weather(args.weather)
+        if record.latitude is not None and record.longitude is not None:
+            defaults = SiteParameters(
+                latitude=record.latitude,
+                longitude=record.longitude,
+                altitude=record.altitude if record.altitude is not None else 0.0,
+                timezone=record.timezone,
+            )
     site = SiteParameters(
-        latitude=args.lat if args.lat is not None else DEFAULT_SITE.latitude,
-        longitude=args.lon if args.lon is not None else DEFAULT_SITE.longitude,
-        altitude=args.alt if args.alt is not None else DEFAULT_SITE.altitude,
-        timezone=args.tz or DEFAULT_SITE.timezone,
+        latitude=args.lat if args.lat is not None else defaults.latitude,
+        longitude=args.lon if args.lon is not None else defaults.longitude,
+        altitude=args.alt if args.alt is not None else defaults.altitude,
+        timezone=args.tz or defaults.timezone,
         name="CLI site",
     )
     result = calculate_optimal_orientation(
@@ -163,15 +1174,30 @@ def main() -> None:
         tilt_max=args.tilt_max,
         azimuth_step=args.azimuth_step,
         freq=args.freq,
+        strategy=args.strategy,
+        day_step=args.day_step,
+        chunk=args.chunk,
+        workers=args.chunk_workers,
+        weather=args.weather,
     )
     print(
         f"Optimal tilt: {result.tilt:.1f}°, azimuth: {result.azimuth:.1f}° "
         f"(annual POA ≈ {result.annual_poa_irradiance/1000:.1f} kWh/m²)"
     )
+    if result.estimated_error is not None:
+        print(f"Approximate mode: estimated error ±{result.estimated_error * 100:.2f}%")
 
 
 if __name__ == "__main__":
     main()
 
 
-__all__ = ["calculate_optimal_orientation", "OrientationResult"]
+__all__ = [
+    "calculate_optimal_orientation",
+    "EnergySurface",
+    "OrientationResult",
+    "ProgressCallback",
+    "parse_freq",
+    "CHUNK_SIZES",
+    "SEARCH_STRATEGIES",
+]
@@ -0,0 +1,208 @@
+"""Batch orientation optimisation for portfolios of candidate sites.
+
+Sites are read from a CSV or JSON file and distributed over a process pool.
+Each finished site is appended to a JSON Lines output file straight away, so
+an interrupted run can be resumed: sites whose ``id`` already appears in the
+output are skipped.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
+
+import pytz
+from pytz import UnknownTimeZoneError
+
+from .orientation_optimizer import calculate_optimal_orientation
+from .solar_calculator import DEFAULT_SITE, SiteParameters
+
+# Accepted column / key spellings for each site field.
+_FIELD_ALIASES = {
+    "latitude": ("lat", "latitude"),
+    "longitude": ("lon", "lng", "longitude"),
+    "altitude": ("alt", "altitude"),
+    "timezone": ("tz", "timezone"),
+}
+
+SiteTask = Tuple[str, SiteParameters, Dict[str, object]]
+
+
+def _field(record: dict, name: str) -> object:
+    for alias in _FIELD_ALIASES[name]:
+        value = record.get(alias)
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def _site_from_record(record: dict, default_timezone: str) -> SiteParameters:
+    latitude, longitude = _field(record, "latitude"), _field(record, "longitude")
+    if latitude is None or longitude is None:
+        raise ValueError("each site needs lat and lon")
+    altitude = _field(record, "altitude")
+    timezone_name = str(_field(record, "timezone") or default_timezone)
+    try:
+        pytz.timezone(timezone_name)
+    except UnknownTimeZoneError as exc:
+        raise ValueError(f"invalid timezone {timezone_name!r}") from exc
+    return SiteParameters(
+        latitude=float(latitude),
+        longitude=float(longitude),
+        altitude=float(altitude) if altitude is not None else DEFAULT_SITE.altitude,
+        timezone=timezone_name,
+        name=str(record.get("name") or ""),
+    )
+
+
+def _read_records(path: Path) -> List[dict]:
+    if path.suffix.lower() == ".csv":
+        with path.open(newline="", encoding="utf-8") as handle:
+            return list(csv.DictReader(handle))
+    text = path.read_text(encoding="utf-8")
+    if path.suffix.lower() in (".jsonl", ".ndjson"):
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+    data = json.loads(text)
+    if isinstance(data, dict):
+        data = data.get("sites", [])
+    if not isinstance(data, list):
+        raise ValueError("JSON site file must contain a list of site objects")
+    return data
+
+
+def load_sites(path: str | os.PathLike, *, default_timezone: str = DEFAULT_SITE.timezone) -> List[Tuple[str, SiteParameters]]:
+    """Read ``(id, site)`` pairs from a CSV, JSON or JSON Lines file.
+
+    Columns/keys: ``lat``/``latitude``, ``lon``/``longitude``, optional
+    ``alt``/``altitude``, ``tz``/``timezone``, ``name`` and ``id``. Rows
+    without an ``id`` are identified by their 0-based position.
+    """
+
+    sites = []
+    seen: Set[str] = set()
+    for position, record in enumerate(_read_records(Path(path))):
+        raw_id = record.get("id")
+        site_id = str(position) if raw_id in (None, "") else str(raw_id)
+        if site_id in seen:
+            raise ValueError(f"duplicate site id {site_id!r}")
+        seen.add(site_id)
+        try:
+            sites.append((site_id, _site_from_record(record, default_timezone)))
+        except (TypeError, ValueError) as exc:
+            raise ValueError(f"site {site_id!r}: {exc}") from exc
+    return sites
+
+
+def completed_ids(output: str | os.PathLike) -> Set[str]:
+    """Return ids already written to ``output``, dropping a torn final line.
+
+    A run killed mid-write can leave an incomplete last line; it is truncated
+    so that appended results start on a clean line.
+    """
+
+    path = Path(output)
+    if not path.exists():
+        return set()
+    data = path.read_bytes()
+    complete = data[: data.rfind(b"\n") + 1]
+    if len(complete) != len(data):
+        with path.open("r+b") as handle:
+            handle.truncate(len(complete))
+    done = set()
+    for line in complete.decode("utf-8").splitlines():
+        try:
+            done.add(str(json.loads(line)["id"]))
+        except (ValueError, KeyError, TypeError):
+            continue
+    return done
+
+
+def _optimise_site(task: SiteTask) -> dict:
+    site_id, site, options = task
+    record: dict = {
+        "id": site_id,
+        "name": site.name,
+        "latitude": site.latitude,
+        "longitude": site.longitude,
+        "altitude": site.altitude,
+        "timezone": site.timezone,
+    }
+    try:
+        result = calculate_optimal_orientation(site, **options)
+    except (RuntimeError, ValueError) as exc:
+        record["error"] = str(exc)
+        return record
+    record.update(
+        tilt=result.tilt,
+        azimuth=result.azimuth,
+        annual_poa_kwh_m2=round(result.annual_poa_irradiance / 1000, 3),
+        estimated_error=result.estimated_error,
+    )
+    return record
+
+
+def _optimise_batch(tasks: List[SiteTask]) -> List[dict]:
+    return [_optimise_site(task) for task in tasks]
+
+
+def optimise_sites(
+    sites: Iterable[Tuple[str, SiteParameters]],
+    *,
+    workers: int | None = None,
+    chunksize: int = 1,
+    **options: object,
+) -> Iterator[dict]:
+    """Yield one result record per ``(id, site)`` as soon as its batch of ``chunksize`` sites finishes.
+
+    ``options`` are forwarded to ``calculate_optimal_orientation``; a site it
+    rejects yields a record with an ``error`` message. Records arrive in
+    completion order, so a slow site does not hold back the sites finished
+    after it.
+    """
+
+    tasks = [(site_id, site, dict(options)) for site_id, site in sites]
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, chunksize)
+    if workers <= 1:
+        yield from map(_optimise_site, tasks)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        batches = [tasks[start : start + chunksize] for start in range(0, len(tasks), chunksize)]
+        for future in as_completed([executor.submit(_optimise_batch, batch) for batch in batches]):
+            yield from future.result()
+
+
+def run_portfolio(
+    sites: Iterable[Tuple[str, SiteParameters]],
+    output: str | os.PathLike,
+    *,
+    workers: int | None = None,
+    chunksize: int = 1,
+    progress: bool = False,
+    **options: object,
+) -> int:
+    """Optimise every site not yet present in ``output``; return how many ran.
+
+    ``options`` are forwarded to ``calculate_optimal_orientation``. Results
+    are appended to ``output`` as JSON Lines and flushed one site at a time,
+    in completion order when ``workers > 1``.
+    """
+
+    done = completed_ids(output)
+    pending = [(site_id, site) for site_id, site in sites if site_id not in done]
+    with open(output, "a", encoding="utf-8") as handle:
+        records = optimise_sites(pending, workers=workers, chunksize=chunksize, **options)
+        for count, record in enumerate(records, start=1):
+            handle.write(json.dumps(record, ensure_ascii=False) + "\n")
+            handle.flush()
+            if progress:
+                print(f"[{count}/{len(pending)}] {record['id']}", file=sys.stderr)
+    return len(pending)
+
+
+__all__ = ["completed_ids", "load_sites", "optimise_sites", "run_portfolio"]
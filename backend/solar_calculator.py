@@ -2,10 +2,12 @@
 
 from __future__ import annotations
 
+import importlib.util
+import os
 from dataclasses import dataclass
 from datetime import date, datetime, time, timedelta
 from functools import lru_cache
-from typing import Optional
+from typing import Iterable, Iterator, Optional, Sequence, Tuple
 
 import numpy as _np
 import pandas as pd
@@ -15,9 +17,10 @@ import pytz
 if not hasattr(_np, "Inf"):  # pragma: no cover - defensive coding
     _np.Inf = _np.inf  # type: ignore[attr-defined]
 
-from pvlib import solarposition
+from pvlib import solarposition, spa
 
-from . import config
+from . import config, spa_numpy
+from .instrumentation import stage
 
 
 @dataclass(frozen=True)
@@ -43,6 +46,69 @@ class SiteParameters:
     name: str = "Custom Location"
 
 
+# Defaults used by solarposition.spa_python; the batch path passes them to
+# pvlib.spa directly so both paths agree exactly.
+_SPA_PRESSURE_MBAR = 1013.25
+_SPA_TEMPERATURE_C = 12.0
+_SPA_DELTA_T = 67.0
+_SPA_ATMOS_REFRACT = 0.5667
+_SPA_THREADS = 4
+
+# "pandas" is the reference path through solarposition.spa_python; "numpy"
+# is the vectorised re-implementation in backend.spa_numpy working on raw
+# epoch arrays; "numba" runs a numba-compiled copy of pvlib.spa (requires
+# numba and a single site per call); "table" interpolates the precomputed
+# tables of backend.sun_table (single site, within 0.01 degrees of SPA).
+SPA_ENGINES = ("pandas", "numpy", "numba", "table")
+
+
+@dataclass(frozen=True)
+class SunPositionBatch:
+    """Columnar sun positions for every (site, timestamp) pair.
+
+    Rows are ordered site-major: all timestamps of ``sites[0]`` first, then
+    ``sites[1]`` and so on. ``site_index`` maps each row back to ``sites``.
+    """
+
+    sites: Tuple[SiteParameters, ...]
+    timestamps: pd.DatetimeIndex  # UTC
+    site_index: _np.ndarray
+    elevation: _np.ndarray
+    azimuth: _np.ndarray
+    zenith: _np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @property
+    def is_daytime(self) -> _np.ndarray:
+        return self.elevation > 0
+
+
+@dataclass(frozen=True)
+class SunPathBatch:
+    """Sun paths of consecutive days as arrays, before JSON formatting.
+
+    Every day is sampled ``samples_per_day`` times from local midnight;
+    samples are ordered day-major. Angles are rounded to 0.01 degrees like
+    the JSON payload; sunrise/sunset/solar noon are local ``HH:MM`` labels
+    (``None`` when the event does not occur).
+    """
+
+    site: SiteParameters
+    days: Tuple[date, ...]
+    timestamps: pd.DatetimeIndex  # UTC
+    elevation: _np.ndarray
+    azimuth: _np.ndarray
+    sunrise: list
+    sunset: list
+    solar_noon: list
+
+    @property
+    def samples_per_day(self) -> int:
+        return len(self.timestamps) // len(self.days)
+
+
 DEFAULT_SITE = SiteParameters(
     latitude=config.LATITUDE,
     longitude=config.LONGITUDE,
@@ -52,6 +118,10 @@ DEFAULT_SITE = SiteParameters(
 )
 
 
+# "HH:MM" label for every minute of the day, indexed by minute-of-day.
+_CLOCK_LABELS = _np.array([f"{hour:02d}:{minute:02d}" for hour in range(24) for minute in range(60)], dtype=object)
+
+
 @lru_cache(maxsize=16)
 def _timezone_for(site: SiteParameters) -> pytz.BaseTzInfo:
     return pytz.timezone(site.timezone)
@@ -69,33 +139,292 @@ def _round(value: float) -> float:
     return round(float(value), 2)
 
 
-def _build_position(timestamp: pd.Timestamp, solpos_row: pd.Series) -> SunPosition:
-    return SunPosition(
-        timestamp=timestamp.to_pydatetime(),
-        elevation=_round(solpos_row["apparent_elevation"]),
-        azimuth=_round(solpos_row["azimuth"]),
-        zenith=_round(solpos_row["apparent_zenith"]),
+@lru_cache(maxsize=None)
+def _numba_spa():
+    """Load a private copy of ``pvlib.spa`` compiled with numba.
+
+    pvlib picks numba or NumPy once, at import time, from ``PVLIB_USE_NUMBA``.
+    Loading a second copy of the module leaves the shared ``pvlib.spa`` (and
+    every other caller) on the NumPy implementation.
+    """
+
+    if importlib.util.find_spec("numba") is None:
+        raise ValueError("The 'numba' SPA engine requires numba to be installed.")
+    spec = importlib.util.spec_from_file_location(f"{__name__}._spa_numba", spa.__file__)
+    module = importlib.util.module_from_spec(spec)
+    previous = os.environ.get("PVLIB_USE_NUMBA")
+    os.environ["PVLIB_USE_NUMBA"] = "1"
+    try:
+        spec.loader.exec_module(module)
+    finally:
+        if previous is None:
+            del os.environ["PVLIB_USE_NUMBA"]
+        else:
+            os.environ["PVLIB_USE_NUMBA"] = previous
+    return module
+
+
+def solar_position_arrays(
+    epoch: _np.ndarray,
+    latitude: float | _np.ndarray,
+    longitude: float | _np.ndarray,
+    altitude: float | _np.ndarray,
+    *,
+    engine: Optional[str] = None,
+) -> Tuple[_np.ndarray, _np.ndarray, _np.ndarray]:
+    """Return unrounded ``(apparent_elevation, azimuth, apparent_zenith)`` in degrees.
+
+    ``epoch`` holds Unix timestamps in seconds. With the ``"numpy"`` engine
+    the coordinates may also be arrays matching ``epoch``; the other engines
+    take a single site. ``engine`` defaults to ``config.SPA_ENGINE``. All
+    engines agree to within 0.01 degrees.
+    """
+
+    engine = engine or config.SPA_ENGINE
+    if engine not in SPA_ENGINES:
+        raise ValueError(f"Unknown SPA engine {engine!r}; expected one of {', '.join(SPA_ENGINES)}.")
+    epoch = _np.ascontiguousarray(epoch, dtype=float)
+    if engine == "pandas":
+        times = pd.DatetimeIndex(_np.round(epoch * 1e9).astype(_np.int64), tz="UTC")
+        solpos = solarposition.spa_python(times, latitude=latitude, longitude=longitude, altitude=altitude)
+        return (
+            solpos["apparent_elevation"].to_numpy(dtype=float),
+            solpos["azimuth"].to_numpy(dtype=float),
+            solpos["apparent_zenith"].to_numpy(dtype=float),
+        )
+    if engine == "table":
+        from .sun_table import table_positions  # sun_table builds on this module
+
+        return table_positions(epoch, latitude, longitude, altitude)
+    if engine == "numpy":
+        return spa_numpy.solar_position(
+            epoch,
+            latitude,
+            longitude,
+            altitude,
+            _SPA_PRESSURE_MBAR,
+            _SPA_TEMPERATURE_C,
+            _SPA_DELTA_T,
+            _SPA_ATMOS_REFRACT,
+        )
+    apparent_zenith, _, apparent_elevation, _, azimuth, _ = _numba_spa().solar_position(
+        epoch,
+        latitude,
+        longitude,
+        altitude,
+        _SPA_PRESSURE_MBAR,
+        _SPA_TEMPERATURE_C,
+        _SPA_DELTA_T,
+        _SPA_ATMOS_REFRACT,
+        _SPA_THREADS,
     )
+    return apparent_elevation, azimuth, apparent_zenith
 
 
 def get_sun_position(
     when: Optional[datetime] = None,
     *,
     site: SiteParameters | None = None,
+    engine: Optional[str] = None,
 ) -> SunPosition:
-    """Return the sun position for the provided datetime (defaults to now)."""
+    """Return the sun position for the provided datetime (defaults to now).
+
+    ``engine`` selects the SPA implementation (see ``SPA_ENGINES``).
+    """
 
     site_params = site or DEFAULT_SITE
     tz = _timezone_for(site_params)
-    target_time = _ensure_timezone(when or datetime.now(tz=tz), tz)
-    times = pd.DatetimeIndex([target_time])
-    solpos = solarposition.spa_python(
-        times,
-        latitude=site_params.latitude,
-        longitude=site_params.longitude,
-        altitude=site_params.altitude,
+    target_time = pd.Timestamp(_ensure_timezone(when or datetime.now(tz=tz), tz))
+    with stage("spa"):
+        elevation, azimuth, zenith = solar_position_arrays(
+            _np.array([target_time.value / 1e9]),
+            site_params.latitude,
+            site_params.longitude,
+            site_params.altitude,
+            engine=engine,
+        )
+    return SunPosition(
+        timestamp=target_time.to_pydatetime(),
+        elevation=_round(elevation[0]),
+        azimuth=_round(azimuth[0]),
+        zenith=_round(zenith[0]),
+    )
+
+
+def _utc_index(times: Sequence[datetime], tz: pytz.BaseTzInfo) -> pd.DatetimeIndex:
+    """Convert datetimes to UTC, treating naive values as local to ``tz``."""
+
+    aware = [_ensure_timezone(value, tz) for value in times]
+    return pd.DatetimeIndex(aware).tz_convert("UTC") if aware else pd.DatetimeIndex([], tz="UTC")
+
+
+def get_sun_positions(
+    times: Iterable[datetime] | None = None,
+    sites: Iterable[SiteParameters] | None = None,
+    *,
+    engine: Optional[str] = None,
+) -> SunPositionBatch:
+    """Return sun positions for every combination of ``times`` and ``sites``.
+
+    Results match ``get_sun_position`` with the same ``engine``. The
+    ``"numpy"`` engine evaluates all pairs in one vectorised call; the others
+    make one call per site. ``times`` defaults to now and ``sites`` to
+    ``DEFAULT_SITE``; naive datetimes are interpreted in each site's timezone.
+    """
+
+    site_list = tuple(sites) if sites is not None else (DEFAULT_SITE,)
+    time_list = list(times) if times is not None else [datetime.now(tz=pytz.UTC)]
+
+    naive = any(value.tzinfo is None for value in time_list)
+    shared = None if naive else _utc_index(time_list, pytz.UTC)
+    per_site = [shared if shared is not None else _utc_index(time_list, _timezone_for(site)) for site in site_list]
+    timestamps = pd.DatetimeIndex(_np.concatenate([index.asi8 for index in per_site]) if per_site else [], tz="UTC")
+
+    n_times = len(time_list)
+    site_index = _np.repeat(_np.arange(len(site_list)), n_times)
+    latitude = _np.array([site.latitude for site in site_list], dtype=float)[site_index]
+    longitude = _np.array([site.longitude for site in site_list], dtype=float)[site_index]
+    altitude = _np.array([site.altitude for site in site_list], dtype=float)[site_index]
+
+    engine = engine or config.SPA_ENGINE
+    if len(timestamps) and engine == "numpy":
+        with stage("spa"):
+            apparent_elevation, azimuth, apparent_zenith = solar_position_arrays(
+                timestamps.asi8 / 1e9, latitude, longitude, altitude, engine=engine
+            )
+    elif len(timestamps):
+        with stage("spa"):
+            per_site_positions = [
+                solar_position_arrays(index.asi8 / 1e9, site.latitude, site.longitude, site.altitude, engine=engine)
+                for site, index in zip(site_list, per_site)
+            ]
+        apparent_elevation, azimuth, apparent_zenith = (
+            _np.concatenate(columns) for columns in zip(*per_site_positions)
+        )
+    else:
+        apparent_zenith = apparent_elevation = azimuth = _np.empty(0)
+
+    return SunPositionBatch(
+        sites=site_list,
+        timestamps=timestamps,
+        site_index=site_index,
+        elevation=_np.round(apparent_elevation, 2),
+        azimuth=_np.round(azimuth, 2),
+        zenith=_np.round(apparent_zenith, 2),
     )
-    return _build_position(times[0], solpos.iloc[0])
+
+
+def _parse_date(value: date | str) -> date:
+    if isinstance(value, str):
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    return value
+
+
+def _clock_labels(index: pd.DatetimeIndex, tz: pytz.BaseTzInfo) -> list:
+    """Format timestamps as local ``HH:MM`` strings (``None`` for ``NaT``)."""
+
+    local = index.tz_convert(tz)
+    missing = _np.asarray(local.isna())
+    minutes = _np.where(missing, 0, _np.nan_to_num(local.hour * 60 + local.minute)).astype(int)
+    labels = _CLOCK_LABELS[minutes]
+    labels[missing] = None
+    return labels.tolist()
+
+
+def _day_sample_times(
+    days: Sequence[date], interval_minutes: int, site: SiteParameters
+) -> Tuple[pd.DatetimeIndex, pd.DatetimeIndex]:
+    """Return the UTC local-midnight of each day and its samples every ``interval_minutes`` for 24 hours."""
+
+    tz = _timezone_for(site)
+    day_starts = pd.DatetimeIndex([tz.localize(datetime.combine(day, time(0, 0))) for day in days]).tz_convert("UTC")
+    samples_per_day = -(-24 * 60 // interval_minutes)
+    offsets = _np.arange(samples_per_day, dtype=_np.int64) * interval_minutes * 60 * 10**9
+    return day_starts, pd.DatetimeIndex((day_starts.asi8[:, None] + offsets).ravel(), tz="UTC")
+
+
+def _sun_path_batch(
+    days: Sequence[date],
+    *,
+    interval_minutes: int,
+    site: SiteParameters,
+    engine: Optional[str] = None,
+) -> SunPathBatch:
+    """Compute the sun paths of several days in one SPA pass.
+
+    Each day is sampled from local midnight for 24 hours like a single-day
+    request; the samples of all days are stacked into one ``DatetimeIndex``
+    and sunrise/sunset/transit are resolved for all days in one call.
+    Events that do not occur (polar day/night) come back all-NaT and
+    tz-naive, hence the ``utc=True`` normalisation.
+    """
+
+    tz = _timezone_for(site)
+    day_starts, times = _day_sample_times(days, interval_minutes, site)
+
+    with stage("spa"):
+        apparent_elevation, azimuth, _ = solar_position_arrays(
+            times.asi8 / 1e9, site.latitude, site.longitude, site.altitude, engine=engine
+        )
+
+    with stage("rise_set"):
+        rise_set_df = solarposition.sun_rise_set_transit_spa(
+            times=day_starts.tz_convert(tz),
+            latitude=site.latitude,
+            longitude=site.longitude,
+            how="numpy",
+        )
+    return SunPathBatch(
+        site=site,
+        days=tuple(days),
+        timestamps=times,
+        elevation=_np.round(apparent_elevation, 2),
+        azimuth=_np.round(azimuth, 2),
+        sunrise=_clock_labels(pd.DatetimeIndex(pd.to_datetime(rise_set_df["sunrise"], utc=True)), tz),
+        sunset=_clock_labels(pd.DatetimeIndex(pd.to_datetime(rise_set_df["sunset"], utc=True)), tz),
+        solar_noon=_clock_labels(pd.DatetimeIndex(pd.to_datetime(rise_set_df["transit"], utc=True)), tz),
+    )
+
+
+def _sun_path_payloads(batch: SunPathBatch, *, columnar: bool) -> list:
+    """Format ``batch`` as one ``get_sun_path`` payload per day."""
+
+    site = batch.site
+    with stage("path_assembly"):
+        labels = _clock_labels(batch.timestamps, _timezone_for(site))
+        elevation = batch.elevation.tolist()
+        azimuth = batch.azimuth.tolist()
+
+    location = {
+        "latitude": site.latitude,
+        "longitude": site.longitude,
+        "altitude": site.altitude,
+        "name": site.name,
+        "timezone": site.timezone,
+    }
+    samples_per_day = batch.samples_per_day
+    payloads = []
+    for idx, day in enumerate(batch.days):
+        rows = slice(idx * samples_per_day, (idx + 1) * samples_per_day)
+        if columnar:
+            path: list | dict = {"time": labels[rows], "elevation": elevation[rows], "azimuth": azimuth[rows]}
+        else:
+            path = [
+                {"time": label, "elevation": elev, "azimuth": azim}
+                for label, elev, azim in zip(labels[rows], elevation[rows], azimuth[rows])
+            ]
+        payloads.append(
+            {
+                "date": day.strftime("%Y-%m-%d"),
+                "timezone": site.timezone,
+                "location": dict(location),
+                "sunrise": batch.sunrise[idx],
+                "sunset": batch.sunset[idx],
+                "solar_noon": batch.solar_noon[idx],
+                "path": path,
+            }
+        )
+    return payloads
 
 
 def get_sun_path(
@@ -103,8 +432,16 @@ def get_sun_path(
     *,
     interval_minutes: int = config.UPDATE_INTERVAL,
     site: SiteParameters | None = None,
+    columnar: bool = False,
+    engine: Optional[str] = None,
 ) -> dict:
-    """Return the sun path data for a given date."""
+    """Return the sun path data for a given date.
+
+    ``path`` is a list of ``{time, elevation, azimuth}`` samples, or with
+    ``columnar=True`` a single ``{"time": [...], "elevation": [...],
+    "azimuth": [...]}`` mapping of equal-length lists. ``engine`` selects
+    the SPA implementation (see ``SPA_ENGINES``).
+    """
 
     if interval_minutes <= 0:
         raise ValueError("interval_minutes must be positive")
@@ -114,67 +451,75 @@ def get_sun_path(
 
     if target_date is None:
         target_date = datetime.now(tz=tz).date()
-    elif isinstance(target_date, str):
-        target_date = datetime.strptime(target_date, "%Y-%m-%d").date()
-
-    start = tz.localize(datetime.combine(target_date, time(0, 0)))
-    end = start + timedelta(days=1)
-    times = pd.date_range(start=start, end=end, freq=f"{interval_minutes}min", inclusive="left")
-
-    solpos = solarposition.spa_python(
-        times,
-        latitude=site_params.latitude,
-        longitude=site_params.longitude,
-        altitude=site_params.altitude,
-    )
+    target_date = _parse_date(target_date)
 
-    path = []
-    for ts, row in solpos.iterrows():
-        path.append(
-            {
-                "time": ts.tz_convert(tz).strftime("%H:%M"),
-                "elevation": _round(row["apparent_elevation"]),
-                "azimuth": _round(row["azimuth"]),
-            }
-        )
+    batch = _sun_path_batch([target_date], interval_minutes=interval_minutes, site=site_params, engine=engine)
+    return _sun_path_payloads(batch, columnar=columnar)[0]
 
-    rise_set_df = solarposition.sun_rise_set_transit_spa(
-        times=pd.DatetimeIndex([start]),
-        latitude=site_params.latitude,
-        longitude=site_params.longitude,
-        how="numpy",
-    )
 
-    def _format_event(event: pd.Timestamp) -> Optional[str]:
-        if pd.isna(event):
-            return None
-        return event.tz_convert(tz).strftime("%H:%M")
-
-    sunrise = _format_event(rise_set_df.iloc[0]["sunrise"])
-    sunset = _format_event(rise_set_df.iloc[0]["sunset"])
-    solar_noon = _format_event(rise_set_df.iloc[0]["transit"])
-
-    return {
-        "date": target_date.strftime("%Y-%m-%d"),
-        "timezone": site_params.timezone,
-        "location": {
-            "latitude": site_params.latitude,
-            "longitude": site_params.longitude,
-            "altitude": site_params.altitude,
-            "name": site_params.name,
-            "timezone": site_params.timezone,
-        },
-        "sunrise": sunrise,
-        "sunset": sunset,
-        "solar_noon": solar_noon,
-        "path": path,
-    }
+def iter_sun_path_batches(
+    start_date: date | str,
+    end_date: date | str,
+    *,
+    interval_minutes: int = config.UPDATE_INTERVAL,
+    site: SiteParameters | None = None,
+    chunk_days: int = config.SUN_PATH_CHUNK_DAYS,
+    engine: Optional[str] = None,
+) -> Iterator[SunPathBatch]:
+    """Yield the sun paths from ``start_date`` to ``end_date`` inclusive, ``chunk_days`` days per batch.
+
+    Memory stays bounded for multi-year ranges while each batch is still a
+    single vectorised SPA run.
+    """
+
+    if interval_minutes <= 0:
+        raise ValueError("interval_minutes must be positive")
+    if chunk_days <= 0:
+        raise ValueError("chunk_days must be positive")
+
+    first, last = _parse_date(start_date), _parse_date(end_date)
+    if last < first:
+        raise ValueError("end_date must not be before start_date")
+
+    site_params = site or DEFAULT_SITE
+    n_days = (last - first).days + 1
+    for offset in range(0, n_days, chunk_days):
+        days = [first + timedelta(days=offset + i) for i in range(min(chunk_days, n_days - offset))]
+        yield _sun_path_batch(days, interval_minutes=interval_minutes, site=site_params, engine=engine)
+
+
+def iter_sun_paths(
+    start_date: date | str,
+    end_date: date | str,
+    *,
+    interval_minutes: int = config.UPDATE_INTERVAL,
+    site: SiteParameters | None = None,
+    columnar: bool = False,
+    chunk_days: int = config.SUN_PATH_CHUNK_DAYS,
+    engine: Optional[str] = None,
+) -> Iterator[dict]:
+    """Yield one ``get_sun_path`` payload per day from ``start_date`` to ``end_date`` inclusive.
+
+    Days are computed ``chunk_days`` at a time (see ``iter_sun_path_batches``).
+    """
+
+    for batch in iter_sun_path_batches(
+        start_date, end_date, interval_minutes=interval_minutes, site=site, chunk_days=chunk_days, engine=engine
+    ):
+        yield from _sun_path_payloads(batch, columnar=columnar)
 
 
 __all__ = [
     "get_sun_position",
+    "get_sun_positions",
     "get_sun_path",
+    "iter_sun_paths",
+    "iter_sun_path_batches",
+    "solar_position_arrays",
+    "SPA_ENGINES",
     "SunPosition",
+    "SunPositionBatch",
+    "SunPathBatch",
     "SiteParameters",
     "DEFAULT_SITE",
 ]
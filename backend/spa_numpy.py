@@ -0,0 +1,114 @@
+"""Vectorised NumPy evaluation of the NREL SPA used by ``pvlib.spa``.
+
+``pvlib.spa.solar_position_numpy`` evaluates the periodic series of the
+algorithm (Earth heliocentric position and nutation, ~260 terms) with a
+Python loop over the table rows, so every call costs a few milliseconds
+even for a single timestamp. Here each series is one broadcast
+``(timestamps x terms)`` product; every other step reuses pvlib's own
+element-wise functions, so the algorithm and constants are pvlib's. Only
+the summation order differs, which changes results by ~1e-10 degrees.
+"""
+
+from __future__ import annotations
+
+from typing import Tuple
+
+import numpy as np
+from pvlib import spa
+
+# Timestamps per broadcast block; bounds the (block x 64) temporaries.
+_BLOCK = 4096
+
+
+def _periodic_sum(table: np.ndarray, x: np.ndarray) -> np.ndarray:
+    """Vectorised ``spa.sum_mult_cos_add_mult`` for an array of ``x``."""
+
+    arg = np.multiply.outer(x, table[:, 2])
+    arg += table[:, 1]
+    return np.cos(arg, out=arg) @ table[:, 0]
+
+
+def _polynomial(tables: Tuple[np.ndarray, ...], jme: np.ndarray) -> np.ndarray:
+    total = np.zeros_like(jme)
+    for power, table in enumerate(tables):
+        total += _periodic_sum(table, jme) * jme**power
+    return total / 10**8
+
+
+def _nutation(jce: np.ndarray, x: Tuple[np.ndarray, ...]) -> Tuple[np.ndarray, np.ndarray]:
+    arg = np.radians(np.stack(x, axis=1) @ spa.NUTATION_YTERM_ARRAY.T)
+    abcd = spa.NUTATION_ABCD_ARRAY
+    # (a + b*jce) . sin(arg) == sin(arg) @ a + jce * (sin(arg) @ b)
+    sin_arg, cos_arg = np.sin(arg), np.cos(arg, out=arg)
+    delta_psi = sin_arg @ abcd[:, 0] + jce * (sin_arg @ abcd[:, 1])
+    delta_eps = cos_arg @ abcd[:, 2] + jce * (cos_arg @ abcd[:, 3])
+    return delta_psi / 36000000, delta_eps / 36000000
+
+
+def _block(unixtime, lat, lon, elev, pressure, temp, delta_t, atmos_refract):
+    jd = spa.julian_day(unixtime)
+    jde = spa.julian_ephemeris_day(jd, delta_t)
+    jc = spa.julian_century(jd)
+    jce = spa.julian_ephemeris_century(jde)
+    jme = spa.julian_ephemeris_millennium(jce)
+    R = _polynomial((spa.R0, spa.R1, spa.R2, spa.R3, spa.R4), jme)
+    L = np.rad2deg(_polynomial((spa.L0, spa.L1, spa.L2, spa.L3, spa.L4, spa.L5), jme)) % 360
+    B = np.rad2deg(_polynomial((spa.B0, spa.B1), jme))
+    Theta = spa.geocentric_longitude(L)
+    beta = spa.geocentric_latitude(B)
+    x = (
+        spa.mean_elongation(jce),
+        spa.mean_anomaly_sun(jce),
+        spa.mean_anomaly_moon(jce),
+        spa.moon_argument_latitude(jce),
+        spa.moon_ascending_longitude(jce),
+    )
+    delta_psi, delta_epsilon = _nutation(jce, x)
+    epsilon = spa.true_ecliptic_obliquity(spa.mean_ecliptic_obliquity(jme), delta_epsilon)
+    lamd = spa.apparent_sun_longitude(Theta, delta_psi, spa.aberration_correction(R))
+    v = spa.apparent_sidereal_time(spa.mean_sidereal_time(jd, jc), delta_psi, epsilon)
+    alpha = spa.geocentric_sun_right_ascension(lamd, epsilon, beta)
+    delta = spa.geocentric_sun_declination(lamd, epsilon, beta)
+    H = spa.local_hour_angle(v, lon, alpha)
+    xi = spa.equatorial_horizontal_parallax(R)
+    u = spa.uterm(lat)
+    x_term = spa.xterm(u, lat, elev)
+    y_term = spa.yterm(u, lat, elev)
+    delta_alpha = spa.parallax_sun_right_ascension(x_term, xi, H, delta)
+    delta_prime = spa.topocentric_sun_declination(delta, x_term, y_term, xi, delta_alpha, H)
+    H_prime = spa.topocentric_local_hour_angle(H, delta_alpha)
+    e0 = spa.topocentric_elevation_angle_without_atmosphere(lat, delta_prime, H_prime)
+    delta_e = spa.atmospheric_refraction_correction(pressure, temp, e0, atmos_refract)
+    e = spa.topocentric_elevation_angle(e0, delta_e)
+    phi = spa.topocentric_azimuth_angle(spa.topocentric_astronomers_azimuth(H_prime, delta_prime, lat))
+    return e, phi, spa.topocentric_zenith_angle(e)
+
+
+def solar_position(
+    unixtime: np.ndarray,
+    lat: float | np.ndarray,
+    lon: float | np.ndarray,
+    elev: float | np.ndarray,
+    pressure: float,
+    temp: float,
+    delta_t: float,
+    atmos_refract: float,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return ``(apparent_elevation, azimuth, apparent_zenith)`` for Unix times.
+
+    Arguments match ``pvlib.spa.solar_position``; ``lat``/``lon``/``elev``
+    may be scalars or arrays aligned with ``unixtime``.
+    """
+
+    unixtime = np.asarray(unixtime, dtype=float)
+    n = unixtime.size
+    site = [np.broadcast_to(np.asarray(value, dtype=float), (n,)) for value in (lat, lon, elev)]
+    out = np.empty((3, n))
+    for start in range(0, n, _BLOCK):
+        rows = slice(start, start + _BLOCK)
+        lat_b, lon_b, elev_b = (value[rows] for value in site)
+        out[:, rows] = _block(unixtime[rows], lat_b, lon_b, elev_b, pressure, temp, delta_t, atmos_refract)
+    return out[0], out[1], out[2]
+
+
+__all__ = ["solar_position"]
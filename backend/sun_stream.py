@@ -0,0 +1,147 @@
+"""Shared scheduler behind the live sun-position stream.
+
+Every open stream subscribes to one or more sites. One background thread
+wakes when subscriptions are due, evaluates all due sites in a single batch
+and hands the same serialised payload to every subscriber of a site, so any
+number of dashboards watching a site cost one SPA evaluation per tick.
+Subscriptions with the same period fire on a shared clock grid, which keeps
+them in the same batch. Slow consumers lose their oldest pending events
+instead of building up an unbounded backlog.
+"""
+
+from __future__ import annotations
+
+import math
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Sequence
+
+# Serialises the positions of ``sites`` at ``when``: one message per site, in order.
+BatchFunction = Callable[[Sequence[Hashable], datetime], List[str]]
+
+
+class Subscription:
+    """Pending events of one stream; returned by ``SunPositionBroadcaster.subscribe``."""
+
+    def __init__(self, sites: Sequence[Hashable], period: float, max_pending: int) -> None:
+        self.sites = tuple(sites)
+        self.period = period
+        self._queue: "queue.Queue[str]" = queue.Queue(maxsize=max_pending)
+
+    def get(self, timeout: float) -> Optional[str]:
+        """Return the next message, or ``None`` if nothing arrived within ``timeout`` seconds."""
+
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def _put(self, message: str) -> int:
+        """Queue ``message``, discarding the oldest ones if full; return how many were discarded."""
+
+        dropped = 0
+        while True:
+            try:
+                self._queue.put_nowait(message)
+                return dropped
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                    dropped += 1
+                except queue.Empty:
+                    pass
+
+
+class SunPositionBroadcaster:
+    """Fan out periodically computed positions to many subscribers.
+
+    ``tick`` is the shortest period in seconds; requested intervals are
+    rounded up to a multiple of it. New subscriptions receive their first
+    event right away. The scheduler thread starts with the first
+    subscription and exits once the last one is gone.
+    """
+
+    def __init__(self, compute: BatchFunction, *, tick: float, max_pending: int = 8) -> None:
+        self._compute = compute
+        self.tick = tick
+        self.max_pending = max_pending
+        self._due: Dict[Subscription, float] = {}
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._counters = {"batches": 0, "events": 0, "dropped": 0, "errors": 0}
+
+    def subscribe(self, sites: Iterable[Hashable], interval: Optional[float] = None) -> Subscription:
+        every = max(1, math.ceil(interval / self.tick - 1e-9)) if interval else 1
+        subscription = Subscription(list(sites), every * self.tick, self.max_pending)
+        with self._cond:
+            self._due[subscription] = time.monotonic()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="sun-stream", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._cond:
+            self._due.pop(subscription, None)
+            self._cond.notify()
+
+    def clear(self) -> None:
+        """Drop every subscription (their streams then only receive keep-alives)."""
+
+        with self._cond:
+            self._due.clear()
+            self._cond.notify()
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            return {
+                "subscribers": len(self._due),
+                "sites": len({site for subscription in self._due for site in subscription.sites}),
+                **self._counters,
+            }
+
+    def _next_batch(self) -> Optional[List[Subscription]]:
+        """Wait until subscriptions are due and reschedule them; ``None`` once none are left."""
+
+        with self._cond:
+            while True:
+                if not self._due:
+                    self._thread = None
+                    return None
+                now = time.monotonic()
+                wake = min(self._due.values())
+                if wake <= now:
+                    break
+                self._cond.wait(wake - now)
+            due = [subscription for subscription, at in self._due.items() if at <= now]
+            for subscription in due:
+                # Next multiple of the period on the monotonic clock, shared by equal periods.
+                self._due[subscription] = (math.floor(now / subscription.period) + 1) * subscription.period
+            return due
+
+    def _loop(self) -> None:
+        while True:
+            due = self._next_batch()
+            if due is None:
+                return
+            sites = list(dict.fromkeys(site for subscription in due for site in subscription.sites))
+            try:
+                messages = dict(zip(sites, self._compute(sites, datetime.now(timezone.utc))))
+            except Exception:  # keep serving other ticks; a bad batch must not stop the scheduler
+                with self._cond:
+                    self._counters["errors"] += 1
+                continue
+            with self._cond:
+                self._counters["batches"] += 1
+                for subscription in due:
+                    if subscription not in self._due:
+                        continue
+                    for site in subscription.sites:
+                        self._counters["dropped"] += subscription._put(messages[site])
+                        self._counters["events"] += 1
+
+
+__all__ = ["BatchFunction", "Subscription", "SunPositionBroadcaster"]
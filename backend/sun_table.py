@@ -0,0 +1,281 @@
+"""Precomputed per-site sun-position tables for high-frequency lookups.
+
+Tracking control loops query the sun position many times per second, where a
+full SPA evaluation per call is unnecessary. ``SunPositionTable`` samples the
+geometric (refraction-free) sun direction of a site every few minutes with
+``spa_python``, stores it as unit vectors, and answers queries by linear
+interpolation of those vectors. Atmospheric refraction is then re-applied
+with the same formula SPA uses, because it is the only part of the apparent
+position that is not smooth near the horizon.
+
+With the default 5-minute step the interpolated apparent sun direction and
+elevation stay within ``MAX_INTERPOLATION_ERROR_DEG`` of ``spa_python``
+(about 0.0013° in practice, measured as the angle between the directions).
+The one exception is the instant the geometric elevation crosses SPA's
+refraction cutoff at -0.83° (sun already below the horizon): SPA itself
+jumps by ~0.6° there, so the two can disagree on which side of the jump a
+time falls. Azimuth alone is ill-conditioned when the sun is near the zenith
+and may differ by more there, although the direction does not.
+``tests/test_sun_table.py`` verifies the bound.
+
+``solar_calculator`` uses these tables as its ``"table"`` SPA engine
+(``engine="table"`` or ``SOLAR_SPA_ENGINE=table``): positions, paths and
+heliostat fields are then interpolated from one table per site and UTC year,
+built once and kept in the mapped on-disk cache.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Iterable, Tuple
+
+import numpy as np
+import pandas as pd
+import pvlib
+from pvlib import solarposition
+
+from . import config
+from .cache import MappedArrayCache, content_key
+from .solar_calculator import (
+    _SPA_ATMOS_REFRACT,
+    _SPA_PRESSURE_MBAR,
+    _SPA_TEMPERATURE_C,
+    DEFAULT_SITE,
+    SiteParameters,
+    SunPosition,
+    _ensure_timezone,
+    _round,
+    _timezone_for,
+)
+
+# Documented worst-case deviation from spa_python at the default step.
+MAX_INTERPOLATION_ERROR_DEG = 0.01
+
+# Bump when the layout of persisted tables changes.
+_TABLE_CACHE_VERSION = 1
+
+_TABLE_CACHE = MappedArrayCache(config.SUN_TABLE_CACHE_DIR, max_bytes=config.SUN_TABLE_CACHE_MAX_BYTES)
+
+_REFRACTION_SCALE = (_SPA_PRESSURE_MBAR / 1010.0) * (283.0 / (273 + _SPA_TEMPERATURE_C)) * 1.02 / 60
+_REFRACTION_CUTOFF = -1.0 * (0.26667 + _SPA_ATMOS_REFRACT)
+
+
+def _refraction(elevation: np.ndarray) -> np.ndarray:
+    """SPA's atmospheric refraction correction (degrees) for geometric elevations."""
+
+    elevation = np.asarray(elevation, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        delta = _REFRACTION_SCALE / np.tan(np.radians(elevation + 10.3 / (elevation + 5.11)))
+    return np.where(elevation >= _REFRACTION_CUTOFF, delta, 0.0)
+
+
+def _refraction_scalar(elevation: float) -> float:
+    if elevation < _REFRACTION_CUTOFF:
+        return 0.0
+    return _REFRACTION_SCALE / math.tan(math.radians(elevation + 10.3 / (elevation + 5.11)))
+
+
+@dataclass(frozen=True)
+class SunPositionTable:
+    """Sun direction of one site sampled every ``step_seconds`` from ``start_epoch``."""
+
+    site: SiteParameters
+    start_epoch: float  # seconds since the Unix epoch (UTC)
+    step_seconds: float
+    # (N, 3) east, north, up components of the unit sun vector; float32 views
+    # of the mapped file for tables loaded from the cache.
+    vectors: np.ndarray
+
+    @classmethod
+    def build(
+        cls,
+        site: SiteParameters | None = None,
+        start: date | str | None = None,
+        *,
+        days: int = 366,
+        step_minutes: int = config.SUN_TABLE_STEP_MINUTES,
+    ) -> "SunPositionTable":
+        """Sample ``days`` days from local midnight of ``start`` (default: today)."""
+
+        if days <= 0 or step_minutes <= 0:
+            raise ValueError("days and step_minutes must be positive")
+        site_params = site or DEFAULT_SITE
+        tz = _timezone_for(site_params)
+        if start is None:
+            start = datetime.now(tz=tz).date()
+        elif isinstance(start, str):
+            start = datetime.strptime(start, "%Y-%m-%d").date()
+        first = tz.localize(datetime.combine(start, datetime.min.time()))
+        # One extra sample so the final instant of the span can be interpolated.
+        times = pd.date_range(first, first + timedelta(days=days), freq=f"{step_minutes}min")
+        solpos = solarposition.spa_python(
+            times,
+            latitude=site_params.latitude,
+            longitude=site_params.longitude,
+            altitude=site_params.altitude,
+        )
+        elevation = np.radians(solpos["elevation"].to_numpy(dtype=float))
+        azimuth = np.radians(solpos["azimuth"].to_numpy(dtype=float))
+        vectors = np.stack(
+            [
+                np.cos(elevation) * np.sin(azimuth),
+                np.cos(elevation) * np.cos(azimuth),
+                np.sin(elevation),
+            ],
+            axis=1,
+        )
+        return cls(
+            site=site_params,
+            start_epoch=times[0].timestamp(),
+            step_seconds=step_minutes * 60.0,
+            vectors=vectors,
+        )
+
+    @property
+    def end_epoch(self) -> float:
+        return self.start_epoch + (len(self.vectors) - 1) * self.step_seconds
+
+    def _locate(self, epoch: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        offset = (epoch - self.start_epoch) / self.step_seconds
+        if np.any(offset < 0) or np.any(offset > len(self.vectors) - 1):
+            raise ValueError("Requested time lies outside the precomputed table")
+        index = np.minimum(offset.astype(np.int64), len(self.vectors) - 2)
+        return index, offset - index
+
+    def positions(self, times: Iterable[datetime] | pd.DatetimeIndex) -> Tuple[np.ndarray, np.ndarray]:
+        """Return unrounded ``(apparent_elevation, azimuth)`` arrays for many timestamps."""
+
+        if isinstance(times, pd.DatetimeIndex):
+            index = times if times.tz is not None else times.tz_localize(_timezone_for(self.site))
+        else:
+            tz = _timezone_for(self.site)
+            index = pd.DatetimeIndex([_ensure_timezone(value, tz) for value in times])
+        return self.positions_at(index.asi8 / 1e9)
+
+    def positions_at(self, epoch: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Return unrounded ``(apparent_elevation, azimuth)`` arrays for Unix timestamps."""
+
+        row, frac = self._locate(np.asarray(epoch, dtype=float))
+        start = self.vectors[row].astype(float)
+        vector = start + (self.vectors[row + 1] - start) * frac[:, None]
+        norm = np.linalg.norm(vector, axis=1)
+        elevation = np.degrees(np.arcsin(np.clip(vector[:, 2] / norm, -1, 1)))
+        azimuth = np.degrees(np.arctan2(vector[:, 0], vector[:, 1])) % 360
+        return elevation + _refraction(elevation), azimuth
+
+    def at_epoch(self, epoch: float) -> Tuple[float, float]:
+        """Return unrounded ``(apparent_elevation, azimuth)`` for a Unix timestamp.
+
+        This is the allocation-free path meant for control loops; it avoids
+        timezone handling entirely and runs in a few microseconds.
+        """
+
+        offset = (epoch - self.start_epoch) / self.step_seconds
+        last = len(self.vectors) - 1
+        if offset < 0 or offset > last:
+            raise ValueError("Requested time lies outside the precomputed table")
+        row = min(int(offset), last - 1)
+        frac = offset - row
+        (x0, y0, z0), (x1, y1, z1) = self.vectors[row : row + 2].tolist()
+        x, y, z = x0 + (x1 - x0) * frac, y0 + (y1 - y0) * frac, z0 + (z1 - z0) * frac
+        elevation = math.degrees(math.asin(max(-1.0, min(1.0, z / math.sqrt(x * x + y * y + z * z)))))
+        return elevation + _refraction_scalar(elevation), math.degrees(math.atan2(x, y)) % 360
+
+    def position(self, when: datetime) -> SunPosition:
+        """Interpolated counterpart of ``get_sun_position`` for a single instant."""
+
+        target = _ensure_timezone(when, _timezone_for(self.site))
+        elevation, azimuth = self.at_epoch(target.timestamp())
+        return SunPosition(
+            timestamp=target,
+            elevation=_round(elevation),
+            azimuth=_round(azimuth),
+            zenith=_round(90 - elevation),
+        )
+
+    def to_arrays(self) -> dict:
+        return {
+            "start_epoch": np.array([self.start_epoch]),
+            "step_seconds": np.array([self.step_seconds]),
+            # float32 keeps ~1e-7 rad precision at half the size on disk.
+            "vectors": self.vectors.astype(np.float32),
+        }
+
+    @classmethod
+    def from_arrays(cls, site: SiteParameters, arrays: dict) -> "SunPositionTable":
+        """Wrap ``to_arrays`` output without copying, so mapped vectors stay shared."""
+
+        return cls(
+            site=site,
+            start_epoch=float(arrays["start_epoch"][0]),
+            step_seconds=float(arrays["step_seconds"][0]),
+            vectors=arrays["vectors"],
+        )
+
+    def save(self, path: str) -> None:
+        np.savez(path, **self.to_arrays())
+
+    @classmethod
+    def load(cls, path: str, site: SiteParameters) -> "SunPositionTable":
+        with np.load(path, allow_pickle=False) as archive:
+            return cls.from_arrays(site, {name: archive[name] for name in archive.files})
+
+
+@lru_cache(maxsize=32)
+def get_sun_position_table(
+    site: SiteParameters | None = None,
+    year: int | None = None,
+    *,
+    step_minutes: int = config.SUN_TABLE_STEP_MINUTES,
+) -> SunPositionTable:
+    """Return the table covering ``year`` for ``site``, built at most once per process.
+
+    Tables are also persisted in the on-disk cache, so other processes and
+    later runs load them instead of re-running SPA.
+    """
+
+    site_params = site or DEFAULT_SITE
+    tz = _timezone_for(site_params)
+    year = year or datetime.now(tz=tz).year
+    start = date(year, 1, 1)
+    days = (date(year + 1, 1, 1) - start).days
+    key = content_key(
+        version=_TABLE_CACHE_VERSION,
+        pvlib=pvlib.__version__,
+        latitude=site_params.latitude,
+        longitude=site_params.longitude,
+        altitude=site_params.altitude,
+        timezone=site_params.timezone,
+        year=year,
+        step_minutes=step_minutes,
+    )
+    arrays = _TABLE_CACHE.get_or_compute(
+        key,
+        lambda: SunPositionTable.build(site_params, start, days=days, step_minutes=step_minutes).to_arrays(),
+    )
+    return SunPositionTable.from_arrays(site_params, arrays)
+
+
+def table_positions(
+    epoch: np.ndarray, latitude: float, longitude: float, altitude: float
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Table-backed ``solar_calculator.solar_position_arrays``: ``(apparent_elevation, azimuth, apparent_zenith)``.
+
+    Uses one table per UTC year touched by ``epoch`` (Unix seconds).
+    """
+
+    epoch = np.asarray(epoch, dtype=float)
+    site = SiteParameters(float(latitude), float(longitude), float(altitude), "UTC", name="table")
+    days = np.floor(epoch / 86400).astype(np.int64).astype("datetime64[D]")
+    years = days.astype("datetime64[Y]").astype(np.int64) + 1970
+    elevation, azimuth = np.empty(epoch.shape), np.empty(epoch.shape)
+    for year in np.unique(years):
+        rows = years == year
+        elevation[rows], azimuth[rows] = get_sun_position_table(site, int(year)).positions_at(epoch[rows])
+    return elevation, azimuth, 90.0 - elevation
+
+
+__all__ = ["MAX_INTERPOLATION_ERROR_DEG", "SunPositionTable", "get_sun_position_table", "table_positions"]
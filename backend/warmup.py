@@ -0,0 +1,84 @@
+"""Pre-load heavy dependencies and per-site data before serving traffic.
+
+A fresh worker otherwise pays for importing pandas/pvlib/SciPy, opening
+pvlib's Linke turbidity file and computing the site's annual meteorology on
+its first optimisation request. ``warm_up`` does that work up front; the app
+runs it at start-up when ``SOLAR_WARM_UP=1``. Running this module primes the
+on-disk caches, e.g. while building a deployment image::
+
+    python -m backend.warmup
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+from contextlib import contextmanager
+from datetime import datetime
+from time import perf_counter
+from typing import TYPE_CHECKING, Dict, Iterator, Optional, Sequence
+
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    from .solar_calculator import SiteParameters
+
+
+@contextmanager
+def _timed(timings: Dict[str, float], name: str) -> Iterator[None]:
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = timings.get(name, 0.0) + perf_counter() - start
+
+
+def warm_up(
+    sites: Optional[Sequence[SiteParameters]] = None,
+    *,
+    year: Optional[int] = None,
+    sun_tables: bool = True,
+) -> Dict[str, float]:
+    """Import the calculation modules and prime caches for ``sites``.
+
+    Defaults to the configured site and the current year. Returns the
+    seconds spent per step.
+    """
+
+    timings: Dict[str, float] = {}
+    with _timed(timings, "import"):
+        solar_calculator = importlib.import_module(".solar_calculator", __package__)
+        orientation_optimizer = importlib.import_module(".orientation_optimizer", __package__)
+        from pvlib import clearsky
+
+    site_list = list(sites) if sites is not None else [solar_calculator.DEFAULT_SITE]
+    year = year or datetime.now().year
+    for site in site_list:
+        with _timed(timings, "spa"):
+            solar_calculator.get_sun_position(site=site)
+        with _timed(timings, "turbidity"):
+            # Loads h5py and pages in the turbidity file read by every clear-sky call.
+            times = orientation_optimizer._build_time_index(year, site)[:1]
+            clearsky.lookup_linke_turbidity(times, site.latitude, site.longitude)
+        with _timed(timings, "meteorology"):
+            orientation_optimizer._site_meteorology(site, year)
+        if sun_tables:
+            with _timed(timings, "sun_table"):
+                # Builds or maps the table behind the "table" SPA engine.
+                solar_calculator.get_sun_position(datetime(year, 7, 1), site=site, engine="table")
+    timings["total"] = sum(timings.values())
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Pre-load dependencies and prime the on-disk caches")
+    parser.add_argument("--year", type=int, default=None, help="Year to prime (default: current year)")
+    parser.add_argument("--no-sun-tables", action="store_true", help="Skip building sun-position tables")
+    args = parser.parse_args()
+    for name, seconds in warm_up(year=args.year, sun_tables=not args.no_sun_tables).items():
+        print(f"{name:>12}: {seconds * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
+
+
+__all__ = ["warm_up"]
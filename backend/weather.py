@@ -0,0 +1,237 @@
+"""Measured irradiance from local TMY/EPW/CSV weather files.
+
+Clear-sky irradiance overstates the yield of cloudy sites; optimising
+against a typical meteorological year of measured GHI/DNI/DHI does not.
+Three formats are recognised by their first lines:
+
+* EPW (EnergyPlus), read with ``pvlib.iotools.read_epw``;
+* TMY3 CSV, read with ``pvlib.iotools.read_tmy3``;
+* any other CSV with a ``time`` (or ``timestamp``/``datetime``) column and
+  ``ghi``/``dni``/``dhi`` columns in W/m^2. Timestamps mark the instant the
+  values apply to, e.g. the middle of an averaging interval; naive ones are
+  read as UTC.
+
+EPW and TMY3 rows are hourly averages labelled by the end of the hour, so
+each row is placed at the middle of its hour. Rows are stored by calendar
+position (month, day, second of day) in the file's standard time, which is
+how typical years are meant to be used: ``irradiance(year, ...)`` lays them
+onto any year, dropping 29 February for common years (a leap year simply
+lacks it when the file has none). Missing-value markers become NaN and the
+sweep ignores those hours.
+
+Text is parsed once per file: the columns (~18 bytes per row) are written
+to a ``MappedArrayCache`` keyed by the file's path, size and modification
+time, so later loads map the cached arrays without reading the text.
+"""
+
+from __future__ import annotations
+
+import calendar
+import math
+import os
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+from pvlib import iotools
+
+from . import config
+from .cache import MappedArrayCache, content_key
+from .instrumentation import stage
+from .solar_calculator import SiteParameters
+
+# Bump when the layout of cached weather columns changes.
+_WEATHER_CACHE_VERSION = 1
+
+_WEATHER_CACHE = MappedArrayCache(config.WEATHER_CACHE_DIR, max_bytes=config.WEATHER_CACHE_MAX_BYTES)
+
+_TIME_COLUMNS = ("time", "timestamp", "datetime")
+_IRRADIANCE_COLUMNS = ("ghi", "dni", "dhi")
+# EPW uses 9999 and TMY3 -9900 for missing irradiance.
+_MISSING_LOW, _MISSING_HIGH = -999.0, 9999.0
+
+
+@dataclass(frozen=True)
+class WeatherRecord:
+    """Irradiance columns of one weather file, by calendar position."""
+
+    path: str
+    key: str  # changes whenever the file does
+    month: np.ndarray  # uint8
+    day: np.ndarray  # uint8
+    second: np.ndarray  # int32, second of the day in the file's standard time
+    ghi: np.ndarray  # float32, W/m^2
+    dni: np.ndarray
+    dhi: np.ndarray
+    utc_offset: float  # hours
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    altitude: Optional[float] = None
+
+    @property
+    def freq(self) -> str:
+        """Sampling interval as a pandas frequency (the most common row spacing)."""
+
+        position = (self.month.astype(np.int64) * 32 + self.day) * 86400 + self.second
+        steps = np.diff(position)
+        if steps.size == 0:
+            return "3600s"
+        values, counts = np.unique(steps, return_counts=True)
+        return f"{int(values[counts.argmax()])}s"
+
+    @property
+    def timezone(self) -> str:
+        """A timezone name for the file's standard time (UTC for fractional offsets)."""
+
+        hours = self.utc_offset
+        return f"Etc/GMT{-int(hours):+d}" if hours and hours == int(hours) else "UTC"
+
+    def irradiance(self, year: int, timezone: str) -> pd.DataFrame:
+        """``ghi``/``dni``/``dhi`` laid onto ``year``, indexed by local time in ``timezone``.
+
+        Rows falling outside ``year`` in ``timezone`` (a few night hours when
+        it differs from the file's offset) are dropped.
+        """
+
+        rows = np.ones(self.month.size, dtype=bool) if calendar.isleap(year) else (self.month != 2) | (self.day != 29)
+        month_days = [calendar.monthrange(year, month)[1] for month in range(1, 13)]
+        first_day = np.concatenate([[0], np.cumsum(month_days)[:-1]])
+        day_of_year = first_day[self.month[rows].astype(np.intp) - 1] + self.day[rows] - 1
+        seconds = day_of_year.astype(np.int64) * 86400 + self.second[rows] - round(self.utc_offset * 3600)
+        index = pd.DatetimeIndex(pd.Timestamp(year=year, month=1, day=1).value + seconds * 10**9, tz="UTC")
+        index = index.tz_convert(timezone)
+        inside = index.year == year
+        columns = {name: getattr(self, name)[rows][inside].astype(float) for name in _IRRADIANCE_COLUMNS}
+        return pd.DataFrame(columns, index=index[inside])
+
+    def check_site(self, site: SiteParameters, tolerance: float = config.WEATHER_MAX_SITE_OFFSET) -> None:
+        """Raise ``ValueError`` if the file records coordinates more than ``tolerance`` degrees from ``site``."""
+
+        if self.latitude is None or self.longitude is None:
+            return
+        lon_offset = abs((site.longitude - self.longitude + 180.0) % 360.0 - 180.0)
+        if abs(site.latitude - self.latitude) > tolerance or lon_offset > tolerance:
+            raise ValueError(
+                f"Weather file {os.path.basename(self.path)} is for {self.latitude:.3f}, {self.longitude:.3f}, "
+                f"more than {tolerance:g} degrees from the site at {site.latitude:.3f}, {site.longitude:.3f}."
+            )
+
+
+def _clean(values: pd.Series) -> np.ndarray:
+    values = pd.to_numeric(values, errors="coerce").to_numpy(dtype=float)
+    missing = ~((values > _MISSING_LOW) & (values < _MISSING_HIGH))
+    return np.where(missing, np.nan, np.maximum(values, 0.0)).astype(np.float32)
+
+
+def _metadata(meta: dict) -> np.ndarray:
+    return np.array([meta["latitude"], meta["longitude"], meta["altitude"], meta["TZ"]], dtype=float)
+
+
+def _parse_epw(path: str) -> Dict[str, np.ndarray]:
+    data, meta = iotools.read_epw(path)
+    return {
+        "month": data["month"].to_numpy(),
+        "day": data["day"].to_numpy(),
+        # Hour h covers (h - 1):00 to h:00.
+        "second": (data["hour"].to_numpy() - 1) * 3600 + 1800,
+        **{name: _clean(data[name]) for name in _IRRADIANCE_COLUMNS},
+        "site": _metadata(meta),
+    }
+
+
+def _parse_tmy3(path: str) -> Dict[str, np.ndarray]:
+    data, meta = iotools.read_tmy3(path, map_variables=True)
+    dates, clock = data["Date (MM/DD/YYYY)"].str, data["Time (HH:MM)"].str
+    return {
+        "month": dates.slice(0, 2).astype(int).to_numpy(),
+        "day": dates.slice(3, 5).astype(int).to_numpy(),
+        # "HH:MM" ends the hour, up to 24:00.
+        "second": clock.slice(0, 2).astype(int).to_numpy() * 3600 + clock.slice(3, 5).astype(int).to_numpy() * 60 - 1800,
+        **{name: _clean(data[name]) for name in _IRRADIANCE_COLUMNS},
+        "site": _metadata(meta),
+    }
+
+
+def _parse_csv(path: str) -> Dict[str, np.ndarray]:
+    data = pd.read_csv(path)
+    columns = {str(name).strip().lower(): name for name in data.columns}
+    time_column = next((columns[name] for name in _TIME_COLUMNS if name in columns), None)
+    missing = [name for name in _IRRADIANCE_COLUMNS if name not in columns]
+    if time_column is None or missing:
+        raise ValueError(
+            f"{path}: a weather CSV needs a {'/'.join(_TIME_COLUMNS)} column and ghi, dni and dhi columns."
+        )
+    times = pd.DatetimeIndex(pd.to_datetime(data[time_column], utc=True))
+    return {
+        "month": times.month.to_numpy(),
+        "day": times.day.to_numpy(),
+        "second": (times.hour * 3600 + times.minute * 60 + times.second).to_numpy(),
+        **{name: _clean(data[columns[name]]) for name in _IRRADIANCE_COLUMNS},
+        "site": np.array([np.nan, np.nan, np.nan, 0.0]),
+    }
+
+
+def _parse(path: str) -> Dict[str, np.ndarray]:
+    """Parse ``path`` into compact, calendar-sorted columns plus ``site`` metadata."""
+
+    with open(path, encoding="utf-8", errors="replace") as handle:
+        first, second = handle.readline(), handle.readline()
+    if first.startswith("LOCATION"):
+        parse = _parse_epw
+    elif second.startswith("Date (MM/DD/YYYY)"):
+        parse = _parse_tmy3
+    else:
+        parse = _parse_csv
+    try:
+        columns = parse(path)
+    except (KeyError, IndexError, TypeError) as exc:
+        raise ValueError(f"{path}: unreadable weather file ({exc}).") from exc
+    month, day, second = (np.asarray(columns[name], dtype=np.int64) for name in ("month", "day", "second"))
+    if month.size == 0:
+        raise ValueError(f"{path}: the weather file has no rows.")
+    position = (month * 32 + day) * 86400 + second
+    order = np.argsort(position, kind="stable")
+    if np.any(np.diff(position[order]) == 0):
+        raise ValueError(f"{path}: the weather file repeats a calendar time; it must cover at most one year.")
+    return {
+        "month": month[order].astype(np.uint8),
+        "day": day[order].astype(np.uint8),
+        "second": second[order].astype(np.int32),
+        **{name: columns[name][order] for name in _IRRADIANCE_COLUMNS},
+        "site": columns["site"],
+    }
+
+
+def load_weather(path: str | os.PathLike) -> WeatherRecord:
+    """Return the irradiance of the weather file at ``path``, parsing it only on a cache miss.
+
+    Raises ``ValueError`` for files that are not EPW, TMY3 or a CSV as
+    described in the module docstring.
+    """
+
+    path = os.path.abspath(path)
+    status = os.stat(path)
+    key = content_key(
+        version=_WEATHER_CACHE_VERSION, path=path, size=status.st_size, mtime_ns=status.st_mtime_ns
+    )
+    with stage("weather"):
+        arrays = _WEATHER_CACHE.get_or_compute(key, lambda: _parse(path))
+    latitude, longitude, altitude, utc_offset = (float(value) for value in arrays["site"])
+    return WeatherRecord(
+        path=path,
+        key=key,
+        month=arrays["month"],
+        day=arrays["day"],
+        second=arrays["second"],
+        ghi=arrays["ghi"],
+        dni=arrays["dni"],
+        dhi=arrays["dhi"],
+        utc_offset=utc_offset,
+        latitude=None if math.isnan(latitude) else latitude,
+        longitude=None if math.isnan(longitude) else longitude,
+        altitude=None if math.isnan(altitude) else altitude,
+    )
+
+
+__all__ = ["WeatherRecord", "load_weather"]
@@ -0,0 +1,247 @@
+"""Benchmark cases run by ``benchmarks.suite``.
+
+Kept apart from the runner because it imports the whole backend (pandas,
+pvlib, SciPy); the suite only loads it when an in-process case is selected,
+so ``run -k boot`` measures fresh interpreters without paying that import.
+In-process case names never contain "boot".
+
+``sun_path.*.iterrows`` times the pre-vectorisation sun-path loop for
+comparison with ``sun_path.*`` and ``sun_path.1min.columnar``.
+"""
+
+from __future__ import annotations
+
+import tempfile
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+import pvlib
+from pvlib import solarposition
+
+from backend import app as app_module
+from backend import config, encoding, orientation_optimizer, weather
+from backend.cache import ArrayDiskCache, MappedArrayCache
+from backend.heliostat import iter_field_blocks
+from backend.orientation_grid import OrientationGrid
+from backend.orientation_optimizer import (
+    EnergySurface,
+    _build_time_index,
+    _prepare_meteorology,
+    calculate_optimal_orientation,
+)
+from backend.solar_calculator import (
+    DEFAULT_SITE,
+    SiteParameters,
+    _round,
+    _sun_path_payloads,
+    _timezone_for,
+    get_sun_path,
+    get_sun_position,
+    get_sun_positions,
+    iter_sun_path_batches,
+)
+
+YEAR = 2025
+DATE = "2025-06-21"
+INSTANT = datetime.fromisoformat("2025-06-21T14:00:00+07:00")
+BERLIN = SiteParameters(latitude=52.52, longitude=13.405, altitude=34, timezone="Europe/Berlin", name="Berlin")
+# Typical year shipped with pvlib, and the site it describes.
+EPW_PATH = Path(pvlib.__file__).parent / "data" / "NLD_Amsterdam062400_IWEC.epw"
+AMSTERDAM = SiteParameters(latitude=52.3, longitude=4.77, altitude=-2, timezone="Etc/GMT-1", name="Amsterdam")
+
+
+@dataclass(frozen=True)
+class Case:
+    name: str
+    func: Callable[[], object]
+    # Runs before the warm-up call, e.g. to point caches somewhere.
+    setup: Optional[Callable[[], None]] = None
+
+def reset_caches() -> None:
+    """Disable the disk caches and the surface memo; every case starts from this state."""
+
+    orientation_optimizer._METEOROLOGY_CACHE = ArrayDiskCache(None, max_bytes=0)
+    weather._WEATHER_CACHE = ArrayDiskCache(None, max_bytes=0)
+    orientation_optimizer._SURFACE_MEMO.clear()
+    orientation_optimizer._SURFACE_MEMO.max_contexts = 0
+
+
+def _enable_surface_memo() -> None:
+    orientation_optimizer._SURFACE_MEMO.max_contexts = config.SURFACE_MEMO_SIZE
+
+
+def _temporary_disk_cache() -> None:
+    directory = tempfile.mkdtemp(prefix="solar-bench-")
+    orientation_optimizer._METEOROLOGY_CACHE = MappedArrayCache(directory, max_bytes=1 << 30)
+
+
+def _temporary_weather_cache() -> None:
+    weather._WEATHER_CACHE = MappedArrayCache(tempfile.mkdtemp(prefix="solar-bench-"), max_bytes=1 << 30)
+
+
+def _cache_hit(cache_class: type) -> Callable[[], object]:
+    """Load a 1-minute year of meteorology-sized columns (7 x 525600 float64, ~29 MiB)."""
+
+    @lru_cache(maxsize=None)
+    def populated() -> ArrayDiskCache:
+        cache = cache_class(tempfile.mkdtemp(prefix="solar-bench-"), max_bytes=1 << 30)
+        columns = np.random.default_rng(0).random((7, 525_600))
+        cache.store("year", {f"column{i}": values for i, values in enumerate(columns)})
+        return cache
+
+    return lambda: populated().load("year")
+
+
+def _iterrows_path(interval_minutes: int) -> list:
+    """The pre-vectorisation ``get_sun_path`` loop (``iterrows`` plus sunrise/sunset), for comparison."""
+
+    tz = _timezone_for(DEFAULT_SITE)
+    start = tz.localize(datetime.combine(datetime.strptime(DATE, "%Y-%m-%d").date(), time(0, 0)))
+    times = pd.date_range(start=start, end=start + timedelta(days=1), freq=f"{interval_minutes}min", inclusive="left")
+    solpos = solarposition.spa_python(
+        times, latitude=DEFAULT_SITE.latitude, longitude=DEFAULT_SITE.longitude, altitude=DEFAULT_SITE.altitude
+    )
+    path = [
+        {
+            "time": ts.tz_convert(tz).strftime("%H:%M"),
+            "elevation": _round(row["apparent_elevation"]),
+            "azimuth": _round(row["azimuth"]),
+        }
+        for ts, row in solpos.iterrows()
+    ]
+    solarposition.sun_rise_set_transit_spa(
+        times=pd.DatetimeIndex([start]), latitude=DEFAULT_SITE.latitude, longitude=DEFAULT_SITE.longitude, how="numpy"
+    )
+    return path
+
+
+def _optimise(tilt_step: float, azimuth_step: float, freq: str, **options) -> Callable[[], object]:
+    return lambda: calculate_optimal_orientation(
+        DEFAULT_SITE, year=YEAR, tilt_step=tilt_step, azimuth_step=azimuth_step, freq=freq, **options
+    )
+
+
+def _meteorology(site: SiteParameters, freq: str) -> Callable[[], object]:
+    return lambda: _prepare_meteorology(_build_time_index(YEAR, site, freq=freq), site)
+
+
+def _field(n_mirrors: int) -> Callable[[], object]:
+    """Mirrors on a 6 m grid north of a 120 m tower; blocks are reduced, not kept."""
+
+    side = int(np.ceil(np.sqrt(n_mirrors)))
+    east, north = np.meshgrid(np.arange(side) * 6.0 - 3 * side, np.arange(side) * 6.0 + 50)
+    mirrors = np.column_stack([east.ravel(), north.ravel(), np.zeros(side * side)])[:n_mirrors]
+    return lambda: sum(
+        float(block.cosine.sum()) for block in iter_field_blocks(mirrors, [0, 0, 120], DATE, interval_minutes=1)
+    )
+
+
+@lru_cache(maxsize=None)
+def _lookup_grid() -> OrientationGrid:
+    """A synthetic grid at the default 2-degree spacing (77 x 180 nodes)."""
+
+    latitudes, longitudes = np.arange(-76.0, 78.0, 2.0), np.arange(-180.0, 180.0, 2.0)
+    shape = (latitudes.size, longitudes.size)
+    tilt = np.broadcast_to(np.abs(latitudes)[:, None], shape)
+    azimuth = np.broadcast_to(np.where(latitudes >= 0, 180.0, 0.0)[:, None], shape)
+    return OrientationGrid(latitudes, longitudes, tilt, azimuth, np.full(shape, 1.8e6))
+
+
+@lru_cache(maxsize=None)
+def _position_batch():
+    """20k positions: 10 sites x 2000 half-hourly times."""
+
+    times = pd.date_range(f"{YEAR}-01-01", periods=2000, freq="30min", tz="UTC").to_pydatetime()
+    sites = [SiteParameters(-60 + 12 * i, 10 * i, 0, "UTC") for i in range(10)]
+    return get_sun_positions(times, sites)
+
+
+@lru_cache(maxsize=None)
+def _path_batches():
+    """A year of 5-minute sun-path samples (~105k), as the range endpoint computes them."""
+
+    return list(iter_sun_path_batches(f"{YEAR}-01-01", f"{YEAR}-12-31", interval_minutes=5))
+
+
+@lru_cache(maxsize=None)
+def _surface():
+    """Tilt 0..90 x azimuth 0..359.5 at 0.5 degrees (181 x 720 cells)."""
+
+    tilts, azimuths = np.arange(0, 90.5, 0.5), np.arange(0, 360, 0.5)
+    energy = np.random.default_rng(0).uniform(1.2e6, 2.1e6, (tilts.size, azimuths.size))
+    return EnergySurface(tilts=tilts, azimuths=azimuths, energy=energy)
+
+
+def _sun_path_body(fmt: str) -> bytes:
+    site = app_module._site_payload(DEFAULT_SITE)
+    if fmt == encoding.JSON:
+        return b"".join(
+            (app_module.app.json.dumps({**payload, "location": site}) + "\n").encode()
+            for batch in _path_batches()
+            for payload in _sun_path_payloads(batch, columnar=True)
+        )
+    tables = (app_module._sun_path_table(batch) for batch in _path_batches())
+    return b"".join(encoding.encode_stream(tables, fmt, {"location": site}))
+
+
+_SERIALIZERS: Dict[str, Callable[[str], Callable[[], object]]] = {
+    "sun_positions.20k": lambda fmt: lambda: app_module._encode(
+        (app_module._positions_payload if fmt == encoding.JSON else app_module._positions_table)(_position_batch()), fmt
+    ),
+    "sun_path.365d-5min": lambda fmt: lambda: _sun_path_body(fmt),
+    "surface.t0.5-a0.5": lambda fmt: lambda: app_module._encode(
+        {"surface": app_module._surface_payload(_surface())}
+        if fmt == encoding.JSON
+        else app_module._surface_table({}, _surface()),
+        fmt,
+    ),
+}
+
+
+_FORMAT_NAMES = {encoding.JSON: "json", encoding.ARROW: "arrow", encoding.MSGPACK: "msgpack"}
+
+
+def _serialize_case(name: str, fmt: str) -> Case:
+    def run() -> object:
+        with app_module.app.app_context():
+            return _SERIALIZERS[name](fmt)()
+
+    return Case(f"serialize.{name}.{_FORMAT_NAMES[fmt]}", run)
+
+
+CASES: List[Case] = [
+    Case("sun_position.single", lambda: get_sun_position(INSTANT)),
+    Case("sun_position.single.numpy", lambda: get_sun_position(INSTANT, engine="numpy")),
+    *[Case(f"sun_path.{interval}min", lambda i=interval: get_sun_path(DATE, interval_minutes=i)) for interval in (1, 5, 60)],
+    Case("sun_path.1min.columnar", lambda: get_sun_path(DATE, interval_minutes=1, columnar=True)),
+    Case("sun_path.1min.numpy", lambda: get_sun_path(DATE, interval_minutes=1, engine="numpy")),
+    *[Case(f"sun_path.{interval}min.iterrows", lambda i=interval: _iterrows_path(i)) for interval in (1, 5, 60)],
+    Case("prepare_meteorology.1h", _meteorology(DEFAULT_SITE, "1h")),
+    Case("prepare_meteorology.15min", _meteorology(DEFAULT_SITE, "15min")),
+    Case("prepare_meteorology.1h.berlin", _meteorology(BERLIN, "1h")),
+    Case("optimise.grid.t5-a10.1h", _optimise(5, 10, "1h")),
+    Case("optimise.grid.t1-a5.1h", _optimise(1, 5, "1h")),
+    Case("optimise.grid.t1-a5.15min", _optimise(1, 5, "15min")),
+    Case("optimise.grid.t1-a5.15min.chunked", _optimise(1, 5, "15min", chunk="month")),
+    Case("optimise.refine.t0.1-a0.1.1h", _optimise(0.1, 0.1, "1h", strategy="refine")),
+    Case("optimise.grid.t1-a5.1h.day-step-7", _optimise(1, 5, "1h", day_step=7)),
+    Case("optimise.grid.t1-a5.1h.warm-cache", _optimise(1, 5, "1h"), setup=_temporary_disk_cache),
+    Case("optimise.grid.t1-a5.1h.memo-hit", _optimise(1, 5, "1h"), setup=_enable_surface_memo),
+    Case(
+        "optimise.grid.t1-a5.epw",
+        lambda: calculate_optimal_orientation(AMSTERDAM, year=YEAR, tilt_step=1, azimuth_step=5, weather=EPW_PATH),
+    ),
+    Case("weather.load.epw.parse", lambda: weather.load_weather(EPW_PATH)),
+    Case("weather.load.epw.mapped", lambda: weather.load_weather(EPW_PATH), setup=_temporary_weather_cache),
+    Case("disk_cache.hit.1min-year.npz", _cache_hit(ArrayDiskCache)),
+    Case("disk_cache.hit.1min-year.mapped", _cache_hit(MappedArrayCache)),
+    Case("heliostat.field.1k-1min", _field(1_000)),
+    Case("heliostat.field.10k-1min", _field(10_000)),
+    Case("orientation_grid.lookup", lambda: _lookup_grid().lookup(21.03, 105.85)),
+    *[_serialize_case(name, fmt) for name in _SERIALIZERS for fmt in encoding.available_formats()],
+]
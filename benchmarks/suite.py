@@ -0,0 +1,224 @@
+"""Reproducible timing and peak-memory benchmarks for the backend hot paths.
+
+Every case uses fixed sites, dates and years so that runs are comparable
+across commits. Each case is timed ``--repeat`` times after one warm-up call
+(median and best reported), then run once more under ``tracemalloc`` to
+record the peak Python/NumPy allocation. The meteorology disk cache is
+disabled for all cases except the ``warm-cache`` one, the weather-file cache
+for all but ``weather.load.*.mapped``, and the in-memory memo of evaluated
+grid cells for all but ``memo-hit``, so the numbers measure computation
+rather than whatever happens to be cached locally.
+
+The ``serialize.*`` cases time turning already computed arrays into a
+response body in each available format (JSON, plus Arrow/MessagePack when
+``pyarrow``/``msgpack`` are installed) and also report the body size.
+
+The ``boot.*`` cases run in fresh interpreters: ``boot.import_app`` is the
+time to import ``backend.app`` and ``boot.warm_up`` the time of its
+``warm_up()`` hook with the disk caches disabled (a cold worker). Their
+memory column is the process peak RSS rather than a tracemalloc peak.
+The other cases are defined in ``benchmarks/cases.py``, which imports the
+backend; it is only loaded when one of them is selected.
+
+Run from the repository root::
+
+    python -m benchmarks.suite run                      # print a table
+    python -m benchmarks.suite run -o current.json      # ... and save it
+    python -m benchmarks.suite run -k optimise          # only matching cases
+    python -m benchmarks.suite record                   # refresh benchmarks/baseline.json
+    python -m benchmarks.suite compare current.json     # vs. the recorded baseline
+
+``compare`` exits with status 1 when a case's median time or peak memory
+exceeds the baseline by more than ``--threshold`` (default 1.25x). Baselines
+are machine specific; record one on the machine you compare on.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from importlib import metadata
+from pathlib import Path
+from types import ModuleType
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    from .cases import Case
+
+BASELINE_PATH = Path(__file__).resolve().with_name("baseline.json")
+
+# Cases slower than this per call are timed once per sample instead of in a loop.
+_MIN_SAMPLE_SECONDS = 0.05
+
+
+def _measure(cases: ModuleType, case: Case, repeat: int) -> Dict[str, float]:
+    cases.reset_caches()
+    if case.setup is not None:
+        case.setup()
+    start = time.perf_counter()
+    case.func()  # warm-up: imports, lazy tables, caches under test
+    first = time.perf_counter() - start
+    number = 1 if first >= _MIN_SAMPLE_SECONDS else max(1, int(_MIN_SAMPLE_SECONDS / max(first, 1e-6)))
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            case.func()
+        samples.append((time.perf_counter() - start) / number)
+
+    tracemalloc.start()
+    try:
+        output = case.func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    stats = {
+        "median_ms": statistics.median(samples) * 1000,
+        "min_ms": min(samples) * 1000,
+        "peak_mib": peak / 2**20,
+        "calls_per_sample": number,
+    }
+    if isinstance(output, bytes):
+        stats["body_kib"] = len(output) / 1024
+    return stats
+
+
+BOOT_CASES = ("boot.import_app", "boot.warm_up")
+
+_BOOT_SNIPPET = """
+import json, resource, time
+start = time.perf_counter()
+import backend.app as app
+imported = time.perf_counter()
+app.warm_up()
+warmed = time.perf_counter()
+print(json.dumps({"import_app": imported - start, "warm_up": warmed - imported,
+                  "maxrss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}))
+"""
+
+
+def _measure_boot(repeat: int) -> Dict[str, Dict[str, float]]:
+    root = Path(__file__).resolve().parents[1]
+    env = {**os.environ, "SOLAR_METEOROLOGY_CACHE_DIR": "", "SOLAR_SUN_TABLE_CACHE_DIR": "", "SOLAR_WARM_UP": "0"}
+    runs = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", _BOOT_SNIPPET], cwd=root, env=env, check=True, capture_output=True, text=True
+        ).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+    peak = max(run["maxrss_kib"] for run in runs) / 1024
+    return {
+        f"boot.{phase}": {
+            "median_ms": statistics.median(run[phase] for run in runs) * 1000,
+            "min_ms": min(run[phase] for run in runs) * 1000,
+            "peak_mib": peak,
+            "calls_per_sample": 1,
+        }
+        for phase in (name.split(".", 1)[1] for name in BOOT_CASES)
+    }
+
+
+def _environment() -> Dict[str, object]:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        **{name: metadata.version(name) for name in ("numpy", "pandas", "pvlib")},
+    }
+
+
+def run(pattern: Optional[str], repeat: int) -> Dict[str, object]:
+    results = {}
+    print(f"{'case':<38} {'median ms':>10} {'min ms':>10} {'peak MiB':>9} {'body KiB':>9}")
+
+    def report(name: str, stats: Dict[str, float]) -> None:
+        results[name] = stats
+        body = f"{stats['body_kib']:>9.1f}" if "body_kib" in stats else ""
+        print(f"{name:<38} {stats['median_ms']:>10.2f} {stats['min_ms']:>10.2f} {stats['peak_mib']:>9.1f} {body}")
+
+    if not pattern or any(pattern in name for name in BOOT_CASES):
+        for name, stats in _measure_boot(repeat).items():
+            report(name, stats)
+    if not pattern or "boot" not in pattern:
+        # Imports the backend; boot cases above run in their own interpreters.
+        from . import cases
+
+        for case in cases.CASES:
+            if pattern and pattern not in case.name:
+                continue
+            report(case.name, _measure(cases, case, repeat))
+        cases.reset_caches()
+    return {"recorded": datetime.now().isoformat(timespec="seconds"), "environment": _environment(), "results": results}
+
+
+def compare(baseline: Dict[str, object], current: Dict[str, object], threshold: float) -> bool:
+    """Print per-case ratios; return True when nothing regressed beyond ``threshold``."""
+
+    ok = True
+    print(f"{'case':<38} {'time ratio':>10} {'mem ratio':>10}")
+    for name, stats in current["results"].items():
+        reference = baseline["results"].get(name)
+        if reference is None:
+            print(f"{name:<38} {'(new)':>10}")
+            continue
+        time_ratio = stats["median_ms"] / reference["median_ms"]
+        memory_ratio = stats["peak_mib"] / reference["peak_mib"] if reference["peak_mib"] else 1.0
+        regressed = time_ratio > threshold or memory_ratio > threshold
+        ok &= not regressed
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{name:<38} {time_ratio:>9.2f}x {memory_ratio:>9.2f}x{flag}")
+    if baseline.get("environment") != current.get("environment"):
+        print("note: baseline was recorded in a different environment", file=sys.stderr)
+    return ok
+
+
+def _load(path: Path) -> Dict[str, object]:
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def _save(path: Path, report: Dict[str, object]) -> None:
+    path.write_text(json.dumps(report, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the solar backend hot paths")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run the benchmarks")
+    run_parser.add_argument("-o", "--output", type=Path, help="Write results as JSON to this file")
+    record_parser = commands.add_parser("record", help="Run the benchmarks and store them as the baseline")
+    for sub in (run_parser, record_parser):
+        sub.add_argument("-k", dest="pattern", help="Only run cases whose name contains this text")
+        sub.add_argument("--repeat", type=int, default=5, help="Timed samples per case (default: %(default)s)")
+
+    compare_parser = commands.add_parser("compare", help="Compare a results file against the baseline")
+    compare_parser.add_argument("current", type=Path, help="Results written by 'run -o'")
+    compare_parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    compare_parser.add_argument(
+        "--threshold", type=float, default=1.25, help="Allowed slowdown / memory growth ratio (default: %(default)s)"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    if args.command == "compare":
+        return 0 if compare(_load(args.baseline), _load(args.current), args.threshold) else 1
+    report = run(args.pattern, args.repeat)
+    output = BASELINE_PATH if args.command == "record" else args.output
+    if output is not None:
+        _save(output, report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
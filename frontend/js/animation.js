@@ -1,4 +1,4 @@
-import { fetchOptimalOrientation, fetchSunPath, fetchSunPosition } from "./api.js";
+import { fetchOptimalOrientation, fetchSunPath, fetchSunPosition, openSunPositionStream } from "./api.js";
 import { SolarCanvas } from "./canvas.js";
 
 const PRESET_LOCATIONS = {
@@ -83,6 +83,15 @@ let selectedDate = null;
 let currentMinutes = 0;
 let lastFrameTimestamp = null;
 
+// While "following now" (after Reset until the user plays, scrubs or picks a
+// date) the scene tracks live positions from the SSE stream, or from polling
+// /api/sun-position when the stream is unavailable.
+const LIVE_INTERVAL_SECONDS = 30;
+let followingNow = false;
+let liveStream = null;
+let liveStreamKey = null;
+let livePollTimer = null;
+
 function buildDateFormatter(timezone) {
   return new Intl.DateTimeFormat("en-CA", {
     timeZone: timezone,
@@ -129,8 +138,20 @@ function formatClock(minutesValue) {
   return `${pad(hours)}:${pad(minutes)}:${pad(seconds)}`;
 }
 
+function pathEntries(path) {
+  if (!path || Array.isArray(path)) {
+    return path ?? [];
+  }
+  // Columnar payload: {time: [...], elevation: [...], azimuth: [...]}
+  return (path.time ?? []).map((time, index) => ({
+    time,
+    elevation: path.elevation[index],
+    azimuth: path.azimuth[index],
+  }));
+}
+
 function preparePathData(data) {
-  const samples = (data?.path ?? []).map((entry) => ({
+  const samples = pathEntries(data?.path).map((entry) => ({
     minutes: parseTimeToMinutes(entry.time),
     elevation: Number(entry.elevation),
     azimuth: Number(entry.azimuth),
@@ -225,6 +246,9 @@ function renderScene() {
 
 function setPlayState(playing) {
   isPlaying = playing;
+  if (playing) {
+    followingNow = false;
+  }
   playPauseButton.textContent = playing ? "Tạm dừng" : "Phát";
 }
 
@@ -370,6 +394,63 @@ async function loadSunPath(dateString) {
   }
 }
 
+async function applyLivePosition(snapshot) {
+  if (!followingNow || !snapshot?.timestamp) {
+    return;
+  }
+  const [datePart, timePart] = snapshot.timestamp.split("T");
+  const [hours, minutes, secondsWithOffset] = timePart.split(":");
+  if (datePart !== selectedDate) {
+    selectedDate = datePart;
+    datePicker.value = selectedDate;
+    await loadSunPath(selectedDate);
+  }
+  currentMinutes = Number(hours) * 60 + Number(minutes) + Number(secondsWithOffset.substring(0, 2)) / 60;
+  updateCurrentTimeDisplay();
+}
+
+function stopLiveUpdates() {
+  if (liveStream) {
+    liveStream.close();
+    liveStream = null;
+  }
+  clearInterval(livePollTimer);
+  livePollTimer = null;
+  liveStreamKey = null;
+}
+
+function startLivePolling() {
+  livePollTimer = setInterval(async () => {
+    try {
+      await applyLivePosition(await fetchSunPosition(undefined, currentSite));
+    } catch (error) {
+      console.error("Không thể cập nhật vị trí Mặt Trời:", error);
+    }
+  }, LIVE_INTERVAL_SECONDS * 1000);
+}
+
+function startLiveUpdates() {
+  const key = JSON.stringify([currentSite.latitude, currentSite.longitude, currentSite.altitude, currentSite.timezone]);
+  if (key === liveStreamKey) {
+    return;
+  }
+  stopLiveUpdates();
+  liveStreamKey = key;
+  liveStream = openSunPositionStream(currentSite, applyLivePosition, { interval: LIVE_INTERVAL_SECONDS });
+  if (!liveStream) {
+    startLivePolling();
+    return;
+  }
+  liveStream.onerror = () => {
+    // EventSource retries dropped connections itself; it only gives up
+    // (CLOSED) when the server does not offer the stream at all.
+    if (liveStream?.readyState === EventSource.CLOSED) {
+      liveStream = null;
+      startLivePolling();
+    }
+  };
+}
+
 async function resetToNow() {
   try {
     setPlayState(false);
@@ -401,6 +482,8 @@ async function resetToNow() {
     await loadSunPath(selectedDate);
     updateCurrentTimeDisplay();
     renderScene();
+    followingNow = true;
+    startLiveUpdates();
   } catch (error) {
     console.error("Không thể tải vị trí hiện tại của Mặt Trời:", error);
   }
@@ -408,6 +491,7 @@ async function resetToNow() {
 
 function handleSliderInput(event) {
   setPlayState(false);
+  followingNow = false;
   currentMinutes = Number(event.target.value);
   updateCurrentTimeDisplay();
   renderScene();
@@ -420,6 +504,7 @@ async function handleDateChange(event) {
   }
   selectedDate = newDate;
   setPlayState(false);
+  followingNow = false;
   currentMinutes = 0;
   await loadSunPath(selectedDate);
   updateCurrentTimeDisplay();
@@ -468,6 +553,9 @@ function initControls() {
   locationPresetSelect.addEventListener("change", () => {
     const preset = PRESET_LOCATIONS[locationPresetSelect.value];
     if (preset) {
+      // The live stream follows the previous site; Apply restarts it for this one.
+      followingNow = false;
+      stopLiveUpdates();
       currentSite = { ...preset };
       fillInputsFromSite(currentSite, { skipPresetUpdate: true });
       updateLocationLabel();
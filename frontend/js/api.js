@@ -1,13 +1,16 @@
 const API_BASE = window.location.origin;
 
-async function requestJson(path, params = {}) {
+function buildUrl(path, params = {}) {
   const url = new URL(path, API_BASE);
   Object.entries(params).forEach(([key, value]) => {
     if (value === undefined || value === null || value === "") return;
     url.searchParams.set(key, value);
   });
+  return url.toString();
+}
 
-  const response = await fetch(url.toString(), { cache: "no-store" });
+async function requestJson(path, params = {}, { cache = "no-store" } = {}) {
+  const response = await fetch(buildUrl(path, params), { cache });
   if (!response.ok) {
     const error = await response.json().catch(() => ({ error: "Request failed" }));
     throw new Error(error.error || `Request failed with status ${response.status}`);
@@ -33,9 +36,20 @@ export async function fetchSunPosition(datetime, site) {
   return requestJson("/api/sun-position", params);
 }
 
+// Live positions pushed by the server (Server-Sent Events). Returns the
+// EventSource, or null when the browser has no EventSource support.
+export function openSunPositionStream(site, onPosition, { interval } = {}) {
+  if (typeof window.EventSource !== "function") return null;
+  const source = new EventSource(buildUrl("/api/sun-position/stream", applySiteParams({ interval }, site)));
+  source.addEventListener("position", (event) => onPosition(JSON.parse(event.data)));
+  return source;
+}
+
 export async function fetchSunPath(date, interval, site) {
-  const params = applySiteParams({ date, interval }, site);
-  return requestJson("/api/sun-path", params);
+  const params = applySiteParams({ date, interval, columnar: 1 }, site);
+  // Sun paths and orientations are deterministic; let the browser revalidate
+  // them with the server's ETag instead of refetching on every site switch.
+  return requestJson("/api/sun-path", params, { cache: "default" });
 }
 
 export async function fetchOptimalOrientation(options, site) {
@@ -49,5 +63,5 @@ export async function fetchOptimalOrientation(options, site) {
     },
     site,
   );
-  return requestJson("/api/optimal-orientation", params);
+  return requestJson("/api/optimal-orientation", params, { cache: "default" });
 }
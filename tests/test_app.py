@@ -0,0 +1,439 @@
+import base64
+import json
+import subprocess
+import time
+from pathlib import Path
+import sys
+
+import numpy as np
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:  # pragma: no cover - import guard
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend import app as app_module
+from backend.cache import TTLCache
+
+
+@pytest.fixture()
+def client():
+    app_module._SUN_PATH_CACHE.clear()
+    app_module._ORIENTATION_CACHE.clear()
+    app_module._SURFACE_CACHE.clear()
+    app_module._ORIENTATION_JOBS.clear()
+    app_module._SUN_STREAM.clear()
+    return app_module.app.test_client()
+
+
+def test_ttl_cache_expiry_and_lru():
+    now = [0.0]
+    cache = TTLCache(maxsize=2, ttl=10, timer=lambda: now[0])
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == (True, 1)
+    cache.set("c", 3)  # evicts "b", the least recently used
+    assert cache.get("b") == (False, None)
+    now[0] = 11
+    assert cache.get("a") == (False, None)
+    assert cache.stats()["hits"] == 1
+
+
+def test_sun_path_cached_with_etag(client):
+    url = "/api/sun-path?date=2025-11-11&interval=60"
+    first = client.get(url)
+    assert first.status_code == 200
+    assert first.headers["X-Cache"] == "MISS"
+    assert "max-age" in first.headers["Cache-Control"]
+
+    second = client.get(url)
+    assert second.headers["X-Cache"] == "HIT"
+    assert second.get_data() == first.get_data()
+
+    revalidated = client.get(url, headers={"If-None-Match": first.headers["ETag"]})
+    assert revalidated.status_code == 304
+
+
+def test_sun_path_today_requires_revalidation(client):
+    response = client.get("/api/sun-path?interval=120")
+    assert response.status_code == 200
+    assert response.headers["Cache-Control"] == "no-cache"
+
+
+def test_orientation_cache_keyed_on_parameters(client):
+    base = "/api/optimal-orientation?year=2025&tilt_step=10&tilt_max=40&azimuth_step=90"
+    assert client.get(base).headers["X-Cache"] == "MISS"
+    assert client.get(base).headers["X-Cache"] == "HIT"
+    assert client.get(base + "&lat=21&lon=105.8").headers["X-Cache"] == "MISS"
+    stats = client.get("/api/cache-stats").get_json()
+    assert stats["optimal_orientation"]["hits"] == 1
+
+
+def test_invalid_request_not_cached(client):
+    response = client.get("/api/sun-path?date=2025/11/11")
+    assert response.status_code == 400
+    assert app_module._SUN_PATH_CACHE.stats()["size"] == 0
+
+
+def test_batch_sun_positions_endpoint(client):
+    response = client.post(
+        "/api/sun-positions",
+        json={
+            "times": ["2025-11-11T14:00:00+07:00", "2025-11-11T15:00:00+07:00"],
+            "sites": [{"lat": 10.8231, "lon": 106.6297}, {"lat": 21.0278, "lon": 105.8342, "tz": "Asia/Bangkok"}],
+        },
+    )
+    assert response.status_code == 200
+    payload = response.get_json()
+    assert payload["count"] == 4
+    assert payload["site_index"] == [0, 0, 1, 1]
+    assert payload["timestamp"][0] == "2025-11-11T14:00:00+07:00"
+    assert abs(payload["elevation"][0] - 44.84) < 0.2
+
+
+def test_batch_sun_positions_rejects_bad_sites(client):
+    response = client.post("/api/sun-positions", json={"sites": [{"lat": 10}]})
+    assert response.status_code == 400
+
+
+def test_sun_path_range_streams_ndjson(client):
+    response = client.get("/api/sun-path?start=2025-12-30&end=2026-01-02&interval=60&columnar=1")
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [line["date"] for line in lines] == ["2025-12-30", "2025-12-31", "2026-01-01", "2026-01-02"]
+    assert all(len(line["path"]["time"]) == 24 for line in lines)
+    assert lines[0]["sunrise"] is not None
+
+
+def test_sun_path_range_validation(client):
+    assert client.get("/api/sun-path?start=2025-01-02&end=2025-01-01").status_code == 400
+    assert client.get("/api/sun-path?date=2025-01-01&start=2025-01-01").status_code == 400
+
+
+ARROW = "application/vnd.apache.arrow.stream"
+MSGPACK = "application/x-msgpack"
+
+
+def _unpack_columns(message):
+    return {
+        name: np.frombuffer(column["data"], dtype=column["dtype"]) for name, column in message["columns"].items()
+    }
+
+
+def test_batch_sun_positions_binary_formats_match_json(client):
+    msgpack = pytest.importorskip("msgpack")
+    pa = pytest.importorskip("pyarrow")
+    body = {"times": ["2025-11-11T14:00:00+07:00", "2025-11-11T15:00:00+07:00"], "sites": [{"lat": 10.8, "lon": 106.6}]}
+    expected = client.post("/api/sun-positions", json=body).get_json()
+
+    packed = client.post("/api/sun-positions", json=body, headers={"Accept": MSGPACK})
+    assert packed.mimetype == MSGPACK
+    assert "Accept" in packed.headers["Vary"]
+    message = msgpack.unpackb(packed.get_data())
+    columns = _unpack_columns(message)
+    assert message["meta"]["sites"] == expected["sites"]
+    assert columns["elevation"] == pytest.approx(expected["elevation"], abs=1e-4)
+    assert columns["is_daytime"].tolist() == expected["is_daytime"]
+    assert columns["timestamp"].astype("datetime64[ns]")[0] == np.datetime64("2025-11-11T07:00")
+
+    arrow = client.post("/api/sun-positions", json=body, headers={"Accept": ARROW})
+    table = pa.ipc.open_stream(arrow.get_data()).read_all()
+    assert table.column("azimuth").to_pylist() == pytest.approx(expected["azimuth"], abs=1e-4)
+    assert str(table.schema.field("timestamp").type) == "timestamp[ns, tz=UTC]"
+    assert json.loads(table.schema.metadata[b"meta"])["count"] == 2
+
+
+def test_sun_path_binary_formats(client):
+    msgpack = pytest.importorskip("msgpack")
+    pa = pytest.importorskip("pyarrow")
+    day = client.get("/api/sun-path?date=2025-06-21&interval=60&columnar=1").get_json()
+    packed = client.get("/api/sun-path?date=2025-06-21&interval=60", headers={"Accept": MSGPACK})
+    assert packed.headers["X-Cache"] == "MISS"
+    message = msgpack.unpackb(packed.get_data())
+    assert _unpack_columns(message)["elevation"] == pytest.approx(day["path"]["elevation"], abs=1e-4)
+    assert message["meta"]["sunrise"] == [day["sunrise"]]
+    assert message["meta"]["location"] == day["location"]
+
+    response = client.get("/api/sun-path?start=2025-12-30&end=2026-01-02&interval=60", headers={"Accept": ARROW})
+    assert response.mimetype == ARROW
+    reader = pa.ipc.open_stream(response.get_data())
+    assert json.loads(reader.schema.metadata[b"meta"])["timezone"] == "Asia/Ho_Chi_Minh"
+    batch, metadata = reader.read_next_batch_with_custom_metadata()
+    meta = json.loads(metadata[b"meta"])
+    assert meta["dates"] == ["2025-12-30", "2025-12-31", "2026-01-01", "2026-01-02"]
+    assert batch.num_rows == 4 * meta["samples_per_day"] == 96
+
+
+def test_orientation_surface_as_msgpack(client, monkeypatch):
+    msgpack = pytest.importorskip("msgpack")
+    monkeypatch.setattr(app_module, "_SURFACE_CACHE", TTLCache(4, 60))  # keep the shared hit/miss counters clean
+    url = "/api/optimal-orientation?year=2025&tilt_step=15&tilt_max=60&azimuth_step=30&day_step=30&surface=1"
+    expected = client.get(url).get_json()
+    message = msgpack.unpackb(client.get(url, headers={"Accept": MSGPACK}).get_data())
+    columns = _unpack_columns(message)
+    energy = np.frombuffer(base64.b64decode(expected["surface"]["data"]), dtype="<f4")
+    assert message["meta"]["surface"]["shape"] == [5, 12]
+    assert np.array_equal(columns["energy"], energy)
+    assert message["meta"]["surface"]["tilts"] == expected["surface"]["tilts"]
+    assert message["meta"]["orientation"] == expected["orientation"]
+
+
+def test_response_format_negotiation(client, monkeypatch):
+    html = client.get("/api/sun-path?date=2025-06-21&interval=120", headers={"Accept": "text/html,*/*;q=0.8"})
+    assert html.mimetype == "application/json"
+    monkeypatch.setattr(app_module.encoding, "available_formats", lambda: ("application/json",))
+    refused = client.get("/api/sun-path?date=2025-06-21&interval=120", headers={"Accept": MSGPACK})
+    assert refused.status_code == 406
+    fallback = client.get(
+        "/api/sun-path?date=2025-06-21&interval=120", headers={"Accept": f"{MSGPACK}, application/json;q=0.5"}
+    )
+    assert fallback.mimetype == "application/json"
+
+
+def test_heliostat_field_endpoint(client):
+    body = {"mirrors": [[10, 50, 0], [-30, 80, 1]], "receiver": [0, 0, 60], "date": "2025-06-21", "interval": 30}
+    summary = client.post("/api/heliostat-field", json=body).get_json()
+    assert summary["mirror_count"] == 2
+    assert summary["timestamp"][0].endswith("+07:00")
+    assert len(summary["field_cosine"]) == len(summary["timestamp"]) and len(summary["mirror_cosine"]) == 2
+    assert "tilt" not in summary
+
+    detail = client.post("/api/heliostat-field", json={**body, "detail": True}).get_json()
+    assert np.allclose(np.mean(detail["cosine"], axis=1), summary["field_cosine"], atol=1e-4)
+    assert np.array(detail["tilt"]).shape == (len(summary["timestamp"]), 2)
+
+    msgpack = pytest.importorskip("msgpack")
+    packed = client.post("/api/heliostat-field", json=body, headers={"Accept": MSGPACK})
+    unpacker = msgpack.Unpacker()
+    unpacker.feed(packed.get_data())
+    header, *tables = list(unpacker)
+    assert header["meta"]["mirror_count"] == 2
+    cosine = np.concatenate([_unpack_columns(table)["cosine"] for table in tables])
+    assert np.allclose(cosine, np.ravel(detail["cosine"]), atol=1e-4)
+
+
+def test_heliostat_field_validation(client, monkeypatch):
+    body = {"mirrors": [[10, 50, 0]], "receiver": [0, 0, 60]}
+    assert client.post("/api/heliostat-field", json={**body, "receiver": [0, 0]}).status_code == 400
+    assert client.post("/api/heliostat-field", json={**body, "mirrors": [[0, 0, 60]]}).status_code == 400
+    assert client.post("/api/heliostat-field", json={**body, "interval": 0}).status_code == 400
+    monkeypatch.setattr(app_module.config, "MAX_FIELD_DETAIL_CELLS", 10)
+    assert client.post("/api/heliostat-field", json={**body, "detail": True}).status_code == 400
+
+
+def _wait_for_job(client, location, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        job = client.get(location).get_json()
+        if job["status"] not in ("queued", "running") or time.monotonic() > deadline:
+            return job
+        time.sleep(0.02)
+
+
+def test_orientation_job_matches_synchronous_result(client):
+    params = {"year": 2025, "tilt_step": 10, "tilt_max": 40, "azimuth_step": 90, "lat": 21, "lon": 105.8}
+    submitted = client.post("/api/optimal-orientation/jobs", json=params)
+    assert submitted.status_code == 202
+    location = submitted.headers["Location"]
+    # Identical submissions share the job.
+    assert client.post("/api/optimal-orientation/jobs", json=params).get_json()["id"] == submitted.get_json()["id"]
+
+    job = _wait_for_job(client, location)
+    assert job["status"] == "done" and job["progress"] == 1.0
+    query = "&".join(f"{name}={value}" for name, value in params.items())
+    assert job["result"] == client.get(f"/api/optimal-orientation?{query}").get_json()
+
+
+def test_orientation_job_errors(client):
+    assert client.post("/api/optimal-orientation/jobs", json={"strategy": "nope"}).status_code == 400
+    for freq in ("0h", "-1h", "M", "abc"):
+        response = client.post("/api/optimal-orientation/jobs", json={"freq": freq})
+        assert response.status_code == 400 and "freq" in response.get_json()["error"]
+        assert client.get(f"/api/optimal-orientation?freq={freq}").status_code == 400
+    assert client.get("/api/optimal-orientation/jobs/missing").status_code == 404
+    assert client.delete("/api/optimal-orientation/jobs/missing").status_code == 404
+
+
+def test_server_timing_and_metrics_when_instrumented(client, monkeypatch):
+    monkeypatch.setattr(app_module.config, "INSTRUMENTATION_ENABLED", True)
+    response = client.get("/api/optimal-orientation?year=2025&tilt_step=10&tilt_max=40&azimuth_step=90&day_step=30")
+    stages = dict(item.split(";dur=") for item in response.headers["Server-Timing"].split(", "))
+    assert {"meteorology", "sky_terms", "irradiance_sweep", "serialize", "total"} <= set(stages)
+    assert float(stages["total"]) >= float(stages["irradiance_sweep"])
+
+    client.get("/api/sun-path?date=2025-06-21&interval=60")
+    metrics = client.get("/api/metrics").get_data(as_text=True)
+    assert 'solar_request_duration_seconds_count{endpoint="sun_path"}' in metrics
+    assert 'solar_stage_duration_seconds_bucket{stage="spa",le="+Inf"}' in metrics
+    assert 'solar_cache_misses_total{cache="optimal_orientation"}' in metrics
+
+
+def test_instrumentation_is_opt_in(client, monkeypatch):
+    monkeypatch.setattr(app_module.config, "INSTRUMENTATION_ENABLED", False)
+    monkeypatch.setattr(app_module.config, "PROFILING_ENABLED", False)
+    response = client.get("/api/sun-path?date=2025-06-21&interval=60&profile=1")
+    assert "Server-Timing" not in response.headers
+    assert response.is_json
+    assert "solar_request_duration_seconds" not in client.get("/api/metrics").get_data(as_text=True)
+
+
+def test_profile_switch_returns_cprofile_summary(client, monkeypatch):
+    monkeypatch.setattr(app_module.config, "PROFILING_ENABLED", True)
+    response = client.get("/api/sun-path?date=2025-06-21&interval=60&profile=1")
+    assert response.mimetype == "text/plain"
+    text = response.get_data(as_text=True)
+    assert "function calls" in text and "get_sun_path" in text
+
+
+def test_approximate_orientation_uses_lookup_grid(client, monkeypatch, tmp_path):
+    from backend.orientation_grid import OrientationGrid
+
+    path = tmp_path / "grid.npz"
+    monkeypatch.setattr(app_module.config, "ORIENTATION_GRID_PATH", str(path))
+    base = "/api/optimal-orientation?year=2025&tilt_step=10&tilt_max=40&azimuth_step=90&day_step=30"
+    exact = client.get(base + "&lat=10&lon=106").get_json()
+    missing = client.get(base + "&lat=10&lon=106&approximate=1").get_json()
+    assert missing["approximate"] is None and missing["orientation"] == exact["orientation"]
+
+    ones = np.ones((3, 4))
+    OrientationGrid(
+        np.array([0.0, 20.0, 40.0]),
+        np.array([-180.0, -90.0, 0.0, 90.0]),
+        ones * [[5.0], [15.0], [60.0]],
+        ones * 180.0,
+        ones * 1.8e6,
+        options={"day_step": 7},
+        check={"points": 1, "max_poa_error": 0.002},
+    ).save(path)
+    estimate = client.get(base + "&lat=10&lon=106&approximate=1").get_json()
+    assert estimate["approximate"]["source"] == "lookup-grid"
+    assert estimate["approximate"]["lat_step"] == 20 and estimate["approximate"]["check"]["points"] == 1
+    assert estimate["orientation"]["tilt"] == pytest.approx(10, abs=0.1)
+    assert estimate["orientation"]["annual_poa_kwh_m2"] == 1800
+    assert estimate["orientation"]["estimated_error"] == 0.002
+    # Outside the grid, or steeper than tilt_max allows: computed exactly.
+    assert client.get(base + "&lat=-10&lon=106&approximate=1").get_json()["approximate"] is None
+    assert client.get(base + "&lat=35&lon=106&approximate=1").get_json()["approximate"] is None
+
+
+def test_orientation_against_weather_file(client, monkeypatch, tmp_path):
+    import shutil
+
+    import pvlib
+
+    from backend import weather
+    from backend.cache import MappedArrayCache
+
+    monkeypatch.setattr(weather, "_WEATHER_CACHE", MappedArrayCache(tmp_path / "cache", max_bytes=10**8))
+    monkeypatch.setattr(app_module.config, "WEATHER_DIR", str(tmp_path))
+    shutil.copy(Path(pvlib.__file__).parent / "data" / "NLD_Amsterdam062400_IWEC.epw", tmp_path / "amsterdam.epw")
+    base = "/api/optimal-orientation?year=2025&tilt_step=10&tilt_max=60&azimuth_step=90&day_step=30&lat=52.3&lon=4.77"
+    clear = client.get(base).get_json()
+    measured = client.get(base + "&weather=amsterdam.epw&approximate=1").get_json()
+    assert measured["weather"] == "amsterdam.epw" and measured["approximate"] is None
+    assert measured["orientation"]["annual_poa_kwh_m2"] < 0.7 * clear["orientation"]["annual_poa_kwh_m2"]
+
+    for name, error in (("../amsterdam.epw", "weather directory"), ("missing.epw", "Unknown weather file")):
+        response = client.get(base + f"&weather={name}")
+        assert response.status_code == 400 and error in response.get_json()["error"]
+    far = client.get(base.replace("lat=52.3", "lat=10") + "&weather=amsterdam.epw")
+    assert far.status_code == 400 and "degrees from the site" in far.get_json()["error"]
+
+
+def test_surface_queries_reuse_one_sweep(client):
+    base = "/api/optimal-orientation?year=2025&tilt_step=10&tilt_max=60&azimuth_step=30&day_step=30"
+    full = client.get(base + "&surface=1&top_k=3").get_json()
+    surface = full["surface"]
+    energy = np.frombuffer(base64.b64decode(surface["data"]), dtype="<f4").reshape(surface["shape"])
+    assert energy.shape == (7, 12)
+    assert full["top"][0]["tilt"] == full["orientation"]["tilt"]
+    assert [item["annual_poa_kwh_m2"] for item in full["top"]] == sorted(
+        (item["annual_poa_kwh_m2"] for item in full["top"]), reverse=True
+    )
+
+    constrained = client.get(base + "&azimuth_within=45,135&tilt_within=0,20").get_json()["constrained"]
+    assert 45 <= constrained["orientation"]["azimuth"] <= 135
+    assert constrained["orientation"]["tilt"] <= 20
+    assert app_module._SURFACE_CACHE.stats()["misses"] == 1
+
+    raw = client.get(base.replace("optimal-orientation?", "optimal-orientation/surface?"))
+    assert raw.mimetype == "application/octet-stream"
+    assert raw.headers["X-Surface-Shape"] == "7,12"
+    assert np.array_equal(np.frombuffer(raw.get_data(), dtype="<f4").reshape(7, 12), energy)
+    assert app_module._SURFACE_CACHE.stats()["misses"] == 1
+
+
+def test_surface_queries_require_grid_strategy(client):
+    response = client.get("/api/optimal-orientation?year=2025&strategy=refine&top_k=3")
+    assert response.status_code == 400
+    assert client.get("/api/optimal-orientation?year=2025&tilt_within=5").status_code == 400
+
+
+def test_orientation_for_another_year_reuses_cached_grid(client):
+    app_module.orientation_optimizer._SURFACE_MEMO.clear()
+    base = "/api/optimal-orientation?tilt_step=10&tilt_max=60&azimuth_step=30&day_step=30&year="
+    first = client.get(base + "2025").get_json()["orientation"]
+    second = client.get(base + "2026").get_json()["orientation"]
+    assert first["derived_from_year"] is None
+    assert second["derived_from_year"] == 2025
+    assert (second["tilt"], second["azimuth"]) == (first["tilt"], first["azimuth"])
+    assert client.get("/api/cache-stats").get_json()["surface_memo"]["contexts"] == 1
+
+
+def _sse_events(response, count):
+    events = []
+    for chunk in response.response:
+        text = chunk.decode() if isinstance(chunk, bytes) else chunk
+        if text.startswith("event: position"):
+            events.append(json.loads(text.split("data: ", 1)[1]))
+            if len(events) == count:
+                break
+    response.close()
+    return events
+
+
+def test_sun_position_stream_pushes_positions_for_each_site(client, monkeypatch):
+    monkeypatch.setattr(app_module._SUN_STREAM, "tick", 0.05)
+    response = client.get(
+        "/api/sun-position/stream?interval=0.05&site=21.0278,105.8342,10,Asia/Bangkok&site=-33.87,151.21", buffered=False
+    )
+    assert response.status_code == 200
+    assert response.mimetype == "text/event-stream"
+    events = _sse_events(response, 4)
+    assert [event["location"]["latitude"] for event in events] == [21.0278, -33.87, 21.0278, -33.87]
+    assert events[0]["timestamp"].endswith("+07:00")
+    site = {"lat": 21.0278, "lon": 105.8342, "alt": 10, "tz": "Asia/Bangkok"}
+    single = client.get("/api/sun-position", query_string={"datetime": events[0]["timestamp"], **site})
+    assert single.get_json()["elevation"] == pytest.approx(events[0]["elevation"], abs=0.01)
+
+    deadline = time.time() + 2
+    while app_module._SUN_STREAM.stats()["subscribers"] and time.time() < deadline:
+        time.sleep(0.01)
+    assert app_module._SUN_STREAM.stats()["subscribers"] == 0
+    assert "solar_sun_stream_batches_total" in client.get("/api/metrics").get_data(as_text=True)
+
+
+def test_sun_position_stream_validation(client):
+    assert client.get("/api/sun-position/stream?interval=0").status_code == 400
+    assert client.get("/api/sun-position/stream?site=1").status_code == 400
+    too_many = "&".join(f"site={lat},100" for lat in range(app_module.config.MAX_STREAM_SITES + 1))
+    assert client.get(f"/api/sun-position/stream?{too_many}").status_code == 400
+
+
+def test_app_import_defers_heavy_modules():
+    code = (
+        "import sys, backend.app as a; "
+        "assert not ({'pandas', 'pvlib', 'scipy'} & set(sys.modules)), sorted(sys.modules); "
+        "assert not a.solar_calculator.loaded"
+    )
+    subprocess.run([sys.executable, "-c", code], cwd=PROJECT_ROOT, check=True)
+
+
+def test_warm_up_reported_by_health(client, monkeypatch):
+    monkeypatch.setattr(app_module, "_WARM_UP_TIMINGS", {})
+    assert client.get("/api/health").get_json()["warmed_up"] is False
+    timings = app_module.warm_up()
+    assert {"import", "spa", "turbidity", "meteorology", "sun_table", "total"} <= set(timings)
+    health = client.get("/api/health").get_json()
+    assert health["warmed_up"] and health["modules_loaded"]
@@ -0,0 +1,174 @@
+import asyncio
+import json
+from pathlib import Path
+import sys
+import threading
+import time
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:  # pragma: no cover - import guard
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend import app as app_module
+from backend import offload
+from backend.asgi import AsgiBridge
+
+ORIENTATION_QUERY = b"year=2025&tilt_step=10&tilt_max=40&azimuth_step=90&day_step=30"
+
+
+def _scope(path, query=b"", method="GET", headers=()):
+    return {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "root_path": "",
+        "query_string": query,
+        "headers": [(name.encode(), value.encode()) for name, value in headers],
+        "http_version": "1.1",
+        "scheme": "http",
+        "server": ("testserver", 80),
+        "client": ("127.0.0.1", 5000),
+    }
+
+
+async def _request(bridge, path, query=b"", *, method="GET", body=b"", disconnect=None):
+    """Run one request; return (status, headers, body chunks)."""
+
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    sent = []
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        await (disconnect.wait() if disconnect else asyncio.Event().wait())
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    await bridge(_scope(path, query, method, [("content-type", "application/json")] if body else ()), receive, send)
+    start = sent[0]
+    chunks = [message["body"] for message in sent[1:] if message["body"]]
+    if disconnect is None and start["status"] != 429:
+        assert sent[-1] == {"type": "http.response.body", "body": b""}
+    return start["status"], dict(start["headers"]), chunks
+
+
+@pytest.fixture()
+def fresh_caches():
+    app_module._ORIENTATION_CACHE.clear()
+    app_module._SUN_PATH_CACHE.clear()
+    yield
+    offload.install(None)
+
+
+def test_light_and_streamed_endpoints_match_wsgi(fresh_caches):
+    bridge = AsgiBridge(app_module.app, threads=2, processes=0)
+    try:
+        status, headers, chunks = asyncio.run(_request(bridge, "/api/sun-position", b"datetime=2025-06-21T12:00:00Z"))
+        expected = app_module.app.test_client().get("/api/sun-position?datetime=2025-06-21T12:00:00Z")
+        assert status == 200 and headers[b"content-type"] == b"application/json"
+        assert json.loads(b"".join(chunks)) == expected.get_json()
+
+        body = json.dumps({"times": ["2025-06-21T12:00:00Z"], "sites": [{"lat": 10, "lon": 106}]}).encode()
+        status, _, chunks = asyncio.run(_request(bridge, "/api/sun-positions", method="POST", body=body))
+        assert status == 200 and json.loads(b"".join(chunks))["site_index"] == [0]
+
+        status, headers, chunks = asyncio.run(
+            _request(bridge, "/api/sun-path", b"start=2025-01-01&end=2025-03-05&interval=60")
+        )
+        assert status == 200 and headers[b"x-day-count"] == b"64"
+        assert len(chunks) > 1  # sent as produced, not buffered
+        assert len(b"".join(chunks).splitlines()) == 64
+    finally:
+        bridge.stop()
+
+
+def test_stream_occupies_thread_until_client_disconnects(fresh_caches, monkeypatch):
+    monkeypatch.setattr(app_module.config, "SUN_STREAM_KEEPALIVE", 0.05)
+    bridge = AsgiBridge(app_module.app, threads=1, processes=0)
+
+    async def scenario():
+        gone = asyncio.Event()
+        stream = asyncio.ensure_future(_request(bridge, "/api/sun-position/stream", disconnect=gone))
+        while not app_module._SUN_STREAM.stats()["subscribers"]:
+            await asyncio.sleep(0.01)
+        busy = await _request(bridge, "/api/sun-path", b"date=2025-06-21")
+        light = await _request(bridge, "/api/sun-position")
+        health = await _request(bridge, "/api/health")
+        gone.set()
+        await asyncio.wait_for(stream, 10)
+        return busy, light, health
+
+    try:
+        busy, light, health = asyncio.run(scenario())
+        assert busy[0] == 429 and busy[1][b"retry-after"] == b"5"
+        assert light[0] == 429  # every view but the health check needs a thread
+        assert health[0] == 200
+        assert app_module._SUN_STREAM.stats()["subscribers"] == 0
+        status, _, _ = asyncio.run(_request(bridge, "/api/sun-path", b"date=2025-06-21"))
+        assert status == 200
+    finally:
+        bridge.stop()
+
+
+def test_calculations_run_in_process_pool(fresh_caches):
+    expected = app_module.app.test_client().get(f"/api/optimal-orientation?{ORIENTATION_QUERY.decode()}").get_json()
+    app_module._ORIENTATION_CACHE.clear()
+    bridge = AsgiBridge(app_module.app, threads=2, processes=1, max_pending=2, timeout=120)
+    try:
+        status, _, chunks = asyncio.run(_request(bridge, "/api/optimal-orientation", ORIENTATION_QUERY))
+        assert status == 200 and json.loads(b"".join(chunks)) == expected
+        assert offload.installed().stats()["completed"] == 1
+        health = app_module.app.test_client().get("/api/health").get_json()
+        assert health["process_pool"]["workers"] == 1
+    finally:
+        bridge.stop()
+    assert offload.installed() is None
+
+
+def test_full_pool_answers_429(fresh_caches):
+    bridge = AsgiBridge(app_module.app, threads=2, processes=1, max_pending=0)
+    try:
+        status, headers, chunks = asyncio.run(_request(bridge, "/api/optimal-orientation", ORIENTATION_QUERY))
+        assert status == 429 and headers[b"retry-after"] == b"5"
+        assert "busy" in json.loads(b"".join(chunks))["error"]
+        metrics = app_module.app.test_client().get("/api/metrics").get_data(as_text=True)
+        assert "solar_process_pool_rejected_total 1" in metrics
+    finally:
+        bridge.stop()
+
+
+def test_offloader_times_out_and_keeps_slot_until_done():
+    pool = offload.ProcessOffloader(workers=1, max_pending=1, timeout=60)
+    try:
+        assert pool.call(sum, [1, 2, 3]) == 6  # waits for the worker to start
+        pool.timeout = 0.5
+        with pytest.raises(offload.OffloadTimeout):
+            pool.call(time.sleep, 1.5)
+        with pytest.raises(offload.Overloaded):
+            pool.call(sum, [1])
+        time.sleep(1.5)
+        assert pool.call(sum, [1]) == 1
+        assert pool.stats()["timed_out"] == 1 and pool.stats()["rejected"] == 1
+    finally:
+        pool.shutdown()
+
+
+def test_lifespan_starts_pools_and_warms_up():
+    calls = []
+    bridge = AsgiBridge(app_module.app, threads=1, processes=0, warm_up=lambda: calls.append(threading.current_thread()))
+    messages = [{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message["type"])
+
+    asyncio.run(bridge({"type": "lifespan"}, receive, send))
+    assert sent == ["lifespan.startup.complete", "lifespan.shutdown.complete"]
+    assert len(calls) == 1 and calls[0] is not threading.main_thread()
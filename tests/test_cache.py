@@ -0,0 +1,115 @@
+import multiprocessing
+import os
+from pathlib import Path
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:  # pragma: no cover - import guard
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend import orientation_optimizer
+from backend.cache import ArrayDiskCache, MappedArrayCache, content_key
+from backend.solar_calculator import DEFAULT_SITE
+
+
+def test_content_key_is_order_independent():
+    assert content_key(a=1, b="x") == content_key(b="x", a=1)
+    assert content_key(a=1) != content_key(a=2)
+
+
+def test_disk_cache_roundtrip_and_lru_eviction(tmp_path):
+    cache = ArrayDiskCache(tmp_path, max_bytes=10_000)
+    payload = {"values": np.arange(500, dtype=float)}  # ~4 KB per entry
+    cache.store("a", payload)
+    cache.store("b", payload)
+    old = os.stat(tmp_path / "a.npz").st_mtime - 60
+    os.utime(tmp_path / "b.npz", (old, old))
+    os.utime(tmp_path / "a.npz", (old + 1, old + 1))
+    cache.store("c", payload)
+
+    assert cache.load("b") is None
+    np.testing.assert_array_equal(cache.load("a")["values"], payload["values"])
+    assert cache.load("c") is not None
+
+
+def test_disk_cache_discards_corrupt_entries(tmp_path):
+    cache = ArrayDiskCache(tmp_path, max_bytes=10_000)
+    (tmp_path / "bad.npz").write_bytes(b"not a zip")
+    assert cache.get_or_compute("bad", lambda: {"x": np.ones(3)})["x"].sum() == 3
+    assert cache.load("bad") is not None
+
+
+def test_mapped_cache_returns_read_only_views(tmp_path):
+    cache = MappedArrayCache(tmp_path, max_bytes=10**6)
+    payload = {
+        "time_ns": np.arange(7, dtype=np.int64),
+        "grid": np.arange(12, dtype=np.float32).reshape(3, 4).T,
+        "empty": np.empty((0, 2)),
+        "flag": np.array(True),
+    }
+    cache.store("a", payload)
+    loaded = cache.load("a")
+    for name, values in payload.items():
+        np.testing.assert_array_equal(loaded[name], values)
+        assert loaded[name].dtype == values.dtype and loaded[name].shape == values.shape
+    assert not loaded["time_ns"].flags.writeable
+    assert loaded["time_ns"].base is not None  # a view of the mapping, not a copy
+
+    # Replacing or evicting the file leaves views already handed out intact.
+    cache.store("a", {"time_ns": np.zeros(7, dtype=np.int64)})
+    cache.clear()
+    np.testing.assert_array_equal(loaded["time_ns"], payload["time_ns"])
+
+    (tmp_path / "bad.arrays").write_bytes(b"SOLARRAY" + (10**6).to_bytes(8, "little"))
+    assert cache.load("bad") is None and not (tmp_path / "bad.arrays").exists()
+
+
+def test_mapped_cache_removes_legacy_npz_entries_once(tmp_path):
+    legacy = ArrayDiskCache(tmp_path, max_bytes=10**6)
+    legacy.store(content_key(entry=1), {"values": np.arange(3.0)})
+    (tmp_path / "notes.npz").write_bytes(b"user data")
+    cache = MappedArrayCache(tmp_path, max_bytes=10**6)
+    assert sorted(path.name for path in tmp_path.glob("*.npz")) == ["notes.npz"]
+
+    legacy.store(content_key(entry=2), {"values": np.arange(3.0)})
+    cache.store("new", {"values": np.arange(3.0)})
+    cache.clear()
+    assert len(list(tmp_path.glob("*.npz"))) == 2 and not list(tmp_path.glob("*.arrays"))
+
+
+def _compute_in_worker(directory: str) -> float:
+    def compute():
+        with open(Path(directory) / "computed.log", "a") as log:
+            log.write("x")
+        time.sleep(0.3)
+        return {"values": np.arange(3.0)}
+
+    return float(MappedArrayCache(directory, max_bytes=10**6).get_or_compute("shared", compute)["values"].sum())
+
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="needs fork")
+def test_mapped_cache_computes_once_across_processes(tmp_path):
+    with multiprocessing.get_context("fork").Pool(3) as pool:
+        assert pool.map(_compute_in_worker, [str(tmp_path)] * 3) == [3.0] * 3
+    assert (tmp_path / "computed.log").read_text() == "x"
+
+
+def test_site_meteorology_served_from_cache(tmp_path, monkeypatch):
+    cache = MappedArrayCache(tmp_path, max_bytes=50_000_000)
+    monkeypatch.setattr(orientation_optimizer, "_METEOROLOGY_CACHE", cache)
+    solpos, clearsky, dni_extra = orientation_optimizer._site_meteorology(DEFAULT_SITE, 2025, "3h")
+
+    def fail(*args, **kwargs):
+        raise AssertionError("meteorology should have been cached")
+
+    monkeypatch.setattr(orientation_optimizer, "_prepare_meteorology", fail)
+    cached = orientation_optimizer._site_meteorology(DEFAULT_SITE, 2025, "3h")
+    pd.testing.assert_index_equal(cached[0].index, solpos.index)
+    np.testing.assert_array_equal(cached[0]["apparent_zenith"], solpos["apparent_zenith"])
+    np.testing.assert_array_equal(cached[1]["dni"], clearsky["dni"])
+    np.testing.assert_array_equal(cached[2], dni_extra)
@@ -0,0 +1,55 @@
+from pathlib import Path
+import sys
+
+import numpy as np
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:  # pragma: no cover - import guard
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend.heliostat import field_orientation, iter_field_blocks, receiver_directions
+from backend.solar_calculator import get_sun_path
+
+RECEIVER = [0.0, 0.0, 120.0]
+
+
+def test_normals_bisect_sun_and_receiver_directions():
+    rng = np.random.default_rng(7)
+    mirrors = np.column_stack([rng.uniform(-400, 400, (40, 2)), rng.uniform(0, 4, 40)])
+    field = field_orientation(mirrors, RECEIVER, "2025-03-20", interval_minutes=15)
+
+    elevation, azimuth = np.radians(field.sun_elevation), np.radians(field.sun_azimuth)
+    sun = np.stack([np.cos(elevation) * np.sin(azimuth), np.cos(elevation) * np.cos(azimuth), np.sin(elevation)], 1)
+    normal = sun[:, None, :] + receiver_directions(mirrors, RECEIVER)[None]
+    normal /= np.linalg.norm(normal, axis=2, keepdims=True)
+    assert np.allclose(field.tilt, np.degrees(np.arccos(normal[..., 2])), atol=1e-4)
+    azimuth_error = (np.degrees(np.arctan2(normal[..., 0], normal[..., 1])) - field.azimuth + 180) % 360 - 180
+    assert np.abs(azimuth_error).max() < 1e-3
+    assert np.allclose(field.cosine, np.einsum("tk,tmk->tm", sun, normal), atol=1e-6)
+
+
+def test_mirror_below_receiver_halves_the_zenith_angle():
+    field = field_orientation([[0, 0, 0]], RECEIVER, "2025-06-21", interval_minutes=60)
+    half_zenith = (90 - field.sun_elevation) / 2
+    assert np.allclose(field.tilt[:, 0], half_zenith, atol=1e-3)
+    assert np.allclose(field.cosine[:, 0], np.cos(np.radians(half_zenith)), atol=1e-6)
+
+
+def test_blocks_cover_daytime_samples_only():
+    mirrors = [[x, y, 0] for x in range(-50, 51, 10) for y in range(20, 121, 10)]
+    whole = field_orientation(mirrors, RECEIVER, "2025-06-21", interval_minutes=5)
+    blocks = list(iter_field_blocks(mirrors, RECEIVER, "2025-06-21", interval_minutes=5, max_block_elements=1000))
+    assert len(blocks) > 1 and all(block.tilt.size <= 1000 for block in blocks)
+    assert np.array_equal(np.concatenate([block.tilt for block in blocks]), whole.tilt)
+
+    path = get_sun_path("2025-06-21", interval_minutes=5)["path"]
+    assert len(whole) == sum(sample["elevation"] > 0 for sample in path)
+    assert (whole.sun_elevation > 0).all()
+
+
+def test_invalid_geometry_is_rejected():
+    with pytest.raises(ValueError):
+        iter_field_blocks([[0, 0, 120]], RECEIVER, "2025-06-21")
+    with pytest.raises(ValueError):
+        iter_field_blocks([[0, 0]], RECEIVER, "2025-06-21")
@@ -0,0 +1,70 @@
+from pathlib import Path
+import sys
+import threading
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:  # pragma: no cover - import guard
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import pytest
+
+from backend.jobs import JobQueue, JobQueueFull
+from backend import orientation_optimizer
+from backend.orientation_optimizer import calculate_optimal_orientation
+
+
+def test_progress_reaches_one_for_every_strategy():
+    for strategy in ("grid", "refine", "optimize"):
+        orientation_optimizer._SURFACE_MEMO.clear()  # a fully reused grid only reports 1.0
+        reports = []
+        calculate_optimal_orientation(
+            year=2025, tilt_step=5, azimuth_step=5, day_step=30, strategy=strategy, progress=reports.append
+        )
+        assert reports[-1] == 1.0
+        assert reports == sorted(reports) and len(reports) >= 2
+
+
+def test_running_job_is_cancelled_at_next_progress_report():
+    queue = JobQueue(workers=1, max_pending=2, retention=60)
+    started, release = threading.Event(), threading.Event()
+
+    def work(report):
+        started.set()
+        release.wait(5)
+        report(0.5)
+        return "finished"
+
+    job = queue.submit("slow", work)
+    queued = queue.submit("other", lambda report: "never runs")
+    assert started.wait(5)
+    with pytest.raises(JobQueueFull):
+        queue.submit("third", lambda report: None)
+
+    assert queue.cancel(queued.id).status == "cancelled"
+    queue.cancel(job.id)
+    release.set()
+    job._future.result(5)
+    assert job.status == "cancelled" and job.result is None
+    # A cancelled job is not reused for the same key.
+    assert queue.submit("slow", lambda report: 42).id != job.id
+
+
+def test_failed_job_records_error():
+    queue = JobQueue(workers=1, max_pending=1, retention=60)
+
+    def fail(report):
+        raise ValueError("bad input")
+
+    job = queue.submit("key", fail)
+    job._future.result(5)
+    assert job.to_dict()["status"] == "failed" and job.error == "bad input"
+
+
+def test_unexpected_error_fails_job_and_frees_its_slot():
+    queue = JobQueue(workers=1, max_pending=1, retention=60)
+    job = queue.submit("key", lambda report: 1 / 0)
+    job._future.result(5)
+    assert job.to_dict()["status"] == "failed" and job.error == "Internal error (ZeroDivisionError)."
+    other = queue.submit("other", lambda report: "ok")
+    other._future.result(5)
+    assert other.result == "ok"
@@ -0,0 +1,60 @@
+from pathlib import Path
+import sys
+
+import numpy as np
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:  # pragma: no cover - import guard
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend.orientation_grid import OrientationGrid, build_orientation_grid, get_grid
+
+
+@pytest.fixture(scope="module")
+def built(tmp_path_factory):
+    output = tmp_path_factory.mktemp("grid") / "grid.npz"
+    grid = build_orientation_grid(output, lat_step=30, lon_step=120, lat_max=60, workers=1, check_points=2)
+    return output, grid
+
+
+def test_build_writes_grid_and_check(built):
+    output, grid = built
+    assert grid.tilt.shape == (5, 3)
+    assert list(grid.latitudes) == [-60, -30, 0, 30, 60]
+    assert list(grid.longitudes) == [-180, -60, 60]
+    assert not Path(f"{output}.partial.jsonl").exists()
+    assert grid.check["points"] == 2 and grid.check["max_poa_error"] >= 0
+    # Panels face the equator, tilted roughly by the latitude.
+    assert grid.tilt[4, 0] > 30 and grid.azimuth[4, 0] == pytest.approx(180, abs=5)
+    assert grid.tilt[0, 0] > 30 and grid.azimuth[0, 0] % 360 == pytest.approx(0, abs=5)
+
+    loaded = get_grid(output)
+    assert np.array_equal(loaded.annual_poa, grid.annual_poa)
+    assert loaded.options == grid.options and loaded.check == grid.check
+    assert get_grid(output) is loaded
+    assert get_grid(output.with_name("missing.npz")) is None
+
+
+def test_lookup_interpolates_and_wraps():
+    latitudes = np.array([0.0, 10.0])
+    longitudes = np.array([-180.0, 0.0])
+    tilt = np.array([[10.0, 10.0], [20.0, 20.0]])
+    azimuth = np.array([[170.0, 190.0], [180.0, 180.0]])
+    poa = np.array([[1000.0, 3000.0], [2000.0, 2000.0]])
+    grid = OrientationGrid(latitudes, longitudes, tilt, azimuth, poa, check={"max_poa_error": 0.01})
+
+    node = grid.lookup(10.0, 0.0)
+    assert node.tilt == pytest.approx(20) and node.azimuth == pytest.approx(180)
+    assert node.annual_poa_irradiance == pytest.approx(2000) and node.estimated_error == 0.01
+    # Halfway along the bottom row; -90 and 270 are the same meridian as 90 past 0.
+    assert grid.lookup(0.0, -90.0).annual_poa_irradiance == pytest.approx(2000)
+    assert grid.lookup(0.0, 90.0).annual_poa_irradiance == pytest.approx(2000)
+    assert grid.lookup(0.0, 270.0).annual_poa_irradiance == pytest.approx(2000)
+    # Normals are averaged, so 170 and 190 meet at 180 rather than jumping around.
+    assert grid.lookup(0.0, -90.0).azimuth == pytest.approx(180)
+    assert grid.lookup(0.0, -90.0).tilt == pytest.approx(10, abs=0.2)
+    assert grid.lookup(11.0, 0.0) is None
+
+    poa[0, 0] = np.nan
+    assert OrientationGrid(latitudes, longitudes, tilt, azimuth, poa).lookup(5.0, -170.0) is None
@@ -0,0 +1,250 @@
+import math
+from pathlib import Path
+import sys
+
+import numpy as np
+import pytest
+from pvlib import irradiance
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:  # pragma: no cover - import guard
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend import config, orientation_optimizer
+from backend.orientation_optimizer import (
+    _annual_poa_grid,
+    _build_time_index,
+    _chunk_days,
+    _resolve_chunk,
+    _prepare_meteorology,
+    _representative_day_weights,
+    _sky_terms,
+    calculate_optimal_orientation,
+)
+from backend.solar_calculator import SiteParameters
+
+SITE = SiteParameters(
+    latitude=config.LATITUDE,
+    longitude=config.LONGITUDE,
+    altitude=config.ALTITUDE,
+    timezone=config.TIMEZONE,
+    name="Test",
+)
+
+
+@pytest.fixture(autouse=True)
+def isolated_surface_memo():
+    """Start every test without cells evaluated by an earlier one."""
+
+    orientation_optimizer._SURFACE_MEMO.clear()
+    yield
+    orientation_optimizer._SURFACE_MEMO.clear()
+
+
+def _loop_energy(tilts, azimuths, solpos, clearsky, dni_extra):
+    energy = np.empty((len(tilts), len(azimuths)))
+    for i, tilt in enumerate(tilts):
+        for j, azimuth in enumerate(azimuths):
+            poa = irradiance.get_total_irradiance(
+                surface_tilt=tilt,
+                surface_azimuth=azimuth % 360,
+                solar_zenith=solpos["apparent_zenith"],
+                solar_azimuth=solpos["azimuth"],
+                dni=clearsky["dni"],
+                ghi=clearsky["ghi"],
+                dhi=clearsky["dhi"],
+                dni_extra=dni_extra,
+                model="haydavies",
+            )
+            energy[i, j] = float(np.nansum(poa["poa_global"]))
+    return energy
+
+
+def test_vectorised_grid_matches_pvlib_loop():
+    times = _build_time_index(2025, SITE, freq="3h")
+    solpos, clearsky, dni_extra = _prepare_meteorology(times, SITE)
+    tilts = np.array([0.0, 15.0, 45.0, 90.0])
+    azimuths = np.array([0.0, 90.0, 180.0, 270.0, 400.0])
+    expected = _loop_energy(tilts, azimuths, solpos, clearsky, dni_extra)
+    sky = _sky_terms(solpos, clearsky, dni_extra)
+    actual = _annual_poa_grid(sky, tilts, azimuths, max_block_elements=50)
+    np.testing.assert_allclose(actual, expected, rtol=1e-9)
+
+
+def test_optimiser_returns_surface_on_request():
+    result = calculate_optimal_orientation(
+        SITE, year=2025, tilt_step=10, tilt_max=40, azimuth_step=90, include_surface=True
+    )
+    surface = result.surface
+    assert surface is not None
+    assert surface.energy.shape == (len(surface.tilts), len(surface.azimuths))
+    assert math.isclose(surface.energy.max(), result.annual_poa_irradiance)
+    plain = calculate_optimal_orientation(SITE, year=2025, tilt_step=10, tilt_max=40, azimuth_step=90)
+    assert plain.surface is None
+    assert plain == result
+
+
+@pytest.mark.parametrize("strategy", ["refine", "optimize"])
+@pytest.mark.parametrize(
+    "site",
+    [
+        SITE,
+        SiteParameters(latitude=-33.8688, longitude=151.2093, altitude=58, timezone="Australia/Sydney"),
+        SiteParameters(latitude=52.52, longitude=13.405, altitude=34, timezone="Europe/Berlin"),
+    ],
+)
+def test_search_strategies_match_exhaustive_grid(strategy, site):
+    kwargs = dict(year=2025, tilt_step=0.5, tilt_max=60, azimuth_step=1.0, freq="2h")
+    exhaustive = calculate_optimal_orientation(site, **kwargs)
+    orientation_optimizer._SURFACE_MEMO.clear()  # the search must evaluate its own cells
+    searched = calculate_optimal_orientation(site, strategy=strategy, **kwargs)
+    assert abs(searched.tilt - exhaustive.tilt) <= kwargs["tilt_step"]
+    azimuth_gap = abs((searched.azimuth - exhaustive.azimuth + 180) % 360 - 180)
+    assert azimuth_gap <= kwargs["azimuth_step"]
+    assert searched.annual_poa_irradiance <= exhaustive.annual_poa_irradiance
+    assert math.isclose(searched.annual_poa_irradiance, exhaustive.annual_poa_irradiance, rel_tol=1e-5)
+
+
+def test_unknown_strategy_rejected():
+    with pytest.raises(ValueError):
+        calculate_optimal_orientation(SITE, year=2025, tilt_step=10, tilt_max=40, azimuth_step=90, strategy="anneal")
+
+
+def test_representative_day_weights_cover_the_year():
+    weights = _representative_day_weights(2024, 7)
+    assert weights.sum() == 366
+    assert np.count_nonzero(weights) == 53
+    assert np.array_equal(_representative_day_weights(2025, 1), np.ones(365))
+    # One representative day leaves nothing to estimate the error from.
+    with pytest.raises(ValueError, match="two representative days"):
+        calculate_optimal_orientation(SITE, year=2025, tilt_step=30, azimuth_step=90, day_step=365)
+
+
+def test_approximate_mode_close_to_full_year():
+    kwargs = dict(year=2025, tilt_step=5, tilt_max=60, azimuth_step=30)
+    exact = calculate_optimal_orientation(SITE, **kwargs)
+    approx = calculate_optimal_orientation(SITE, day_step=7, **kwargs)
+    assert exact.estimated_error is None
+    assert approx.estimated_error is not None and approx.estimated_error < 1e-2
+    assert (approx.tilt, approx.azimuth) == (exact.tilt, exact.azimuth)
+    assert math.isclose(approx.annual_poa_irradiance, exact.annual_poa_irradiance, rel_tol=1e-3)
+
+
+def test_surface_top_k_and_constrained_best():
+    result = calculate_optimal_orientation(
+        SITE, year=2025, tilt_step=10, tilt_max=60, azimuth_step=30, day_step=30, include_surface=True
+    )
+    surface = result.surface
+    top = surface.top_k(5)
+    assert top[0] == result
+    assert [item.annual_poa_irradiance for item in top] == sorted(
+        (item.annual_poa_irradiance for item in top), reverse=True
+    )
+
+    # Wrapping azimuth window through north, e.g. a north-facing roof.
+    north = surface.best(azimuth_range=(300, 60), tilt_range=(10, 30))
+    assert north.azimuth in (0.0, 30.0, 60.0, 300.0, 330.0) and 10 <= north.tilt <= 30
+    mask = surface._mask((10, 30), (300, 60))
+    assert north.annual_poa_irradiance == surface.energy[mask].max()
+
+    assert surface.energy_float32().dtype == np.dtype("<f4")
+    with pytest.raises(ValueError):
+        surface.best(tilt_range=(61, 90))
+
+
+def _fresh_surface(**options):
+    orientation_optimizer._SURFACE_MEMO.clear()
+    return calculate_optimal_orientation(SITE, include_surface=True, day_step=30, **options)
+
+
+def test_rerun_with_wider_or_finer_grid_only_evaluates_new_cells():
+    memo = orientation_optimizer._SURFACE_MEMO
+    _fresh_surface(year=2025, tilt_step=5, tilt_max=30, azimuth_step=20)
+    before = memo.stats()
+    result = calculate_optimal_orientation(
+        SITE, year=2025, tilt_step=5, tilt_max=60, azimuth_step=10, include_surface=True, day_step=30
+    )
+    after = memo.stats()
+    # 7 x 18 cells were known; the 13 x 36 grid needs the remaining ones.
+    assert after["reused_cells"] - before["reused_cells"] == 7 * 18
+    assert after["computed_cells"] - before["computed_cells"] == 13 * 36 - 7 * 18
+
+    expected = _fresh_surface(year=2025, tilt_step=5, tilt_max=60, azimuth_step=10)
+    np.testing.assert_allclose(result.surface.energy, expected.surface.energy, rtol=1e-12)
+    assert result == expected
+
+    computed = memo.stats()["computed_cells"]
+    calculate_optimal_orientation(
+        SITE, year=2025, tilt_step=5, tilt_max=60, azimuth_step=10, day_step=30, strategy="refine"
+    )
+    assert memo.stats()["computed_cells"] == computed
+
+
+def test_year_derived_from_cached_year_with_same_calendar():
+    options = dict(tilt_step=5, tilt_max=60, azimuth_step=10)
+    exact = _fresh_surface(year=2026, **options)
+    _fresh_surface(year=2025, **options)
+
+    derived = calculate_optimal_orientation(SITE, year=2026, day_step=30, max_year_shift=0.15, **options)
+    assert derived.derived_from_year == 2025
+    assert (derived.tilt, derived.azimuth) == (exact.tilt, exact.azimuth)
+    assert derived.annual_poa_irradiance == pytest.approx(exact.annual_poa_irradiance, rel=1e-3)
+
+    assert calculate_optimal_orientation(SITE, year=2026, day_step=30, **options).derived_from_year is None
+    leap = calculate_optimal_orientation(SITE, year=2024, day_step=30, max_year_shift=0.15, **options)
+    assert leap.derived_from_year is None
+
+
+def test_chunk_spans_cover_the_year():
+    for year in (2024, 2025):
+        for chunk in ("month", "week"):
+            spans = _chunk_days(year, chunk)
+            assert spans[0][0] == 0 and spans[-1][1] == (366 if year == 2024 else 365)
+            assert all(stop == start for (_, stop), (start, _) in zip(spans, spans[1:]))
+        assert len(_chunk_days(year, "month")) == 12
+    assert _resolve_chunk("auto", "15min") == "month"
+    assert _resolve_chunk("auto", "1h") is None
+    with pytest.raises(ValueError):
+        _resolve_chunk("day", "1h")
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        dict(include_surface=True),
+        dict(include_surface=True, day_step=7),
+        dict(strategy="refine"),
+        dict(strategy="optimize", day_step=5),
+    ],
+)
+def test_chunked_sweep_matches_single_pass(options):
+    berlin = SiteParameters(latitude=52.52, longitude=13.405, altitude=34, timezone="Europe/Berlin", name="Berlin")
+    sweep = dict(year=2024, tilt_step=5, azimuth_step=10, **options)
+    orientation_optimizer._SURFACE_MEMO.clear()
+    expected = calculate_optimal_orientation(berlin, **sweep)
+    for chunk, workers in (("month", 1), ("week", 2)):
+        orientation_optimizer._SURFACE_MEMO.clear()
+        result = calculate_optimal_orientation(berlin, chunk=chunk, workers=workers, **sweep)
+        assert (result.tilt, result.azimuth) == (expected.tilt, expected.azimuth)
+        assert result.annual_poa_irradiance == pytest.approx(expected.annual_poa_irradiance, rel=1e-12)
+        if expected.surface is not None:
+            np.testing.assert_allclose(result.surface.energy, expected.surface.energy, rtol=1e-12)
+        if expected.estimated_error is not None:
+            assert result.estimated_error == pytest.approx(expected.estimated_error, rel=1e-9)
+
+
+@pytest.mark.parametrize("year, chunk", [(2026, "month"), (2023, "week")])
+def test_chunks_split_days_at_an_ambiguous_midnight(year, chunk):
+    # Havana falls back from 01:00 to 00:00, so some chunks start at an ambiguous midnight.
+    havana = SiteParameters(latitude=23.13, longitude=-82.38, altitude=59, timezone="America/Havana", name="Havana")
+    whole = _build_time_index(year, havana, freq="15min")
+    chunks = [_build_time_index(year, havana, freq="15min", days=days) for days in _chunk_days(year, chunk)]
+    assert chunks[0].append(chunks[1:]).equals(whole)
+
+    sweep = dict(year=year, tilt_step=10, azimuth_step=30, freq="15min")
+    orientation_optimizer._SURFACE_MEMO.clear()
+    expected = calculate_optimal_orientation(havana, chunk=None, **sweep)
+    orientation_optimizer._SURFACE_MEMO.clear()
+    result = calculate_optimal_orientation(havana, chunk=chunk, **sweep)
+    assert (result.tilt, result.azimuth) == (expected.tilt, expected.azimuth)
+    assert result.annual_poa_irradiance == pytest.approx(expected.annual_poa_irradiance, rel=1e-12)
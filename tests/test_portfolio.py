@@ -0,0 +1,81 @@
+import json
+from pathlib import Path
+import sys
+import time
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:  # pragma: no cover - import guard
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend import portfolio
+from backend.portfolio import completed_ids, load_sites, run_portfolio
+
+OPTIONS = dict(year=2025, tilt_step=10, tilt_max=60, azimuth_step=45, day_step=30)
+
+
+def _sites(tmp_path, count):
+    path = tmp_path / "sites.jsonl"
+    path.write_text("\n".join(json.dumps({"lat": 10 + 10 * i, "lon": 106, "tz": "Asia/Bangkok"}) for i in range(count)))
+    return load_sites(path)
+
+
+def test_load_sites_from_csv_and_json(tmp_path):
+    csv_path = tmp_path / "sites.csv"
+    csv_path.write_text("id,lat,lon,tz\nhcm,10.82,106.63,Asia/Ho_Chi_Minh\n,52.52,13.40,Europe/Berlin\n")
+    sites = load_sites(csv_path)
+    assert [site_id for site_id, _ in sites] == ["hcm", "1"]
+    assert sites[1][1].timezone == "Europe/Berlin"
+
+    json_path = tmp_path / "sites.json"
+    json_path.write_text(json.dumps([{"latitude": -33.87, "longitude": 151.21, "timezone": "Australia/Sydney"}]))
+    (site_id, site), = load_sites(json_path)
+    assert site_id == "0" and site.latitude == -33.87
+
+    json_path.write_text(json.dumps([{"lat": 1.0}]))
+    with pytest.raises(ValueError):
+        load_sites(json_path)
+
+
+def test_run_portfolio_resumes_after_interruption(tmp_path, monkeypatch):
+    sites = _sites(tmp_path, 3)
+    output = tmp_path / "results.jsonl"
+    run_portfolio(sites[:1], output, workers=1, **OPTIONS)
+    with output.open("a") as handle:
+        handle.write('{"id": "1", "tilt"')  # torn write from a killed run
+
+    calls = []
+    real = portfolio._optimise_site
+    monkeypatch.setattr(portfolio, "_optimise_site", lambda task: calls.append(task[0]) or real(task))
+    assert run_portfolio(sites, output, workers=1, **OPTIONS) == 2
+    assert calls == ["1", "2"]
+
+    records = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [record["id"] for record in records] == ["0", "1", "2"]
+    assert all(0 <= record["tilt"] <= 60 for record in records)
+    assert completed_ids(output) == {"0", "1", "2"}
+
+
+def test_run_portfolio_in_process_pool(tmp_path):
+    sites = _sites(tmp_path, 4)
+    output = tmp_path / "results.jsonl"
+    assert run_portfolio(sites, output, workers=2, chunksize=2, **OPTIONS) == 4
+    serial = tmp_path / "serial.jsonl"
+    run_portfolio(sites, serial, workers=1, **OPTIONS)
+    assert sorted(output.read_text().splitlines()) == sorted(serial.read_text().splitlines())
+
+
+def test_pool_writes_sites_as_they_finish(tmp_path, monkeypatch):
+    real = portfolio._optimise_site
+
+    def slow_first(task):
+        if task[0] == "0":
+            time.sleep(1.0)
+        return real(task)
+
+    # Forked workers inherit the patched module attribute.
+    monkeypatch.setattr(portfolio, "_optimise_site", slow_first)
+    output = tmp_path / "results.jsonl"
+    run_portfolio(_sites(tmp_path, 3), output, workers=2, **OPTIONS)
+    assert [json.loads(line)["id"] for line in output.read_text().splitlines()] == ["1", "2", "0"]
@@ -3,6 +3,7 @@ import math
 from pathlib import Path
 import sys
 
+import numpy as np
 import pytest
 import pytz
 
@@ -12,7 +13,15 @@ if str(PROJECT_ROOT) not in sys.path:  # pragma: no cover - import guard
 
 from backend import config
 from backend.orientation_optimizer import calculate_optimal_orientation
-from backend.solar_calculator import SiteParameters, get_sun_path, get_sun_position
+from backend.solar_calculator import (
+    DEFAULT_SITE,
+    SiteParameters,
+    get_sun_path,
+    get_sun_position,
+    get_sun_positions,
+    iter_sun_paths,
+    solar_position_arrays,
+)
 
 TZ = pytz.timezone(config.TIMEZONE)
 
@@ -76,3 +85,77 @@ def test_orientation_optimizer_runs():
     result = calculate_optimal_orientation(site, year=2025, tilt_step=5, tilt_max=40, azimuth_step=30)
     assert 0 <= result.tilt <= 40
     assert 0 <= result.azimuth < 360
+
+
+def test_batch_positions_match_single_calls():
+    hanoi = SiteParameters(latitude=21.0278, longitude=105.8342, altitude=10, timezone="Asia/Bangkok")
+    sites = [SiteParameters(config.LATITUDE, config.LONGITUDE, config.ALTITUDE, config.TIMEZONE), hanoi]
+    times = [datetime(2025, 3, 20, 9, 0), to_timezone(datetime(2025, 11, 11, 14, 0))]
+    batch = get_sun_positions(times, sites)
+    assert len(batch) == 4
+    for row in range(len(batch)):
+        site = sites[batch.site_index[row]]
+        single = get_sun_position(times[row % 2], site=site)
+        assert batch.timestamps[row] == single.timestamp
+        assert batch.elevation[row] == single.elevation
+        assert batch.azimuth[row] == single.azimuth
+        assert batch.zenith[row] == single.zenith
+
+
+def test_columnar_sun_path_matches_records():
+    records = get_sun_path("2025-11-11", interval_minutes=5)
+    columnar = get_sun_path("2025-11-11", interval_minutes=5, columnar=True)
+    path = columnar["path"]
+    assert len(path["time"]) == len(records["path"]) == 288
+    assert [item["time"] for item in records["path"]] == path["time"]
+    assert [item["elevation"] for item in records["path"]] == path["elevation"]
+    assert [item["azimuth"] for item in records["path"]] == path["azimuth"]
+    assert path["time"][:2] == ["00:00", "00:05"]
+
+
+def test_sun_path_range_matches_single_days_across_chunks():
+    berlin = SiteParameters(latitude=52.52, longitude=13.405, altitude=34, timezone="Europe/Berlin")
+    days = list(iter_sun_paths("2025-03-28", "2025-04-02", interval_minutes=30, site=berlin, chunk_days=4))
+    assert [day["date"] for day in days] == [f"2025-0{m}-{d:02d}" for m, d in [(3, 28), (3, 29), (3, 30), (3, 31), (4, 1), (4, 2)]]
+    for day in days:
+        assert day == get_sun_path(day["date"], interval_minutes=30, site=berlin)
+
+
+@pytest.mark.parametrize(
+    "site",
+    [
+        SiteParameters(latitude=21.0285, longitude=105.8542, altitude=10, timezone="Asia/Ho_Chi_Minh"),
+        SiteParameters(latitude=-33.87, longitude=151.21, altitude=58, timezone="Australia/Sydney"),
+        SiteParameters(latitude=69.65, longitude=18.96, altitude=10, timezone="Europe/Oslo"),
+    ],
+)
+def test_numpy_spa_engine_matches_reference(site):
+    epoch = np.arange(1.6e9, 1.6e9 + 3 * 365 * 86400, 3 * 3600 + 17.0)
+    fast = solar_position_arrays(epoch, site.latitude, site.longitude, site.altitude, engine="numpy")
+    reference = solar_position_arrays(epoch, site.latitude, site.longitude, site.altitude, engine="pandas")
+    for actual, expected in zip(fast, reference):
+        np.testing.assert_allclose(actual, expected, rtol=0, atol=0.01)
+
+    when = datetime(2025, 6, 21, 9, 30, tzinfo=pytz.UTC)
+    assert get_sun_position(when, site=site, engine="numpy") == get_sun_position(when, site=site, engine="pandas")
+    assert get_sun_path("2025-12-21", interval_minutes=30, site=site, engine="numpy") == get_sun_path(
+        "2025-12-21", interval_minutes=30, site=site, engine="pandas"
+    )
+    batch = get_sun_positions([when], [site, DEFAULT_SITE], engine="numpy")
+    reference = get_sun_positions([when], [site, DEFAULT_SITE], engine="pandas")
+    np.testing.assert_allclose(batch.elevation, reference.elevation, atol=0.01)
+    np.testing.assert_allclose(batch.azimuth, reference.azimuth, atol=0.01)
+
+
+def test_numba_spa_engine_matches_reference():
+    pytest.importorskip("numba")
+    epoch = np.arange(1.7e9, 1.7e9 + 86400, 600.0)
+    fast = solar_position_arrays(epoch, 21.0285, 105.8542, 10, engine="numba")
+    reference = solar_position_arrays(epoch, 21.0285, 105.8542, 10, engine="pandas")
+    for actual, expected in zip(fast, reference):
+        np.testing.assert_allclose(actual, expected, rtol=0, atol=0.01)
+
+
+def test_unknown_spa_engine_raises():
+    with pytest.raises(ValueError):
+        get_sun_position(engine="fortran")
@@ -0,0 +1,74 @@
+from pathlib import Path
+import sys
+import time
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:  # pragma: no cover - import guard
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend.sun_stream import SunPositionBroadcaster
+
+
+def _collect(subscription, count):
+    messages = []
+    while len(messages) < count:
+        message = subscription.get(timeout=2)
+        assert message is not None
+        messages.append(message)
+    return messages
+
+
+def test_subscribers_of_a_site_share_one_batch_per_tick():
+    calls = []
+
+    def compute(sites, when):
+        calls.append(list(sites))
+        return [f"{site}@{when.timestamp()}" for site in sites]
+
+    broadcaster = SunPositionBroadcaster(compute, tick=0.05)
+    first = broadcaster.subscribe(["hcm"])
+    second = broadcaster.subscribe(["hcm", "hanoi"])
+    try:
+        _collect(first, 4)
+        _collect(second, 8)
+    finally:
+        broadcaster.clear()
+    assert all(len(sites) == len(set(sites)) for sites in calls)
+    # Both subscriptions share the scheduler's tick grid, so after their
+    # immediate first events each tick evaluates "hcm" once for both.
+    assert sum(sites.count("hcm") for sites in calls) < 8
+    assert broadcaster.stats()["subscribers"] == 0
+
+
+def test_interval_rounds_up_to_tick_and_slow_clients_drop_oldest():
+    def compute(sites, when):
+        return [str(when.timestamp()) for _ in sites]
+
+    broadcaster = SunPositionBroadcaster(compute, tick=0.02, max_pending=2)
+    subscription = broadcaster.subscribe(["hcm"], interval=0.03)
+    assert subscription.period == 0.04
+    time.sleep(0.3)
+    stats = broadcaster.stats()
+    broadcaster.unsubscribe(subscription)
+    assert stats["dropped"] > 0
+    first, second = _collect(subscription, 2)
+    assert float(first) < float(second)
+    assert subscription.get(timeout=0.01) is None
+
+
+def test_failed_batch_does_not_stop_the_scheduler():
+    calls = []
+
+    def compute(sites, when):
+        calls.append(when)
+        if len(calls) == 1:
+            raise RuntimeError("boom")
+        return ["ok" for _ in sites]
+
+    broadcaster = SunPositionBroadcaster(compute, tick=0.02)
+    subscription = broadcaster.subscribe(["hcm"])
+    try:
+        assert _collect(subscription, 1) == ["ok"]
+    finally:
+        broadcaster.clear()
+    assert broadcaster.stats()["errors"] == 1
@@ -0,0 +1,110 @@
+from datetime import datetime
+from pathlib import Path
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+from pvlib import solarposition
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:  # pragma: no cover - import guard
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend import sun_table
+from backend.cache import MappedArrayCache
+from backend.solar_calculator import (
+    DEFAULT_SITE,
+    SiteParameters,
+    get_sun_path,
+    get_sun_position,
+    solar_position_arrays,
+)
+from backend.sun_table import MAX_INTERPOLATION_ERROR_DEG, SunPositionTable
+
+SITES = [
+    DEFAULT_SITE,
+    SiteParameters(latitude=52.52, longitude=13.405, altitude=34, timezone="Europe/Berlin"),
+    SiteParameters(latitude=-33.8688, longitude=151.2093, altitude=58, timezone="Australia/Sydney"),
+    SiteParameters(latitude=78.22, longitude=15.65, altitude=10, timezone="Arctic/Longyearbyen"),
+]
+
+
+def _unit_vectors(elevation, azimuth):
+    el, az = np.radians(elevation), np.radians(azimuth)
+    return np.stack([np.cos(el) * np.sin(az), np.cos(el) * np.cos(az), np.sin(el)], axis=1)
+
+
+@pytest.mark.parametrize("site", SITES, ids=lambda site: site.timezone)
+def test_interpolation_error_within_documented_bound(site):
+    table = SunPositionTable.build(site, "2025-03-01", days=40)
+    table = SunPositionTable.from_arrays(site, table.to_arrays())  # exercise the float32 round trip
+    rng = np.random.default_rng(1)
+    seconds = rng.uniform(0, 40 * 86400, 20000).round()
+    times = pd.DatetimeIndex((table.start_epoch + seconds) * 1e9, tz="UTC")
+    reference = solarposition.spa_python(times, site.latitude, site.longitude, site.altitude)
+
+    elevation, azimuth = table.positions(times)
+    # SPA's own refraction switch at -0.83° is discontinuous; skip its vicinity.
+    clear_of_cutoff = np.abs(reference["elevation"].to_numpy() + 0.83337) > 0.01
+    assert clear_of_cutoff.mean() > 0.99
+
+    expected = _unit_vectors(reference["apparent_elevation"].to_numpy(), reference["azimuth"].to_numpy())
+    actual = _unit_vectors(elevation, azimuth)
+    separation = np.degrees(np.arccos(np.clip((expected * actual).sum(axis=1), -1, 1)))
+    assert separation[clear_of_cutoff].max() < MAX_INTERPOLATION_ERROR_DEG
+
+    elevation_error = np.abs(elevation - reference["apparent_elevation"].to_numpy())
+    assert elevation_error[clear_of_cutoff].max() < MAX_INTERPOLATION_ERROR_DEG
+
+
+def test_scalar_lookup_matches_get_sun_position():
+    table = SunPositionTable.build(DEFAULT_SITE, "2025-11-11", days=1)
+    when = datetime(2025, 11, 11, 14, 0, 0)
+    interpolated = table.position(when)
+    exact = get_sun_position(when)
+    assert abs(interpolated.elevation - exact.elevation) <= 0.01
+    assert abs(interpolated.azimuth - exact.azimuth) <= 0.01
+    with pytest.raises(ValueError):
+        table.position(datetime(2025, 11, 13, 0, 0, 0))
+
+
+def test_tables_persist_through_disk_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(sun_table, "_TABLE_CACHE", MappedArrayCache(tmp_path, max_bytes=10**8))
+    sun_table.get_sun_position_table.cache_clear()
+    first = sun_table.get_sun_position_table(DEFAULT_SITE, 2025, step_minutes=60)
+    assert len(list(tmp_path.glob("*.arrays"))) == 1
+
+    sun_table.get_sun_position_table.cache_clear()
+    monkeypatch.setattr(SunPositionTable, "build", None)  # a rebuild would now fail
+    second = sun_table.get_sun_position_table(DEFAULT_SITE, 2025, step_minutes=60)
+    np.testing.assert_allclose(second.vectors, first.vectors, atol=1e-6)
+    # Loaded tables interpolate the mapped float32 vectors in place.
+    assert second.vectors.dtype == np.float32 and not second.vectors.flags.writeable
+    assert second.at_epoch(second.start_epoch + 5400) == pytest.approx(
+        tuple(value[0] for value in second.positions_at(np.array([second.start_epoch + 5400])))
+    )
+    sun_table.get_sun_position_table.cache_clear()
+
+
+def test_table_engine_serves_positions_and_paths(tmp_path, monkeypatch):
+    monkeypatch.setattr(sun_table, "_TABLE_CACHE", MappedArrayCache(tmp_path, max_bytes=10**8))
+    sun_table.get_sun_position_table.cache_clear()
+    site = SITES[1]
+    # Spans the turn of the year, so two UTC-year tables are used.
+    epoch = np.arange(1767222000.0, 1767222000.0 + 2 * 86400, 617.0)
+    table = solar_position_arrays(epoch, site.latitude, site.longitude, site.altitude, engine="table")
+    reference = solar_position_arrays(epoch, site.latitude, site.longitude, site.altitude, engine="pandas")
+    for actual, expected in zip(table, reference):
+        np.testing.assert_allclose(actual, expected, rtol=0, atol=MAX_INTERPOLATION_ERROR_DEG)
+    assert len(list(tmp_path.glob("*.arrays"))) == 2
+
+    when = datetime(2025, 6, 21, 9, 30)
+    interpolated, exact = get_sun_position(when, site=site, engine="table"), get_sun_position(when, site=site)
+    # Both are rounded to 0.01 degrees.
+    assert abs(interpolated.elevation - exact.elevation) < 0.011 and abs(interpolated.azimuth - exact.azimuth) < 0.011
+    path = get_sun_path("2025-06-21", interval_minutes=30, site=site, engine="table")["path"]
+    exact_path = get_sun_path("2025-06-21", interval_minutes=30, site=site)["path"]
+    assert len(path) == len(exact_path) == 48
+    assert max(abs(a["elevation"] - b["elevation"]) for a, b in zip(path, exact_path)) < 0.011
+    sun_table.get_sun_position_table.cache_clear()
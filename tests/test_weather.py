@@ -0,0 +1,121 @@
+from pathlib import Path
+import sys
+
+import numpy as np
+import pandas as pd
+import pvlib
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:  # pragma: no cover - import guard
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend import config, orientation_optimizer, weather
+from backend.cache import MappedArrayCache
+from backend.orientation_optimizer import _build_time_index, _prepare_meteorology, calculate_optimal_orientation
+from backend.solar_calculator import SiteParameters
+from backend.weather import load_weather
+
+SITE = SiteParameters(config.LATITUDE, config.LONGITUDE, config.ALTITUDE, config.TIMEZONE, name="Test")
+PVLIB_DATA = Path(pvlib.__file__).parent / "data"
+SWEEP = {"year": 2025, "tilt_step": 10, "tilt_max": 60, "azimuth_step": 45}
+
+
+@pytest.fixture(autouse=True)
+def isolated_caches(tmp_path, monkeypatch):
+    monkeypatch.setattr(weather, "_WEATHER_CACHE", MappedArrayCache(tmp_path / "weather", max_bytes=10**8))
+    monkeypatch.setattr(
+        orientation_optimizer, "_METEOROLOGY_CACHE", MappedArrayCache(tmp_path / "meteorology", max_bytes=10**8)
+    )
+
+
+def _clear_sky_csv(path, scale=1.0, direct=True):
+    """The site's 2025 clear sky as a weather CSV with local (+07:00) timestamps."""
+
+    times = _build_time_index(2025, SITE, freq="1h")
+    clearsky = pvlib.location.Location(SITE.latitude, SITE.longitude, SITE.timezone, SITE.altitude).get_clearsky(times)
+    frame = pd.DataFrame(
+        {
+            "Time": times.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "GHI": (clearsky["ghi"] * scale).round(3),
+            "DNI": (clearsky["dni"] * scale if direct else clearsky["dni"] * 0).round(3),
+            "DHI": (clearsky["dhi"] * scale if direct else clearsky["ghi"] * scale).round(3),
+        }
+    )
+    frame.to_csv(path, index=False)
+    return path
+
+
+def test_csv_is_parsed_once_into_mapped_columns(tmp_path, monkeypatch):
+    path = _clear_sky_csv(tmp_path / "site.csv")
+    record = load_weather(path)
+    assert record.month.size == 8760 and record.freq == "3600s" and record.latitude is None
+    # Stored in UTC by calendar position: local midnight on 1 January is 17:00 on 31 December.
+    assert (record.month[-1], record.day[-1], record.second[-1]) == (12, 31, 23 * 3600)
+    assert (record.month[0], record.day[0], record.second[0]) == (1, 1, 0)
+    assert record.ghi.dtype == np.float32
+
+    with monkeypatch.context() as patch:
+        patch.setattr(weather, "_parse", lambda path: pytest.fail("cached file parsed again"))
+        again = load_weather(path)
+    assert again.key == record.key and np.array_equal(again.dhi, record.dhi)
+    assert not again.dhi.flags.writeable  # a view of the mapped cache file
+
+    path.write_text("time,ghi,dni,dhi\n2025-06-21T12:00:00Z,900,800,100\n", encoding="utf-8")
+    changed = load_weather(path)
+    assert changed.key != record.key and changed.ghi.tolist() == [900]
+    frame = changed.irradiance(2030, "Asia/Ho_Chi_Minh")
+    assert frame.index[0] == pd.Timestamp("2030-06-21T19:00:00+07:00") and frame["dni"].iloc[0] == 800
+
+
+def test_epw_and_tmy3_rows_sit_mid_hour_on_any_year():
+    epw = load_weather(PVLIB_DATA / "NLD_Amsterdam062400_IWEC.epw")
+    assert (epw.latitude, epw.longitude, epw.utc_offset, epw.timezone) == (52.3, 4.77, 1.0, "Etc/GMT-1")
+    assert epw.month.size == 8760 and epw.second[:2].tolist() == [1800, 5400]
+    leap = epw.irradiance(2024, epw.timezone)
+    assert len(leap) == 8760 and leap.index[0] == pd.Timestamp("2024-01-01T00:30:00+01:00")
+    assert not ((leap.index.month == 2) & (leap.index.day == 29)).any()
+
+    tmy3 = load_weather(PVLIB_DATA / "723170TYA.CSV")
+    assert (tmy3.latitude, tmy3.longitude, tmy3.utc_offset) == (36.1, -79.95, -5.0)
+    last = tmy3.irradiance(2025, tmy3.timezone).index[-1]
+    assert last == pd.Timestamp("2025-12-31T23:30:00-05:00")  # the "24:00" row
+
+    with pytest.raises(ValueError, match="more than 1 degrees"):
+        calculate_optimal_orientation(SITE, weather=PVLIB_DATA / "NLD_Amsterdam062400_IWEC.epw", **SWEEP)
+
+
+def test_weather_feeds_the_same_sweep_as_clear_sky(tmp_path):
+    clear = calculate_optimal_orientation(SITE, **SWEEP)
+    measured = calculate_optimal_orientation(SITE, weather=_clear_sky_csv(tmp_path / "clear.csv"), **SWEEP)
+    assert (measured.tilt, measured.azimuth) == (clear.tilt, clear.azimuth)
+    assert measured.annual_poa_irradiance == pytest.approx(clear.annual_poa_irradiance, rel=1e-5)
+
+    overcast = tmp_path / "overcast.csv"
+    _clear_sky_csv(overcast, scale=0.4, direct=False)
+    whole = calculate_optimal_orientation(SITE, weather=overcast, **SWEEP)
+    chunked = calculate_optimal_orientation(SITE, weather=overcast, chunk="month", strategy="refine", **SWEEP)
+    # Diffuse light alone favours a flat panel.
+    assert whole.tilt == chunked.tilt == 0
+    assert chunked.annual_poa_irradiance == pytest.approx(whole.annual_poa_irradiance, rel=1e-9)
+    assert whole.annual_poa_irradiance < 0.5 * clear.annual_poa_irradiance
+
+
+def test_meteorology_uses_measured_irradiance(tmp_path):
+    record = load_weather(_clear_sky_csv(tmp_path / "half.csv", scale=0.5))
+    solpos, sky, dni_extra = orientation_optimizer._site_meteorology(SITE, 2025, weather=record, days=(171, 172))
+    times = _build_time_index(2025, SITE, freq="1h", days=(171, 172))
+    expected_solpos, expected_sky, _ = _prepare_meteorology(times, SITE)
+    assert sky.index.equals(expected_sky.index) and (sky.index.day == 21).all()
+    assert np.allclose(sky["ghi"], 0.5 * expected_sky["ghi"], atol=1e-3)
+    assert np.allclose(solpos["apparent_zenith"], expected_solpos["apparent_zenith"])
+
+
+def test_rejects_unusable_files(tmp_path):
+    bad = tmp_path / "bad.csv"
+    bad.write_text("when,ghi\n2025-01-01,0\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="time/timestamp/datetime"):
+        load_weather(bad)
+    bad.write_text("time,ghi,dni,dhi\n2024-01-01T12:00Z,1,1,1\n2025-01-01T12:00Z,1,1,1\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="at most one year"):
+        load_weather(bad)